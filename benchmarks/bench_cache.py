@@ -0,0 +1,44 @@
+"""Time to get the AST of a script file, parsed or loaded from the cache."""
+
+import os
+import shutil
+import tempfile
+
+from mariachi import cache
+from mariachi.lexer import Lexer
+from mariachi.mariachi import parse_lexer
+
+from .common import best_of, sample_script
+
+
+def parse(path):
+    lexer = Lexer.from_file(path)
+    ast, error = parse_lexer(lexer)
+    assert error is None
+    return ast, lexer.source, error
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        for blocks in (10, 2000):
+            path = os.path.join(directory, f"script{blocks}.mar")
+            with open(path, "w") as file:
+                file.write(sample_script(blocks))
+
+            parsed = best_of(lambda: parse(path))
+            cache.parse_file(path, parse)
+            loaded = best_of(lambda: cache.parse_file(path, parse))
+            entry = cache.CacheEntry(path)
+            print(
+                f"{os.path.getsize(path) / 1024:.0f} KiB script: "
+                f"parse {parsed * 1000:.2f} ms, "
+                f"cached {loaded * 1000:.2f} ms "
+                f"({os.path.getsize(entry.cache_path) / 1024:.0f} KiB entry)"
+            )
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Cost of a function call in every engine.
+
+A loop calling a function that does nothing is timed against the same loop
+without the call, the difference divided by the number of iterations is
+the cost of a call: making its context and binding its argument.
+"""
+
+from mariachi.lexer import Lexer
+from mariachi.mariachi import ENGINES, interpret, parse_lexer
+
+from .common import best_of
+
+CALLS = 200000
+
+WITH_CALL = f"""\
+define f(a) {{ a }}
+define bucle() {{ para i = 0 hasta {CALLS} {{ f(i) }} }}
+bucle()
+"""
+
+WITHOUT_CALL = f"""\
+define f(a) {{ a }}
+define bucle() {{ para i = 0 hasta {CALLS} {{ i }} }}
+bucle()
+"""
+
+
+def timed(code, engine):
+    ast, error = parse_lexer(Lexer("<bench>", code))
+    assert error is None
+
+    def run():
+        value, error = interpret(ast, engine)
+        assert error is None
+
+    return best_of(run, repeat=5)
+
+
+def main():
+    for engine in ENGINES:
+        elapsed = timed(WITH_CALL, engine) - timed(WITHOUT_CALL, engine)
+        print(f"{engine}: {elapsed / CALLS * 1e9:.0f} ns por llamada")
+
+
+if __name__ == "__main__":
+    main()
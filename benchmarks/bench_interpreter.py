@@ -0,0 +1,69 @@
+"""Cost per evaluated node of every engine on two small hot programs.
+
+Nodes are counted by walking the programs once with the Interpreter.
+"""
+
+from mariachi.interpreter import Interpreter
+from mariachi.lexer import Lexer
+from mariachi.mariachi import ENGINES, interpret, parse_lexer
+
+from .common import best_of
+
+PROGRAMS = {
+    "mientras": """\
+sea n = 0
+mientras n < 20000 { sea n = n + 1 }
+""",
+    "sigue": """\
+sea n = 0
+para i = 0 hasta 20000 { si i % 2 { sigue }
+sea n = n + 1 }
+""",
+    "fib": """\
+define fib(n) { si n < 2 { entrega n } sino { entrega fib(n - 1) + fib(n - 2) } }
+fib(15)
+""",
+}
+
+
+def count_visits(ast):
+    """Runs an AST once and counts the nodes the interpreter visits."""
+    visits = 0
+    visit = Interpreter.visit
+
+    def counting_visit(self, node, context):
+        nonlocal visits
+        visits += 1
+        return visit(self, node, context)
+
+    Interpreter.visit = counting_visit
+    try:
+        interpret(ast)
+    finally:
+        Interpreter.visit = visit
+    return visits
+
+
+def main():
+    for name, code in PROGRAMS.items():
+        ast, error = parse_lexer(Lexer("<bench>", code))
+        assert error is None
+
+        visits = count_visits(ast)
+        print(f"{name}: {visits} nodes")
+
+        for engine in ENGINES:
+
+            def run():
+                value, error = interpret(ast, engine)
+                assert error is None
+
+            elapsed = best_of(run, repeat=3)
+            print(
+                f"  {engine}: {elapsed * 1000:.1f} ms, "
+                f"{elapsed / visits * 1e9:.0f} ns per node"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Lexer throughput on a large generated script."""
+
+from mariachi.lexer import Lexer
+
+from .common import best_of, sample_script
+
+
+def main():
+    code = sample_script(2000)
+
+    def lex():
+        tokens, error = Lexer("<bench>", code).make_tokens()
+        assert error is None
+        return tokens
+
+    tokens = lex()
+    elapsed = best_of(lex)
+    print(f"source: {len(code) / 1024:.0f} KiB, {len(tokens)} tokens")
+    print(
+        f"lexer: {elapsed * 1000:.1f} ms, "
+        f"{len(code) / elapsed / 2**20:.2f} MiB/s, "
+        f"{len(tokens) / elapsed / 1000:.0f}k tokens/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Memory retained by the tokens and the AST of a large generated script.
+
+The AST is measured as a tree of node objects and packed into a NodeStore.
+"""
+
+import tracemalloc
+
+from mariachi.lexer import Lexer
+from mariachi.node_store import NodeStore
+from mariachi.parser import Parser
+
+from .common import sample_script
+
+
+def mib(size):
+    return size / 2**20
+
+
+def main():
+    code = sample_script(2000)
+    lines = code.count("\n")
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tokens, error = Lexer("<bench>", code).make_tokens()
+    assert error is None
+    after_lexing = tracemalloc.get_traced_memory()[0]
+    ast = Parser(tokens).parse()
+    assert ast.error is None
+    del tokens
+    after_parsing = tracemalloc.get_traced_memory()[0]
+    store = NodeStore.pack(ast.node)
+    del ast
+    after_packing = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tree = after_parsing - base
+    packed = after_packing - base
+    print(f"source: {mib(len(code)):.2f} MiB, {lines} lines")
+    print(f"tokens: {mib(after_lexing - base):.1f} MiB")
+    print(f"ast:    {mib(tree):.1f} MiB as nodes, {mib(packed):.1f} MiB packed")
+    print(
+        f"ast per 10k lines: {mib(tree / lines * 10000):.2f} MiB as nodes, "
+        f"{mib(packed / lines * 10000):.2f} MiB packed, "
+        f"{mib((tree - packed) / lines * 10000):.2f} MiB saved"
+    )
+    assert len(store)
+
+
+if __name__ == "__main__":
+    main()
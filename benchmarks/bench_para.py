@@ -0,0 +1,41 @@
+"""Cost of a step of a para loop in every engine.
+
+Two nested loops in a function count to STEPS with an empty body, so that
+the time divided by the steps is what the loop itself costs: giving the
+next value of its variable.
+"""
+
+from mariachi.lexer import Lexer
+from mariachi.mariachi import ENGINES, interpret, parse_lexer
+
+from .common import best_of
+
+OUTER = 1000
+INNER = 1000
+STEPS = OUTER * INNER
+
+NESTED = f"""\
+define bucle() {{ para i = 0 hasta {OUTER} {{ para j = 0 hasta {INNER} {{ 0 }} }} }}
+bucle()
+"""
+
+
+def timed(code, engine):
+    ast, error = parse_lexer(Lexer("<bench>", code))
+    assert error is None
+
+    def run():
+        value, error = interpret(ast, engine)
+        assert error is None
+
+    return best_of(run, repeat=3)
+
+
+def main():
+    for engine in ENGINES:
+        elapsed = timed(NESTED, engine)
+        print(f"{engine}: {elapsed / STEPS * 1e9:.0f} ns por paso")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Parser throughput on a large generated script, for both parsers."""
+
+from mariachi.lexer import Lexer
+from mariachi.parser import Parser
+from mariachi.table_parser import TableParser
+
+from .common import best_of, sample_script
+
+PARSERS = (("recursive", Parser), ("table", TableParser))
+
+
+def main():
+    code = sample_script(2000)
+    tokens, error = Lexer("<bench>", code).make_tokens()
+    assert error is None
+    print(f"source: {len(code) / 1024:.0f} KiB, {len(tokens)} tokens")
+
+    for name, parser_class in PARSERS:
+
+        def parse():
+            res = parser_class(tokens).parse()
+            assert res.error is None
+
+        elapsed = best_of(parse)
+        print(
+            f"{name}: {elapsed * 1000:.1f} ms, "
+            f"{len(tokens) / elapsed / 1000:.0f}k tokens/s"
+        )
+
+    # Nesting only costs the table parser heap memory
+    depth = 100_000
+    nested = "(" * depth + "1" + ")" * depth
+    lexer = Lexer("<bench>", nested)
+    tokens, error = lexer.make_tokens()
+    elapsed = best_of(lambda: TableParser(tokens).parse(), repeat=3)
+    print(f"table, {depth} nested parentheses: {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Peak memory of reading, lexing and parsing a multi-megabyte script file."""
+
+import os
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from mariachi.lexer import Lexer
+from mariachi.parser import Parser
+
+from .common import sample_script
+
+
+def peak(func):
+    """Returns the peak traced memory while running `func`, in MiB."""
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+def main():
+    with tempfile.NamedTemporaryFile("w", suffix=".mar", delete=False) as file:
+        file.write(sample_script(8000))
+    path = Path(file.name)
+
+    def lex_whole():
+        tokens, error = Lexer(path, path.read_text()).make_tokens()
+        assert error is None
+
+    def lex_streamed():
+        lexer = Lexer.from_file(path)
+        for _ in lexer.generate_tokens():
+            pass
+        assert lexer.error is None
+
+    def parse_whole():
+        tokens, error = Lexer(path, path.read_text()).make_tokens()
+        assert Parser(tokens).parse().error is None
+
+    def parse_streamed():
+        lexer = Lexer.from_file(path)
+        assert Parser(lexer.generate_tokens()).parse().error is None
+
+    try:
+        print(f"source: {os.path.getsize(path) / 2**20:.1f} MiB")
+        print(f"lexing, whole text:    {peak(lex_whole):7.1f} MiB peak")
+        print(f"lexing, streamed:      {peak(lex_streamed):7.1f} MiB peak")
+        print(f"parsing, whole text:   {peak(parse_whole):7.1f} MiB peak")
+        print(f"parsing, streamed:     {peak(parse_streamed):7.1f} MiB peak")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Time of every engine on a recursive function and on a long loop.
+
+Both programs mostly read variables and call functions, so they show what
+the values allocated by those cost.
+"""
+
+from mariachi.lexer import Lexer
+from mariachi.mariachi import ENGINES, interpret, parse_lexer
+
+from .common import best_of
+
+PROGRAMS = {
+    "fib(25)": """\
+define fib(n) { si n < 2 { entrega n } sino { entrega fib(n - 1) + fib(n - 2) } }
+fib(25)
+""",
+    "1M iteraciones": """\
+define cuenta(total) {
+    sea n = 0
+    mientras n < total { sea n = n + 1 }
+    entrega n
+}
+cuenta(1000000)
+""",
+}
+
+
+def main():
+    for name, code in PROGRAMS.items():
+        ast, error = parse_lexer(Lexer("<bench>", code))
+        assert error is None
+        print(f"{name}:")
+
+        for engine in ENGINES:
+
+            def run():
+                value, error = interpret(ast, engine)
+                assert error is None
+
+            elapsed = best_of(run, repeat=3)
+            print(f"  {engine}: {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
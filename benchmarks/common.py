@@ -0,0 +1,42 @@
+"""Shared helpers for the mariachi benchmarks.
+
+Run a benchmark from the repository root with, for example:
+
+    python -m benchmarks.bench_lexer
+"""
+
+import time
+
+SNIPPET = """\
+# bloque generado {n}
+sea x{n} = {n} * 2 + 3.5 - (4 // 2) % 3
+fija K{n} = "texto con \\"escape\\" {n}"
+si x{n} >= 10 y x{n} != 11 o jamas 0 {{
+    canta(x{n})
+}} quizas x{n} < 5 {{
+    eco("chico")
+}} sino {{
+    eco("mediano")
+}}
+define f{n}(a, b) {{
+    entrega a ** 2 + b
+}}
+para i = 0 hasta 3 paso 1 {{ sea x{n} = f{n}(i, x{n}) }}
+mientras x{n} > 100 {{ sea x{n} = x{n} / 2 }}
+sea l{n} = [1, 2, 3] + 4
+"""
+
+
+def sample_script(blocks):
+    """Returns a script made of `blocks` copies of a representative snippet."""
+    return "".join(SNIPPET.format(n=n) for n in range(blocks))
+
+
+def best_of(func, repeat=5):
+    """Returns the best wall-clock time of `repeat` calls to `func`."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -3,7 +3,7 @@ from typing_extensions import Annotated
 from pathlib import Path
 from sys import exit
 
-from .mariachi import run
+from .mariachi import ENGINES, disassemble_path, emit_python_path, run, run_path
 from .interpreter import List, Function, String
 
 app = typer.Typer()
@@ -42,22 +42,48 @@ def main(
             help="File with your Mariachi script",
         ),
     ] = None,
+    cache: Annotated[
+        bool, typer.Option(help="Reuse the parsed script from __marcache__.")
+    ] = True,
+    engine: Annotated[
+        str,
+        typer.Option(help=f"How to run the script: {', '.join(ENGINES)}."),
+    ] = "tree",
+    dis: Annotated[
+        bool, typer.Option(help="Print the bytecode of the script instead.")
+    ] = False,
+    emit_python: Annotated[
+        bool, typer.Option(help="Print the Python the python engine runs instead.")
+    ] = False,
 ):
     if repl:
         run_repl()
     elif debug:
         debug_repl()
+    elif dis:
+        disassemble_script(file, cache)
+    elif emit_python:
+        emit_python_script(file, cache)
     else:
-        run_script(file)
+        run_script(file, cache, engine)
 
 
-def run_script(
-    file,
-):
+def disassemble_script(file, cache=True):
+    """Print the bytecode the vm engine runs for a script."""
+    text, error = disassemble_path(file, use_cache=cache)
+    print(error.as_string() if error else text)
+
+
+def emit_python_script(file, cache=True):
+    """Print the Python source the python engine runs for a script."""
+    text, error = emit_python_path(file, use_cache=cache)
+    print(error.as_string() if error else text, end="" if text else "\n")
+
+
+def run_script(file, cache=True, engine="tree"):
     """Run a Mariachi script from a file."""
     try:
-        code = file.read_text()
-        result, error = run(file, code)
+        result, error = run_path(file, use_cache=cache, engine=engine)
 
         if error:
             print(error.as_string())
@@ -0,0 +1,476 @@
+"""Compiles the AST into bytecode for mariachi.vm, and disassembles it.
+
+A code object holds the instructions of the program or of one function as
+pairs of opcode and argument in an array of ints, with the source
+positions of every instruction alongside them, so that runtime errors
+point at the code they come from. Arguments index the constant pool, the
+names of the code, or its loops, or are jump targets.
+
+Names are still looked up in the symbol tables at runtime because scoping
+is dynamic: a function sees the variables of the function calling it. The
+slots of a frame hold what the compiler introduces itself, like the steps
+of a para loop. With the resolution of the program the names only the
+program binds are read from the global table directly.
+
+entrega of a call outside of loops is a tail call: the frame of the callee
+takes the place of the frame making it, see mariachi.vm.
+"""
+
+from array import array
+
+from .interpreter import VisitMethods, Number, value_span
+from .resolver import GLOBAL
+from .source import SOURCES
+from .table_parser import TOKEN_DISPLAY
+from .token import *
+
+# Opcodes, the argument of each is in the comment
+LOAD_NUMBER = 0  # constant, its shared Number
+LOAD_STRING = 1  # constant, its shared String
+LOAD_CONST = 2  # constant, pushed as it is
+LOAD_NULL = 3
+LOAD_NAME = 4  # name
+LOAD_CONST_NAME = 5  # name, the value of a fija constant
+STORE_NAME = 6  # name
+STORE_CONST = 7  # name
+POP_TOP = 8
+BINARY_OP = 9  # operator token type
+UNKNOWN_OPERATOR = 10  # constant, the message of the error
+UNARY_NEGATIVE = 11
+UNARY_NOT = 12
+JUMP = 13  # target
+POP_JUMP_IF_FALSE = 14  # target
+BUILD_LIST = 15  # number of elements
+MAKE_FUNCTION = 16  # constant, the code of the function
+CALL = 17  # number of arguments
+RETURN_VALUE = 18
+END_FUNCTION = 19
+HALT = 20
+SETUP_LOOP = 21  # loop
+FOR_PREPARE = 22  # loop
+FOR_ITER = 23  # loop
+APPEND_ELEMENT = 24
+FINISH_LOOP = 25  # 1 when the value of the loop is never used
+BREAK = 26
+CONTINUE = 27
+TAIL_CALL = 28  # number of arguments, followed by RETURN_VALUE
+LOAD_GLOBAL = 29  # name
+STORE_COUNTER = 30  # loop, where a quiet para loop is left
+SHORT_CIRCUIT_Y = 31  # target, where the left operand of y deciding it goes
+SHORT_CIRCUIT_O = 32  # target, the same for o
+
+OPNAMES = {
+    value: name
+    for name, value in list(globals().items())
+    if name.isupper() and isinstance(value, int) and not name.startswith("TT_")
+}
+HAS_CONSTANT = {LOAD_NUMBER, LOAD_STRING, LOAD_CONST, UNKNOWN_OPERATOR, MAKE_FUNCTION}
+HAS_NAME = {LOAD_NAME, LOAD_CONST_NAME, STORE_NAME, STORE_CONST, LOAD_GLOBAL}
+HAS_TARGET = {JUMP, POP_JUMP_IF_FALSE, SHORT_CIRCUIT_Y, SHORT_CIRCUIT_O}
+HAS_LOOP = {SETUP_LOOP, FOR_PREPARE, FOR_ITER, STORE_COUNTER}
+
+# The step of a para loop without paso, only its value is read
+DEFAULT_STEP = Number(1)
+
+
+class CodeObject:
+    """The compiled code of the program or of a function.
+
+    loops holds (continue target, break target, first slot, name) for each
+    loop, the name being the variable of a para loop. The break target of
+    a para loop that may be quiet, see Resolution.quiet_counter(), is a
+    STORE_COUNTER instruction. operand_positions
+    holds the positions of the operands of each operator instruction, only
+    needed for its errors. literals holds the shared Value of each number
+    and string constant, at the index of the constant.
+    """
+
+    __slots__ = (
+        "name",
+        "arg_names",
+        "should_auto_return",
+        "is_function",
+        "code",
+        "positions",
+        "operand_positions",
+        "constants",
+        "literals",
+        "names",
+        "loops",
+        "slot_count",
+        "source",
+    )
+
+    def __init__(self, name, arg_names=(), should_auto_return=False, is_function=False):
+        self.name = name
+        self.arg_names = list(arg_names)
+        self.should_auto_return = should_auto_return
+        self.is_function = is_function
+        # Opcode and argument of every instruction
+        self.code = array("i")
+        # Start and end positions of every instruction
+        self.positions = array("q")
+        self.operand_positions = {}
+        self.constants = []
+        self.literals = []
+        self.names = []
+        self.loops = []
+        self.slot_count = 0
+        # The source the positions point to, kept alive for the errors
+        self.source = None
+
+    def __repr__(self):
+        return f"<codigo {self.name}>"
+
+
+class Compiler:
+    """Compiles nodes into a CodeObject, one compile method per node class.
+
+    The methods of nodes with children are generators yielding the
+    children to compile in their place, so that compile() keeps the nodes
+    being compiled on a list instead of recursing, however deep the AST.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.compile_methods = VisitMethods(cls, "compile_")
+
+    def __init__(self, code, resolution=None, scope=None):
+        self.code = code
+        self.constant_ids = {}
+        self.name_ids = {}
+        self.resolution = resolution
+        # The scope of the function being compiled, None for the program
+        self.scope = scope
+        # How many loops the code being compiled is in
+        self.loop_depth = 0
+
+    def compile(self, node):
+        pending = []
+        methods = self.compile_methods
+        while True:
+            compiling = methods[node.__class__](self, node)
+            if compiling is not None:
+                pending.append(compiling)
+            # The next child of the innermost node with children left
+            while pending:
+                node = next(pending[-1], None)
+                if node is not None:
+                    break
+                pending.pop()
+            else:
+                return
+
+    def no_visit_method(self, node):
+        raise Exception(f"No compile_{type(node).__name__} method defined.")
+
+    ####################################
+    # Emitting
+
+    def emit(self, op, arg, node):
+        """Appends an instruction, returns its offset."""
+        offset = len(self.code.code)
+        self.code.code.extend((op, arg))
+        self.code.positions.extend((node.pos_start, node.pos_end))
+        if self.code.source is None:
+            self.code.source = SOURCES.lookup(node.pos_start)
+        return offset
+
+    def here(self):
+        return len(self.code.code)
+
+    def patch(self, offset, target):
+        """Points the jump at offset to target."""
+        self.code.code[offset + 1] = target
+
+    def constant(self, value, literal=None):
+        # 1 and 1.0 are equal but not the same constant
+        if isinstance(value, (int, float, str)):
+            key = (value.__class__, value)
+        else:
+            key = id(value)
+        if key not in self.constant_ids:
+            self.constant_ids[key] = len(self.code.constants)
+            self.code.constants.append(value)
+            self.code.literals.append(literal)
+        return self.constant_ids[key]
+
+    def name(self, name):
+        if name not in self.name_ids:
+            self.name_ids[name] = len(self.code.names)
+            self.code.names.append(name)
+        return self.name_ids[name]
+
+    def new_loop(self, slots=0, name=None):
+        """Adds a loop, its targets are filled in once they are known."""
+        slot = self.code.slot_count
+        self.code.slot_count += slots
+        self.code.loops.append([0, 0, slot, -1 if name is None else self.name(name)])
+        return len(self.code.loops) - 1
+
+    ####################################
+    # Nodes
+
+    def compile_NumberNode(self, node):
+        self.emit(LOAD_NUMBER, self.constant(node.tok.value, node.value), node)
+
+    def compile_StringNode(self, node):
+        self.emit(LOAD_STRING, self.constant(node.tok.value, node.value), node)
+
+    def compile_BinaryOpNode(self, node):
+        yield node.left_node
+        skip = None
+        if node.op_tok.type == TT_Y:
+            skip = self.emit(SHORT_CIRCUIT_Y, 0, node)
+        elif node.op_tok.type == TT_O:
+            skip = self.emit(SHORT_CIRCUIT_O, 0, node)
+        yield node.right_node
+        if node.op_tok.type in OPERATOR_TYPES:
+            offset = self.emit(BINARY_OP, node.op_tok.type, node)
+            self.code.operand_positions[offset] = (
+                value_span(node.left_node),
+                value_span(node.right_node),
+            )
+        else:
+            details = f"Operador desconocido '{node.op_tok}'"
+            self.emit(UNKNOWN_OPERATOR, self.constant(details), node)
+        if skip is not None:
+            self.patch(skip, self.here())
+
+    def compile_UnaryOpNode(self, node):
+        yield node.node
+        if node.op_tok.type == TT_MINUS:
+            offset = self.emit(UNARY_NEGATIVE, 0, node)
+        elif node.op_tok.type == TT_JAMAS:
+            offset = self.emit(UNARY_NOT, 0, node)
+        else:
+            # + leaves its operand as it is
+            return
+        self.code.operand_positions[offset] = (value_span(node.node),)
+
+    def compile_VarAssignNode(self, node):
+        yield node.value_node
+        self.emit(STORE_NAME, self.name(node.var_name_tok.value), node)
+
+    def compile_VarAccessNode(self, node):
+        self.emit(
+            self.load_op(node, LOAD_NAME), self.name(node.var_name_tok.value), node
+        )
+
+    def compile_ConstAssignNode(self, node):
+        yield node.value_node
+        self.emit(STORE_CONST, self.name(node.const_name_tok.value), node)
+
+    def compile_ConstAccessNode(self, node):
+        op = self.load_op(node, LOAD_CONST_NAME)
+        self.emit(op, self.name(node.var_name_tok.value), node)
+
+    def load_op(self, node, op):
+        """The opcode reading the name of an access node in a function,
+        LOAD_GLOBAL for the names only the program binds."""
+        if self.resolution is None or self.scope is None:
+            return op
+        kind, _ = self.resolution.classify(node.var_name_tok.value, self.scope)
+        return LOAD_GLOBAL if kind == GLOBAL else op
+
+    def compile_IfNode(self, node):
+        exits = []
+        for condition, expr in node.cases:
+            yield condition
+            skip = self.emit(POP_JUMP_IF_FALSE, 0, condition)
+            yield expr
+            exits.append(self.emit(JUMP, 0, expr))
+            self.patch(skip, self.here())
+        if node.else_case:
+            yield node.else_case
+        else:
+            self.emit(LOAD_NULL, 0, node)
+        for jump in exits:
+            self.patch(jump, self.here())
+
+    def compile_ForNode(self, node):
+        yield node.start_value_node
+        yield node.end_value_node
+        if node.step_value_node:
+            yield node.step_value_node
+        else:
+            self.emit(LOAD_CONST, self.constant(DEFAULT_STEP), node)
+
+        # The steps, the last step, whether the next step sets the variable
+        # and whether the loop is quiet
+        loop = self.new_loop(4, node.var_name_tok.value)
+        self.emit(FOR_PREPARE, loop, node)
+        start = self.emit(FOR_ITER, loop, node)
+        self.loop_depth += 1
+        yield node.body_node
+        self.loop_depth -= 1
+        discarded = self.discards(node)
+        self.emit(POP_TOP if discarded else APPEND_ELEMENT, 0, node)
+        self.emit(JUMP, start, node)
+        if self.resolution is not None and self.resolution.may_be_quiet(node):
+            end = self.emit(STORE_COUNTER, loop, node)
+            self.emit(FINISH_LOOP, discarded, node)
+        else:
+            end = self.emit(FINISH_LOOP, discarded, node)
+        self.code.loops[loop][:2] = [start, end]
+
+    def compile_WhileNode(self, node):
+        loop = self.new_loop()
+        self.emit(SETUP_LOOP, loop, node)
+        start = self.here()
+        self.loop_depth += 1
+        yield node.condition_node
+        skip = self.emit(POP_JUMP_IF_FALSE, 0, node.condition_node)
+        yield node.body_node
+        self.loop_depth -= 1
+        discarded = self.discards(node)
+        self.emit(POP_TOP if discarded else APPEND_ELEMENT, 0, node)
+        self.emit(JUMP, start, node)
+        end = self.emit(FINISH_LOOP, discarded, node)
+        self.patch(skip, end)
+        self.code.loops[loop][:2] = [start, end]
+
+    def discards(self, loop_node):
+        """Whether the values of the body of a loop are dropped, instead of
+        being collected into the value of the loop."""
+        return self.resolution is not None and self.resolution.discards(loop_node)
+
+    def compile_FuncDefNode(self, node):
+        func_name = node.var_name_tok.value if node.var_name_tok else None
+        code = compile_function(
+            func_name,
+            [arg_name.value for arg_name in node.arg_name_toks],
+            node.body_node,
+            node.should_auto_return,
+            self.resolution,
+            self.resolution.scope(node) if self.resolution else None,
+        )
+        self.emit(MAKE_FUNCTION, self.constant(code), node)
+        if func_name:
+            self.emit(STORE_NAME, self.name(func_name), node)
+
+    def compile_CallNode(self, node, op=CALL):
+        yield node.node_to_call
+        yield from node.arg_nodes
+        self.emit(op, len(node.arg_nodes), node)
+
+    def compile_ListNode(self, node):
+        yield from node.element_nodes
+        self.emit(BUILD_LIST, len(node.element_nodes), node)
+
+    def compile_BlockNode(self, node):
+        statements = node.statement_nodes.element_nodes
+        if not statements:
+            self.emit(LOAD_NULL, 0, node)
+        for i, statement in enumerate(statements):
+            if i:
+                self.emit(POP_TOP, 0, statement)
+            yield statement
+
+    def compile_ReturnNode(self, node):
+        to_return = node.node_to_return
+        # By name, so that views of a NodeStore are found too
+        if to_return.__class__.__name__ == "CallNode" and self.code.is_function:
+            # rompe and sigue in the callee may leave it into the loops of
+            # the caller, so calls in loops keep the frame of their caller
+            op = TAIL_CALL if self.loop_depth == 0 else CALL
+            yield from self.compile_CallNode(to_return, op)
+        elif to_return:
+            yield to_return
+        else:
+            self.emit(LOAD_NULL, 0, node)
+        self.emit(RETURN_VALUE, 0, node)
+
+    def compile_ContinueNode(self, node):
+        self.emit(CONTINUE, 0, node)
+
+    def compile_BreakNode(self, node):
+        self.emit(BREAK, 0, node)
+
+
+Compiler.compile_methods = VisitMethods(Compiler, "compile_")
+
+# The operators BINARY_OP knows
+OPERATOR_TYPES = frozenset(
+    (
+        TT_PLUS,
+        TT_MINUS,
+        TT_MUL,
+        TT_DIV,
+        TT_POW,
+        TT_MOD,
+        TT_FLOORDIV,
+        TT_NE,
+        TT_EE,
+        TT_LT,
+        TT_LTE,
+        TT_GT,
+        TT_GTE,
+        TT_Y,
+        TT_O,
+    )
+)
+
+
+def compile_program(ast, name="<programma>", resolution=None):
+    """Compiles the AST of a program, it ends by halting with its value.
+
+    With the Resolution of the program its functions read global names
+    directly.
+    """
+    code = CodeObject(name)
+    compiler = Compiler(code, resolution)
+    compiler.compile(ast)
+    compiler.emit(HALT, 0, ast)
+    return code
+
+
+def compile_function(
+    name, arg_names, body_node, should_auto_return, resolution=None, scope=None
+):
+    code = CodeObject(name or "<anonimo>", arg_names, should_auto_return, True)
+    compiler = Compiler(code, resolution, scope)
+    compiler.compile(body_node)
+    compiler.emit(END_FUNCTION, 0, body_node)
+    return code
+
+
+def disassemble(code):
+    """The instructions of a code object and of the functions in it."""
+    lines = [f"Desensamblado de {code.name}:"]
+    last_line = None
+    for offset in range(0, len(code.code), 2):
+        op, arg = code.code[offset], code.code[offset + 1]
+        pos = code.positions[offset]
+        line = ""
+        source = code.source if code.source and code.source.contains(pos) else None
+        if source:
+            number = source.position(pos).ln + 1
+            if number != last_line:
+                line = str(number)
+                last_line = number
+
+        text = f"{line:>4} {offset:>6} {OPNAMES[op]:<18}"
+        if op in HAS_CONSTANT:
+            text += f" {arg} ({code.constants[arg]!r})"
+        elif op in HAS_NAME:
+            text += f" {arg} ({code.names[arg]})"
+        elif op in HAS_TARGET:
+            text += f" {arg}"
+        elif op in HAS_LOOP:
+            cont, brk, slot, name = code.loops[arg]
+            text += f" {arg} (sigue {cont}, rompe {brk}"
+            if name >= 0:
+                text += f", {code.names[name]} en {slot}"
+            text += ")"
+        elif op == BINARY_OP:
+            text += f" {TOKEN_DISPLAY[arg]}"
+        elif op in (BUILD_LIST, CALL, TAIL_CALL, FINISH_LOOP):
+            text += f" {arg}"
+        lines.append(text.rstrip())
+
+    for constant in code.constants:
+        if isinstance(constant, CodeObject):
+            lines.append("")
+            lines.append(disassemble(constant))
+    return "\n".join(lines)
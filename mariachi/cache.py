@@ -0,0 +1,440 @@
+"""On-disk cache of the ASTs of script files, like __pycache__ for Python.
+
+The AST of path/script.mar is stored in path/__marcache__/script.mar.<tag>
+where the tag names the version of the interpreter, the Python code it is
+transpiled to in script.mar.<tag>.<python>.pyc. The header of an entry
+records the size, modification time and SHA-256 hash of the script it was
+parsed from: when the size and time still match the script is not even
+read, when only the hash matches the entry is still used.
+
+Entries are written to a temporary file that is renamed over the entry, so
+two processes storing the same entry at once never leave a partial file.
+"""
+
+import gc
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+
+from . import __version__
+from .interpreter import ConstantPool
+from .nodes import *
+from .source import SOURCES
+from .token import Token
+
+CACHE_DIR = "__marcache__"
+# Bumped whenever the nodes, the generated Python or the way they are
+# stored change
+CACHE_FORMAT = 4
+CACHE_TAG = f"mariachi-{__version__}-{CACHE_FORMAT}"
+# Code objects only load in the Python that marshalled them
+PYTHON_SUFFIX = f".{sys.implementation.cache_tag}.pyc"
+MAGIC = b"MARC"
+
+
+class CacheEntry:
+    """What is known about a script file and its cache entry."""
+
+    def __init__(self, path, suffix=""):
+        self.path = os.fspath(path)
+        directory, name = os.path.split(os.path.abspath(self.path))
+        self.cache_path = os.path.join(
+            directory, CACHE_DIR, f"{name}.{CACHE_TAG}{suffix}"
+        )
+        stat = os.stat(self.path)
+        self.mtime = stat.st_mtime_ns
+        self.size = stat.st_size
+        # Entries are as readable as their script, and always writable by
+        # their owner so that they can be replaced, like in __pycache__
+        self.mode = (stat.st_mode | 0o200) & 0o666
+        self._digest = None
+        self.touched = False
+
+    @property
+    def digest(self):
+        """The hash of the script, only computed when it is needed."""
+        if self._digest is None:
+            with open(self.path, "rb") as file:
+                self._digest = hashlib.sha256(file.read()).hexdigest()
+        return self._digest
+
+
+# Operations of the encoded AST. It is the post-order walk of the tree: each
+# operation pops the children pushed before it and pushes its own node. The
+# token of a node is stored inline as type, value, pos_start, pos_end.
+OP_TOKEN = 0  # token
+OP_NONE = 1
+OP_NUMBER = 2  # token
+OP_STRING = 3  # token
+OP_BINARY_OP = 4  # operator token
+OP_UNARY_OP = 5  # operator token
+OP_VAR_ASSIGN = 6  # name token
+OP_VAR_ACCESS = 7  # name token
+OP_CONST_ASSIGN = 8  # name token
+OP_CONST_ACCESS = 9  # name token
+OP_IF = 10  # number of cases
+OP_FOR = 11
+OP_WHILE = 12
+OP_FUNC_DEF = 13  # number of arguments, should_auto_return
+OP_CALL = 14  # number of arguments
+OP_LIST = 15  # number of elements, pos_start, pos_end
+OP_BLOCK = 16  # pos_start, pos_end, should_return_null
+OP_RETURN = 17  # pos_start, pos_end
+OP_CONTINUE = 18  # pos_start, pos_end
+OP_BREAK = 19  # pos_start, pos_end
+
+# Nodes made of a token and up to two child nodes
+TOKEN_NODES = {
+    NumberNode: (OP_NUMBER, "tok", ()),
+    StringNode: (OP_STRING, "tok", ()),
+    VarAccessNode: (OP_VAR_ACCESS, "var_name_tok", ()),
+    ConstAccessNode: (OP_CONST_ACCESS, "var_name_tok", ()),
+    BinaryOpNode: (OP_BINARY_OP, "op_tok", ("left_node", "right_node")),
+    UnaryOpNode: (OP_UNARY_OP, "op_tok", ("node",)),
+    VarAssignNode: (OP_VAR_ASSIGN, "var_name_tok", ("value_node",)),
+    ConstAssignNode: (OP_CONST_ASSIGN, "const_name_tok", ("value_node",)),
+}
+
+
+def encode(node, base):
+    """Encodes a tree as a flat list, positions relative to base."""
+    code = []
+    emit = code.extend
+    # Nodes still to encode, and the operations of the nodes whose children
+    # are being encoded, as lists
+    stack = [node]
+    while stack:
+        obj = stack.pop()
+        cls = obj.__class__
+
+        if cls is list:
+            emit(obj)
+        elif cls in TOKEN_NODES:
+            op, token_field, fields = TOKEN_NODES[cls]
+            tok = getattr(obj, token_field)
+            stack.append(
+                [op, tok.type, tok.value, tok.pos_start - base, tok.pos_end - base]
+            )
+            stack.extend(getattr(obj, field) for field in reversed(fields))
+        elif cls is Token:
+            emit(
+                (
+                    OP_TOKEN,
+                    obj.type,
+                    obj.value,
+                    obj.pos_start - base,
+                    obj.pos_end - base,
+                )
+            )
+        elif obj is None:
+            code.append(OP_NONE)
+        elif cls is CallNode:
+            stack.append([OP_CALL, len(obj.arg_nodes)])
+            stack.extend(reversed(obj.arg_nodes))
+            stack.append(obj.node_to_call)
+        elif cls is ListNode:
+            elements = obj.element_nodes
+            stack.append(
+                [OP_LIST, len(elements), obj.pos_start - base, obj.pos_end - base]
+            )
+            stack.extend(reversed(elements))
+        elif cls is BlockNode:
+            stack.append(
+                [
+                    OP_BLOCK,
+                    obj.pos_start - base,
+                    obj.pos_end - base,
+                    obj.should_return_null,
+                ]
+            )
+            stack.append(obj.statement_nodes)
+        elif cls is IfNode:
+            stack.append([OP_IF, len(obj.cases)])
+            stack.append(obj.else_case)
+            for condition, body in reversed(obj.cases):
+                stack.append(body)
+                stack.append(condition)
+        elif cls is ForNode:
+            stack.append([OP_FOR])
+            stack.append(obj.body_node)
+            stack.append(obj.step_value_node)
+            stack.append(obj.end_value_node)
+            stack.append(obj.start_value_node)
+            stack.append(obj.var_name_tok)
+        elif cls is WhileNode:
+            stack.append([OP_WHILE])
+            stack.append(obj.body_node)
+            stack.append(obj.condition_node)
+        elif cls is FuncDefNode:
+            stack.append([OP_FUNC_DEF, len(obj.arg_name_toks), obj.should_auto_return])
+            stack.append(obj.body_node)
+            stack.extend(reversed(obj.arg_name_toks))
+            stack.append(obj.var_name_tok)
+        elif cls is ReturnNode:
+            stack.append([OP_RETURN, obj.pos_start - base, obj.pos_end - base])
+            stack.append(obj.node_to_return)
+        elif cls is ContinueNode:
+            emit((OP_CONTINUE, obj.pos_start - base, obj.pos_end - base))
+        elif cls is BreakNode:
+            emit((OP_BREAK, obj.pos_start - base, obj.pos_end - base))
+        else:
+            raise TypeError(f"can not encode {cls.__name__}")
+    return code
+
+
+def decode(code, base, source):
+    """Rebuilds the tree of encode(), for a source starting at base."""
+    # Nothing built here can be part of a cycle, collecting is a waste
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return decode_operations(code, base, source)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def decode_operations(code, base, source):
+    constants = ConstantPool()
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    i = 0
+    end = len(code)
+    while i < end:
+        op = code[i]
+        if op <= OP_CONST_ACCESS and op != OP_NONE:
+            tok = Token(
+                code[i + 1], code[i + 2], code[i + 3] + base, code[i + 4] + base
+            )
+            i += 5
+            if op == OP_BINARY_OP:
+                right = pop()
+                stack[-1] = BinaryOpNode(stack[-1], tok, right)
+            elif op == OP_VAR_ACCESS:
+                push(VarAccessNode(tok))
+            elif op == OP_NUMBER:
+                push(NumberNode(tok, constants.number(tok.value)))
+            elif op == OP_TOKEN:
+                push(tok)
+            elif op == OP_STRING:
+                push(StringNode(tok, constants.string(tok.value)))
+            elif op == OP_VAR_ASSIGN:
+                stack[-1] = VarAssignNode(tok, stack[-1])
+            elif op == OP_UNARY_OP:
+                stack[-1] = UnaryOpNode(tok, stack[-1])
+            elif op == OP_CONST_ASSIGN:
+                stack[-1] = ConstAssignNode(tok, stack[-1])
+            else:
+                push(ConstAccessNode(tok))
+        elif op == OP_NONE:
+            push(None)
+            i += 1
+        elif op == OP_CALL:
+            count = code[i + 1]
+            args = stack[len(stack) - count :]
+            del stack[len(stack) - count :]
+            stack[-1] = CallNode(stack[-1], args)
+            i += 2
+        elif op == OP_LIST:
+            count = code[i + 1]
+            elements = stack[len(stack) - count :]
+            del stack[len(stack) - count :]
+            push(ListNode(elements, code[i + 2] + base, code[i + 3] + base))
+            i += 4
+        elif op == OP_BLOCK:
+            stack[-1] = BlockNode(
+                stack[-1], code[i + 1] + base, code[i + 2] + base, code[i + 3], source
+            )
+            i += 4
+        elif op == OP_IF:
+            else_case = pop()
+            count = 2 * code[i + 1]
+            items = stack[len(stack) - count :]
+            del stack[len(stack) - count :]
+            push(IfNode(list(zip(items[::2], items[1::2])), else_case))
+            i += 2
+        elif op == OP_FOR:
+            body = pop()
+            step = pop()
+            end_value = pop()
+            start_value = pop()
+            stack[-1] = ForNode(stack[-1], start_value, end_value, step, body)
+            i += 1
+        elif op == OP_WHILE:
+            body = pop()
+            stack[-1] = WhileNode(stack[-1], body)
+            i += 1
+        elif op == OP_FUNC_DEF:
+            body = pop()
+            count = code[i + 1]
+            args = stack[len(stack) - count :]
+            del stack[len(stack) - count :]
+            stack[-1] = FuncDefNode(stack[-1], args, body, code[i + 2])
+            i += 3
+        elif op == OP_RETURN:
+            stack[-1] = ReturnNode(stack[-1], code[i + 1] + base, code[i + 2] + base)
+            i += 3
+        elif op == OP_CONTINUE:
+            push(ContinueNode(code[i + 1] + base, code[i + 2] + base))
+            i += 3
+        elif op == OP_BREAK:
+            push(BreakNode(code[i + 1] + base, code[i + 2] + base))
+            i += 3
+        else:
+            raise ValueError(f"invalid operation {op}")
+    (node,) = stack
+    return node
+
+
+def read(entry):
+    """Returns the data of an up to date cache entry, or None."""
+    try:
+        with open(entry.cache_path, "rb") as file:
+            data = file.read()
+    except OSError:
+        return None
+
+    try:
+        if not data.startswith(MAGIC):
+            return None
+        offset = len(MAGIC) + 4
+        header_size = int.from_bytes(data[len(MAGIC) : offset], "little")
+        header = marshal.loads(data[offset : offset + header_size])
+        if header[0] != CACHE_TAG:
+            return None
+        if header[1:3] != (entry.mtime, entry.size):
+            if header[3] != entry.digest:
+                return None
+            # The script was only touched, the entry is written again with
+            # its new time so that it is not hashed every time
+            entry.touched = True
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return memoryview(data)[offset + header_size :]
+
+
+def write(entry, data):
+    """Writes the data of a cache entry, if possible."""
+    header = marshal.dumps((CACHE_TAG, entry.mtime, entry.size, entry.digest))
+    data = MAGIC + len(header).to_bytes(4, "little") + header + data
+
+    directory = os.path.dirname(entry.cache_path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    except OSError:
+        # Read only directories simply go without a cache
+        return
+    try:
+        with os.fdopen(fd, "wb") as temp:
+            temp.write(data)
+        # mkstemp only lets the owner read the file
+        os.chmod(temp_path, entry.mode)
+        os.replace(temp_path, entry.cache_path)
+    except OSError:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+
+def load(entry):
+    """Returns the cached AST of a script and its source, or (None, None).
+
+    Any entry that can not be read or is out of date counts as missing.
+    """
+    data = read(entry)
+    if data is None:
+        return None, None
+    try:
+        code = marshal.loads(data)
+    except (EOFError, ValueError, TypeError):
+        return None, None
+
+    source = SOURCES.add(entry.path, None, size=entry.size, path=entry.path)
+    try:
+        node = decode(code, source.base, source)
+    except (IndexError, TypeError, ValueError, AttributeError):
+        return None, None
+    return node, source
+
+
+def store(entry, node, source):
+    """Writes the AST of a script to its cache entry, if possible."""
+    try:
+        code = marshal.dumps(encode(node, source.base))
+    except (TypeError, ValueError):
+        return
+    write(entry, code)
+
+
+def parse_file(path, parse):
+    """Returns the AST of a script file from the cache or from parse(path).
+
+    parse returns the node, the source and the error of the script like
+    run_lexer, an AST is only stored when there was no error and the
+    script did not change while it was parsed.
+    """
+    try:
+        entry = CacheEntry(path)
+    except OSError:
+        return parse(path)
+
+    node, source = load(entry)
+    if node is not None:
+        if entry.touched:
+            store(entry, node, source)
+        return node, source, None
+
+    # Hashed before parsing, what is stored is never newer than the hash
+    try:
+        entry.digest
+    except OSError:
+        return parse(path)
+    node, source, error = parse(path)
+    if error is None and not changed(entry):
+        store(entry, node, source)
+    return node, source, error
+
+
+def changed(entry):
+    try:
+        stat = os.stat(entry.path)
+    except OSError:
+        return True
+    return (stat.st_mtime_ns, stat.st_size) != (entry.mtime, entry.size)
+
+
+def compile_file(path, compile):
+    """Returns the code object of a script file from the cache or from
+    compile(path), which returns it, the source and the error like
+    parse_file. See mariachi.transpiler.
+    """
+    try:
+        entry = CacheEntry(path, PYTHON_SUFFIX)
+    except OSError:
+        return compile(path)
+
+    data = read(entry)
+    if data is not None:
+        try:
+            code = marshal.loads(data)
+        except (EOFError, ValueError, TypeError):
+            code = None
+        if code is not None:
+            if entry.touched:
+                write(entry, data)
+            source = SOURCES.add(entry.path, None, size=entry.size, path=entry.path)
+            return code, source, None
+
+    try:
+        entry.digest
+    except OSError:
+        return compile(path)
+    code, source, error = compile(path)
+    if error is None and not changed(entry):
+        write(entry, marshal.dumps(code))
+    return code, source, error
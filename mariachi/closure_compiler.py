@@ -0,0 +1,536 @@
+"""An engine that compiles the AST into nested Python closures.
+
+Every node is compiled once into a closure taking the context it runs in
+and returning its value, with what the Interpreter looks up on each visit,
+like the operation of an operator or the number of arguments of a call,
+decided at compile time. Running a program is calling its root closure.
+
+Names are resolved by mariachi.resolver first: a function keeps the names
+it binds in the slots of a SlotTable and reads them by index, and reads
+the names only the program binds from the global table directly.
+
+rompe, sigue, entrega and runtime errors raise the Unwind exceptions of
+mariachi.results instead of being checked after every node. Values,
+positions and contexts are handled exactly like in the Interpreter, so
+both engines print the same results and errors.
+"""
+
+from .token import *
+from .results import *
+from .errors import *
+from .interpreter import (
+    OPERATOR_METHODS,
+    SHORT_CIRCUITS,
+    BaseFunction,
+    Function,
+    List,
+    Number,
+    VisitMethods,
+    loop_steps,
+    make_number,
+    operation_error,
+    short_circuit,
+    unary_error,
+    value_span,
+)
+from .resolver import GLOBAL, LOCAL
+
+
+class CompiledFunction(Function):
+    """A function defined by compiled code, body is the closure of its block.
+
+    With a scope its calls keep the names it binds in a SlotTable.
+    """
+
+    def __init__(
+        self, name, body_node, arg_names, should_auto_return, body, scope=None
+    ):
+        super().__init__(name, body_node, arg_names, should_auto_return, scope)
+        self.body = body
+
+    def call(self, args, context=None, pos_start=None, pos_end=None):
+        """Runs the function and returns its value, raising on errors."""
+        exec_ctx, error = self.prepare_call(args, context, pos_start, pos_end)
+        if error:
+            raise RuntimeFailure(error)
+
+        try:
+            value = self.body(exec_ctx)
+        except ReturnValue as e:
+            return e.value
+        return value if self.should_auto_return else Number.null
+
+    def execute(self, args, context=None, pos_start=None, pos_end=None):
+        res = RTResult()
+        try:
+            return res.success(self.call(args, context, pos_start, pos_end))
+        except RuntimeFailure as e:
+            return res.failure(e.error)
+
+    def copy(self):
+        copy = CompiledFunction(
+            self.name,
+            self.body_node,
+            self.arg_names,
+            self.should_auto_return,
+            self.body,
+            self.scope,
+        )
+        copy.set_context(self.context)
+        copy.set_position(self.pos_start, self.pos_end)
+        return copy
+
+
+def call_value(value_to_call, args, context, pos_start, pos_end):
+    """Calls any value from context at pos_start to pos_end, compiled
+    functions directly and others through their execute method."""
+    if value_to_call.__class__ is CompiledFunction:
+        return value_to_call.call(args, context, pos_start, pos_end)
+    if isinstance(value_to_call, BaseFunction):
+        res = value_to_call.execute(args, context, pos_start, pos_end)
+    else:
+        # Values that can not be called report errors at their own position
+        value_to_call = value_to_call.copy().with_meta(context, pos_start, pos_end)
+        res = value_to_call.execute(args)
+    if res.error:
+        raise RuntimeFailure(res.error)
+    return res.value
+
+
+class ClosureCompiler:
+    """Compiles nodes into closures, one compile method per node class."""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.compile_methods = VisitMethods(cls, "compile_")
+
+    def __init__(self, resolution):
+        self.resolution = resolution
+        # The scope of the function being compiled, None for the program
+        self.scope = None
+
+    def setter(self, name):
+        """The slot to store a name in, None when the symbol table does."""
+        scope = self.scope
+        if scope is None or name in scope.constants:
+            return None
+        return scope.slots[name]
+
+    def getter(self, node):
+        """The closure reading the name of an access node."""
+        var_name = node.var_name_tok.value
+        pos_start, pos_end = node.pos_start, node.pos_end
+        details = f"'{var_name}' no es definido"
+        kind, slot = self.resolution.classify(var_name, self.scope)
+
+        if kind == LOCAL:
+
+            def local_access(context):
+                symbol_table = context.symbol_table
+                value = symbol_table.slots[slot]
+                if value is None:
+                    # Not bound by this call yet, it may be by a caller
+                    value = symbol_table.parent.get(var_name)
+                    if value is None:
+                        raise RuntimeFailure(
+                            EjecucionError(pos_start, pos_end, details, context)
+                        )
+                return value
+
+            return local_access
+
+        if kind == GLOBAL and self.scope is not None:
+            symbol_table = self.resolution.symbol_table
+            function_names = self.resolution.function_names
+
+            def global_access(context):
+                if var_name in function_names:
+                    # Bound by a function of a program run since
+                    value = context.symbol_table.get(var_name)
+                else:
+                    value = symbol_table.get(var_name)
+                if value is None:
+                    raise RuntimeFailure(
+                        EjecucionError(pos_start, pos_end, details, context)
+                    )
+                return value
+
+            return global_access
+
+        def var_access(context):
+            value = context.symbol_table.get(var_name)
+            if value is None:
+                raise RuntimeFailure(
+                    EjecucionError(pos_start, pos_end, details, context)
+                )
+            return value
+
+        return var_access
+
+    def compile(self, node):
+        return self.compile_methods[node.__class__](self, node)
+
+    def no_visit_method(self, node):
+        raise Exception(f"No compile_{type(node).__name__} method defined.")
+
+    def compile_NumberNode(self, node):
+        value = node.value
+
+        def number(context):
+            return value
+
+        return number
+
+    def compile_StringNode(self, node):
+        value = node.value
+
+        def string(context):
+            return value
+
+        return string
+
+    def compile_BinaryOpNode(self, node):
+        left_node = self.compile(node.left_node)
+        right_node = self.compile(node.right_node)
+        pos_start, pos_end = node.pos_start, node.pos_end
+        left_span = value_span(node.left_node)
+        right_span = value_span(node.right_node)
+        method = OPERATOR_METHODS.get(node.op_tok.type)
+        operation = node.operation
+
+        if operation is None:
+            details = f"Operador desconocido '{node.op_tok}'"
+
+            def unknown_operator(context):
+                left_node(context)
+                right_node(context)
+                raise RuntimeFailure(
+                    EjecucionError(pos_start, pos_end, details, context)
+                )
+
+            return unknown_operator
+
+        if node.op_tok.type in SHORT_CIRCUITS:
+            op_type = node.op_tok.type
+
+            def short_circuit_op(context):
+                left = left_node(context)
+                result = short_circuit(op_type, left)
+                if result is not None:
+                    return result
+                right = right_node(context)
+                result, error = operation(left, right)
+                if error:
+                    raise RuntimeFailure(
+                        operation_error(
+                            left, right, method, context, left_span, right_span
+                        )
+                    )
+                return result
+
+            return short_circuit_op
+
+        def binary_op(context):
+            left = left_node(context)
+            right = right_node(context)
+            result, error = operation(left, right)
+            if error:
+                raise RuntimeFailure(
+                    operation_error(left, right, method, context, left_span, right_span)
+                )
+            return result
+
+        return binary_op
+
+    def compile_UnaryOpNode(self, node):
+        operand = self.compile(node.node)
+        span = value_span(node.node)
+
+        if node.op_tok.type == TT_MINUS:
+
+            def negative(context):
+                value = operand(context)
+                number, error = value.multed_by(make_number(-1))
+                if error:
+                    raise RuntimeFailure(unary_error(value, TT_MINUS, context, span))
+                return number
+
+            return negative
+
+        if node.op_tok.type == TT_JAMAS:
+
+            def jamas(context):
+                value = operand(context)
+                number, error = value.notted()
+                if error:
+                    raise RuntimeFailure(unary_error(value, TT_JAMAS, context, span))
+                return number
+
+            return jamas
+
+        return operand
+
+    def compile_VarAssignNode(self, node):
+        var_name = node.var_name_tok.value
+        value_node = self.compile(node.value_node)
+        slot = self.setter(var_name)
+
+        if slot is not None:
+
+            def local_assign(context):
+                value = value_node(context)
+                context.symbol_table.slots[slot] = value
+                return value
+
+            return local_assign
+
+        def var_assign(context):
+            value = value_node(context)
+            context.symbol_table.set(var_name, value)
+            return value
+
+        return var_assign
+
+    def compile_VarAccessNode(self, node):
+        return self.getter(node)
+
+    def compile_ConstAssignNode(self, node):
+        name = node.const_name_tok.value
+        value_node = self.compile(node.value_node)
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def const_assign(context):
+            value = value_node(context)
+            try:
+                context.symbol_table.set_const(name, value)
+            except Exception as e:
+                raise RuntimeFailure(
+                    EjecucionError(pos_start, pos_end, str(e), context)
+                )
+            return value
+
+        return const_assign
+
+    def compile_ConstAccessNode(self, node):
+        return self.getter(node)
+
+    def compile_IfNode(self, node):
+        cases = [
+            (self.compile(condition), self.compile(expr))
+            for condition, expr in node.cases
+        ]
+        else_case = self.compile(node.else_case) if node.else_case else None
+
+        def if_(context):
+            for condition, expr in cases:
+                if condition(context).is_true():
+                    return expr(context)
+            if else_case:
+                return else_case(context)
+            return Number.null
+
+        return if_
+
+    def compile_ForNode(self, node):
+        var_name = node.var_name_tok.value
+        start_value_node = self.compile(node.start_value_node)
+        end_value_node = self.compile(node.end_value_node)
+        step_value_node = None
+        if node.step_value_node:
+            step_value_node = self.compile(node.step_value_node)
+        body_node = self.compile(node.body_node)
+        pos_start, pos_end = node.pos_start, node.pos_end
+        slot = self.setter(var_name)
+        # The values of the body are only kept when the loop has a value
+        keep = not self.resolution.discards(node)
+        quiet_counter = self.resolution.quiet_counter
+
+        def for_(context):
+            elements = [] if keep else None
+            start_value = start_value_node(context)
+            end_value = end_value_node(context)
+            if step_value_node:
+                step_value = step_value_node(context)
+            else:
+                step_value = Number(1)
+
+            symbol_table = context.symbol_table
+            # Past the first step, the variable of a quiet loop is set on
+            # leaving
+            quiet = quiet_counter(node)
+            write = True
+            i = None
+
+            for i in loop_steps(start_value.value, end_value.value, step_value.value):
+                if write:
+                    if slot is None:
+                        symbol_table.set(var_name, make_number(i))
+                    else:
+                        symbol_table.slots[slot] = make_number(i)
+                    write = not quiet
+                try:
+                    value = body_node(context)
+                except ContinueLoop:
+                    continue
+                except BreakLoop:
+                    break
+                if keep:
+                    elements.append(value)
+            if quiet and i is not None:
+                if slot is None:
+                    symbol_table.set(var_name, make_number(i))
+                else:
+                    symbol_table.slots[slot] = make_number(i)
+            if not keep:
+                return Number.null
+            return List(elements).with_meta(context, pos_start, pos_end)
+
+        return for_
+
+    def compile_WhileNode(self, node):
+        condition_node = self.compile(node.condition_node)
+        body_node = self.compile(node.body_node)
+        pos_start, pos_end = node.pos_start, node.pos_end
+        keep = not self.resolution.discards(node)
+
+        def while_(context):
+            elements = [] if keep else None
+            while condition_node(context).is_true():
+                try:
+                    value = body_node(context)
+                except ContinueLoop:
+                    continue
+                except BreakLoop:
+                    break
+                if keep:
+                    elements.append(value)
+            if not keep:
+                return Number.null
+            return List(elements).with_meta(context, pos_start, pos_end)
+
+        return while_
+
+    def compile_FuncDefNode(self, node):
+        func_name = node.var_name_tok.value if node.var_name_tok else None
+        body_node = node.body_node
+        arg_names = [arg_name.value for arg_name in node.arg_name_toks]
+        should_auto_return = node.should_auto_return
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        scope, self.scope = self.scope, self.resolution.scope(node)
+        try:
+            body = self.compile(body_node)
+        finally:
+            scope, self.scope = self.scope, scope
+        slot = self.setter(func_name) if func_name else None
+
+        def func_def(context):
+            func_value = CompiledFunction(
+                func_name, body_node, arg_names, should_auto_return, body, scope
+            ).with_meta(context, pos_start, pos_end)
+            if slot is not None:
+                context.symbol_table.slots[slot] = func_value
+            elif func_name:
+                context.symbol_table.set(func_name, func_value)
+            return func_value
+
+        return func_def
+
+    def compile_CallNode(self, node):
+        node_to_call = self.compile(node.node_to_call)
+        arg_nodes = [self.compile(arg_node) for arg_node in node.arg_nodes]
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        if len(arg_nodes) == 0:
+
+            def call(context):
+                return call_value(
+                    node_to_call(context), [], context, pos_start, pos_end
+                )
+
+        elif len(arg_nodes) == 1:
+            (arg_node,) = arg_nodes
+
+            def call(context):
+                value_to_call = node_to_call(context)
+                args = [arg_node(context)]
+                return call_value(value_to_call, args, context, pos_start, pos_end)
+
+        elif len(arg_nodes) == 2:
+            first_node, second_node = arg_nodes
+
+            def call(context):
+                value_to_call = node_to_call(context)
+                args = [first_node(context), second_node(context)]
+                return call_value(value_to_call, args, context, pos_start, pos_end)
+
+        else:
+
+            def call(context):
+                value_to_call = node_to_call(context)
+                args = [arg_node(context) for arg_node in arg_nodes]
+                return call_value(value_to_call, args, context, pos_start, pos_end)
+
+        return call
+
+    def compile_ListNode(self, node):
+        element_nodes = [self.compile(element) for element in node.element_nodes]
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def list_(context):
+            elements = [element_node(context) for element_node in element_nodes]
+            return List(elements).with_meta(context, pos_start, pos_end)
+
+        return list_
+
+    def compile_BlockNode(self, node):
+        statements = [
+            self.compile(statement) for statement in node.statement_nodes.element_nodes
+        ]
+
+        def block(context):
+            result = None
+            for statement in statements:
+                result = statement(context)
+            return result or Number.null
+
+        return block
+
+    def compile_ReturnNode(self, node):
+        node_to_return = None
+        if node.node_to_return:
+            node_to_return = self.compile(node.node_to_return)
+
+        def return_(context):
+            if node_to_return:
+                raise ReturnValue(node_to_return(context))
+            raise ReturnValue(Number.null)
+
+        return return_
+
+    def compile_ContinueNode(self, node):
+        def continue_(context):
+            raise ContinueLoop
+
+        return continue_
+
+    def compile_BreakNode(self, node):
+        def break_(context):
+            raise BreakLoop
+
+        return break_
+
+
+ClosureCompiler.compile_methods = VisitMethods(ClosureCompiler, "compile_")
+
+
+def execute(ast, context, resolution):
+    """Compiles and runs a resolved AST, returns its value and error."""
+    code = ClosureCompiler(resolution).compile(ast)
+    try:
+        return code(context), None
+    except RuntimeFailure as e:
+        return None, e.error
+    except Unwind:
+        # rompe, sigue and entrega outside of loops and functions
+        return None, None
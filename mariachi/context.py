@@ -1,6 +1,9 @@
 class Context:
     """The context for the runtime of a Mariachi Lang program."""
 
+    # One is made for every call
+    __slots__ = ("display_name", "parent", "parent_entry_pos", "symbol_table")
+
     def __init__(self, display_name, parent=None, parent_entry_pos=None):
         self.display_name = display_name
         self.parent = parent
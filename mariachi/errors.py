@@ -1,3 +1,6 @@
+from .source import SOURCES
+
+
 class Error:
     """The custom error classes of the Mariachi Lang."""
 
@@ -6,14 +9,29 @@ class Error:
         self.pos_end = pos_end
         self.error_name = error_name
         self.details = details
+        # Keeps the source text alive until the error has been displayed
+        self.source = SOURCES.lookup(pos_start)
+        # Only the file name is left once the source has been collected
+        self.fn = SOURCES.name(pos_start)
+
+    def resolve(self):
+        """Resolves the integer positions of the error to line and column."""
+        start = self.source.position(self.pos_start)
+        if self.pos_end is not None and self.source.contains(self.pos_end):
+            end = self.source.end_position(self.pos_end)
+        else:
+            end = self.source.end_position(self.pos_start + 1)
+        return start, end
 
     def as_string(self):
         """Converts our error type into a string with provided details."""
         result = f"{self.error_name}: {self.details}"
-        result += f"\nFile {self.pos_start.fn}, line {self.pos_end.ln} + 1"
-        result += "\n" + string_with_arrows(
-            self.pos_start.ftxt, self.pos_start, self.pos_end
-        )
+        if self.source:
+            pos_start, pos_end = self.resolve()
+            result += f"\nFile {pos_start.fn}, line {pos_end.ln} + 1"
+            result += "\n" + string_with_arrows(pos_start.ftxt, pos_start, pos_end)
+        elif self.fn:
+            result += f"\nFile {self.fn}"
         return result
 
 
@@ -42,13 +60,21 @@ class EjecucionError(Error):
     def __init__(self, pos_start, pos_end, details, context):
         super().__init__(pos_start, pos_end, "Ejecucion error", details)
         self.context = context
+        # Keeps the sources of every frame of the traceback alive too
+        self.frame_sources = []
+        self.frame_names = []
+        while context:
+            self.frame_sources.append(SOURCES.lookup(pos_start))
+            self.frame_names.append(SOURCES.name(pos_start))
+            pos_start = context.parent_entry_pos
+            context = context.parent
 
     def as_string(self):
         result = self.generate_traceback()
         result += f"{self.error_name}: {self.details}"
-        result += "\n" + string_with_arrows(
-            self.pos_start.ftxt, self.pos_start, self.pos_end
-        )
+        if self.source:
+            pos_start, pos_end = self.resolve()
+            result += "\n" + string_with_arrows(pos_start.ftxt, pos_start, pos_end)
         return result
 
     def generate_traceback(self):
@@ -57,11 +83,15 @@ class EjecucionError(Error):
         pos = self.pos_start
         ctx = self.context
 
-        while ctx:
-            result = (
-                f" Archivo {pos.fn}, linea {str(pos.ln + 1)}, en {ctx.display_name}\n"
-                + result
-            )
+        for source, fn in zip(self.frame_sources, self.frame_names):
+            if source:
+                pos_ = source.position(pos)
+                result = (
+                    f" Archivo {pos_.fn}, linea {str(pos_.ln + 1)}, en {ctx.display_name}\n"
+                    + result
+                )
+            elif fn:
+                result = f" Archivo {fn}, en {ctx.display_name}\n" + result
             pos = ctx.parent_entry_pos
             ctx = ctx.parent
         return "Retrazo (funcion mas reciente):\n" + result
@@ -0,0 +1,356 @@
+"""Generates the LL(1) tables of the table parser from grammar/grammar.txt.
+
+    python -m mariachi.grammar
+
+rewrites mariachi/ll1_tables.py. The repetitions, options and groups of
+the grammar are turned into helper nonterminals whose children belong to
+the rule they come from, so the table parser only builds nodes for the
+rules written in the grammar.
+"""
+
+import os
+import re
+
+from .token import KEYWORDS
+from . import token
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GRAMMAR_PATH = os.path.join(HERE, os.pardir, "grammar", "grammar.txt")
+TABLES_PATH = os.path.join(HERE, "ll1_tables.py")
+
+# Nonterminals are numbered from here on, below are the token types
+NONTERMINAL_BASE = 100
+
+RULE_RE = re.compile(r"^([a-z_]+)\s*:(?=\s)", re.MULTILINE)
+ITEM_RE = re.compile(r"\s*(?:(KEYWORD:[a-z]+|[A-Za-z_]+)|([|()*+?]))")
+
+
+class GrammarError(Exception):
+    pass
+
+
+def read_grammar(text):
+    """Reads the rules of a grammar as {name: alternatives}.
+
+    Every alternative is a list of items, an item is a symbol name, or a
+    tuple (operator, alternatives) for a repetition, option or group.
+    """
+    text = "\n".join(line.split("#")[0].rstrip() for line in text.splitlines())
+    headers = list(RULE_RE.finditer(text))
+    if not headers or text[: headers[0].start()].strip():
+        raise GrammarError("the grammar must start with a rule")
+
+    rules = {}
+    for header, next_header in zip(headers, headers[1:] + [None]):
+        name = header.group(1)
+        if name in rules:
+            raise GrammarError(f"rule {name} is defined twice")
+        body = text[header.end() : next_header.start() if next_header else None]
+        items = tokenize(name, body)
+        alternatives = read_alternatives(name, items)
+        if items:
+            raise GrammarError(f"unexpected {items[0]!r} in rule {name}")
+        rules[name] = alternatives
+    return rules
+
+
+def tokenize(name, body):
+    items = []
+    pos = 0
+    body = body.rstrip()
+    while pos < len(body):
+        match = ITEM_RE.match(body, pos)
+        if not match:
+            raise GrammarError(f"invalid character {body[pos]!r} in rule {name}")
+        items.append(match.group(1) or match.group(2))
+        pos = match.end()
+    # The items are consumed from the end of the list
+    items.reverse()
+    return items
+
+
+def read_alternatives(name, items):
+    alternatives = [read_sequence(name, items)]
+    while items and items[-1] == "|":
+        items.pop()
+        alternatives.append(read_sequence(name, items))
+    return alternatives
+
+
+def read_sequence(name, items):
+    sequence = []
+    while items and items[-1] not in ("|", ")"):
+        item = items.pop()
+        if item == "(":
+            item = ("()", read_alternatives(name, items))
+            if not items or items.pop() != ")":
+                raise GrammarError(f"')' expected in rule {name}")
+        elif item in ("*", "+", "?"):
+            raise GrammarError(f"nothing to repeat with {item!r} in rule {name}")
+        while items and items[-1] in ("*", "+", "?"):
+            # A repeated group repeats its alternatives
+            if isinstance(item, tuple) and item[0] == "()":
+                item = (items.pop(), item[1])
+            else:
+                item = (items.pop(), [[item]])
+        sequence.append(item)
+    if not sequence and items and items[-1] == "|":
+        raise GrammarError(f"empty alternative in rule {name}")
+    return sequence
+
+
+class Grammar:
+    """A grammar in plain BNF, with symbols numbered like the table parser's.
+
+    Terminals are the token types, nonterminals are numbered from
+    NONTERMINAL_BASE with the rules of the grammar first.
+    """
+
+    def __init__(self, rules):
+        self.names = list(rules)
+        self.ids = {name: NONTERMINAL_BASE + i for i, name in enumerate(self.names)}
+        self.groups = set()
+        # Productions as (nonterminal, symbols)
+        self.productions = []
+        # Productions that may be skipped when their lookahead is taken
+        self.optional = set()
+        self.helper_count = {}
+
+        for name, alternatives in rules.items():
+            for alternative in alternatives:
+                self.add(self.ids[name], self.symbols(name, alternative))
+
+        self.first, self.nullable = self.compute_first()
+        self.follow = self.compute_follow()
+        self.table = self.compute_table()
+
+    def add(self, lhs, symbols, optional=False):
+        if optional:
+            self.optional.add(len(self.productions))
+        self.productions.append((lhs, tuple(symbols)))
+
+    def helper(self, name):
+        """Creates a new nonterminal grouping items of rule name."""
+        count = self.helper_count[name] = self.helper_count.get(name, 0) + 1
+        helper_name = f"{name}.{count}"
+        self.names.append(helper_name)
+        self.ids[helper_name] = NONTERMINAL_BASE + len(self.names) - 1
+        self.groups.add(self.ids[helper_name])
+        return self.ids[helper_name]
+
+    def symbols(self, name, sequence):
+        symbols = []
+        for item in sequence:
+            if isinstance(item, str):
+                symbols.append(self.symbol(item))
+                continue
+
+            operator, alternatives = item
+            helper = self.helper(name)
+            if operator == "*":
+                for alternative in alternatives:
+                    self.add(helper, self.symbols(name, alternative) + [helper])
+                self.add(helper, [], optional=True)
+            elif operator == "+":
+                repeat = self.helper(name)
+                for alternative in alternatives:
+                    self.add(helper, self.symbols(name, alternative) + [repeat])
+                    self.add(repeat, self.symbols(name, alternative) + [repeat])
+                self.add(repeat, [], optional=True)
+            elif operator == "?":
+                for alternative in alternatives:
+                    self.add(helper, self.symbols(name, alternative))
+                self.add(helper, [], optional=True)
+            else:
+                for alternative in alternatives:
+                    self.add(helper, self.symbols(name, alternative))
+            symbols.append(helper)
+        return symbols
+
+    def symbol(self, item):
+        if item.startswith("KEYWORD:"):
+            keyword = item[len("KEYWORD:") :]
+            if keyword not in KEYWORDS:
+                raise GrammarError(f"unknown keyword {keyword!r}")
+            return KEYWORDS[keyword]
+        if item.isupper():
+            type_ = getattr(token, "TT_" + item, None)
+            if type_ is None:
+                raise GrammarError(f"unknown token {item}")
+            return type_
+        if item not in self.ids:
+            raise GrammarError(f"unknown rule {item}")
+        return self.ids[item]
+
+    def is_terminal(self, symbol):
+        return symbol < NONTERMINAL_BASE
+
+    def compute_first(self):
+        first = {nt: set() for nt in self.ids.values()}
+        nullable = set()
+        changed = True
+        while changed:
+            changed = False
+            for lhs, symbols in self.productions:
+                before = (len(first[lhs]), lhs in nullable)
+                for symbol in symbols:
+                    if self.is_terminal(symbol):
+                        first[lhs].add(symbol)
+                        break
+                    first[lhs] |= first[symbol]
+                    if symbol not in nullable:
+                        break
+                else:
+                    nullable.add(lhs)
+                changed |= before != (len(first[lhs]), lhs in nullable)
+        return first, nullable
+
+    def first_of(self, symbols):
+        """The first terminals of a sequence, and whether it can be empty."""
+        result = set()
+        for symbol in symbols:
+            if self.is_terminal(symbol):
+                result.add(symbol)
+                return result, False
+            result |= self.first[symbol]
+            if symbol not in self.nullable:
+                return result, False
+        return result, True
+
+    def compute_follow(self):
+        follow = {nt: set() for nt in self.ids.values()}
+        changed = True
+        while changed:
+            changed = False
+            for lhs, symbols in self.productions:
+                for i, symbol in enumerate(symbols):
+                    if self.is_terminal(symbol):
+                        continue
+                    rest, nullable = self.first_of(symbols[i + 1 :])
+                    if nullable:
+                        rest |= follow[lhs]
+                    if not rest <= follow[symbol]:
+                        follow[symbol] |= rest
+                        changed = True
+        return follow
+
+    def compute_table(self):
+        """Builds {nonterminal: {token type: production}}.
+
+        A production that skips a repetition or option loses against the
+        ones that continue it, so repetitions are greedy like the loops of
+        the recursive parser. Any other conflict is an error.
+        """
+        table = {nt: {} for nt in self.ids.values()}
+        for number, (lhs, symbols) in enumerate(self.productions):
+            lookahead, nullable = self.first_of(symbols)
+            if nullable:
+                lookahead |= self.follow[lhs]
+            row = table[lhs]
+            for type_ in lookahead:
+                if type_ in row and row[type_] != number:
+                    if number in self.optional:
+                        continue
+                    if row[type_] not in self.optional:
+                        raise GrammarError(
+                            f"conflict in {self.names[lhs - NONTERMINAL_BASE]} "
+                            f"on {token.TOKEN_NAMES[type_]}"
+                        )
+                row[type_] = number
+        return table
+
+    def describe(self, symbols):
+        return " ".join(self.symbol_name(symbol) for symbol in symbols) or "<empty>"
+
+    def symbol_name(self, symbol):
+        if self.is_terminal(symbol):
+            return TOKEN_CONSTANTS[symbol]
+        return self.names[symbol - NONTERMINAL_BASE]
+
+
+# The names of the token type constants, in the order of their values
+TOKEN_CONSTANTS = sorted(
+    (name for name in dir(token) if name.startswith("TT_")),
+    key=lambda name: getattr(token, name),
+)
+
+
+def generate(grammar_text):
+    """Returns the source of the tables module for a grammar."""
+    grammar = Grammar(read_grammar(grammar_text))
+    lines = [
+        "# Generated by mariachi.grammar from grammar/grammar.txt, do not edit.",
+        "",
+        "from .token import *",
+        "",
+        f"NONTERMINAL_BASE = {NONTERMINAL_BASE}",
+        "",
+        "# Nonterminals, numbered from NONTERMINAL_BASE",
+        "NONTERMINALS = [",
+    ]
+    lines += [f'    "{name}",' for name in grammar.names]
+    lines += [
+        "]",
+        "",
+        "# Helper nonterminals, their children belong to the rule they come from",
+        "GROUPS = frozenset(",
+        "    (",
+    ]
+    lines += [
+        f"        {nt},  # {grammar.symbol_name(nt)}" for nt in sorted(grammar.groups)
+    ]
+    lines += [
+        "    )",
+        ")",
+        "",
+        "START = " + str(grammar.ids[grammar.names[0]]),
+        "",
+        "# Productions as (nonterminal, symbols)",
+        "PRODUCTIONS = [",
+    ]
+    for number, (lhs, symbols) in enumerate(grammar.productions):
+        names = ", ".join(
+            grammar.symbol_name(s) if grammar.is_terminal(s) else str(s)
+            for s in symbols
+        )
+        if len(symbols) == 1:
+            names += ","
+        lines.append(
+            f"    # {number}: {grammar.symbol_name(lhs)} -> {grammar.describe(symbols)}"
+        )
+        lines.append(f"    ({lhs}, ({names})),")
+    lines += [
+        "]",
+        "",
+        "# The production to expand a nonterminal with, by lookahead token type",
+        "TABLE = {",
+    ]
+    for nt, row in grammar.table.items():
+        lines.append(f"    {nt}: {{  # {grammar.symbol_name(nt)}")
+        for type_ in sorted(row):
+            lines.append(f"        {TOKEN_CONSTANTS[type_]}: {row[type_]},")
+        lines.append("    },")
+    lines += [
+        "}",
+        "",
+        "# The production that skips a repetition or option, taken on any other",
+        "# lookahead so that a syntax error is reported where something is missing",
+        "DEFAULTS = {",
+    ]
+    for number in sorted(grammar.optional):
+        lhs = grammar.productions[number][0]
+        lines.append(f"    {lhs}: {number},  # {grammar.symbol_name(lhs)}")
+    lines += ["}", ""]
+    return "\n".join(lines)
+
+
+def main():
+    with open(GRAMMAR_PATH, encoding="utf-8") as file:
+        source = generate(file.read())
+    with open(TABLES_PATH, "w", encoding="utf-8") as file:
+        file.write(source)
+    print(f"wrote {os.path.relpath(TABLES_PATH)}")
+
+
+if __name__ == "__main__":
+    main()
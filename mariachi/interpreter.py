@@ -1,3 +1,4 @@
+import operator
 import os
 
 from .token import *
@@ -5,65 +6,71 @@ from .results import *
 from .context import *
 from .errors import *
 
+# The method of the left operand called by each binary operator
+OPERATOR_METHODS = {
+    TT_PLUS: "added_to",
+    TT_MINUS: "subbed_by",
+    TT_MUL: "multed_by",
+    TT_DIV: "divided_by",
+    TT_POW: "power_by",
+    TT_MOD: "modulo_by",
+    TT_FLOORDIV: "floordiv_by",
+    TT_NE: "get_comparison_ne",
+    TT_EE: "get_comparison_eq",
+    TT_LT: "get_comparison_lt",
+    TT_LTE: "get_comparison_lte",
+    TT_GT: "get_comparison_gt",
+    TT_GTE: "get_comparison_gte",
+    TT_Y: "anded_by",
+    TT_O: "ored_by",
+}
+
+# The operators whose right operand is only evaluated when the left one
+# does not decide their value, see short_circuit()
+SHORT_CIRCUITS = frozenset((TT_Y, TT_O))
+
 
 class Interpreter:
-    """The interpreter for the Mariachi Lang toy language."""
+    """The interpreter for the Mariachi Lang toy language.
+
+    With the resolution of the program, the functions it defines keep the
+    names they bind in the slots of a SlotTable.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Subclasses may override visit methods
+        cls.visit_methods = VisitMethods(cls)
+
+    def __init__(self, resolution=None):
+        self.resolution = resolution
 
     def visit(self, node, context):
-        # Creates method name from the node classes
-        method_name = f"visit_{type(node).__name__}"
-        # The get attribute method returns a named attribute from an object
-        method = getattr(self, method_name, self.no_visit_method)
-        return method(node, context)
+        # A single lookup in the table of the visit methods by node class
+        return self.visit_methods[node.__class__](self, node, context)
 
     def no_visit_method(self, node, context):
         raise Exception(f"No visit_{type(node).__name__} method defined.")
 
     def visit_NumberNode(self, node, context):
-        return RTResult().success(
-            Number(node.tok.value).with_meta(context, node.pos_start, node.pos_end)
-        )
+        return RTResult().success(node.value)
 
     def visit_BinaryOpNode(self, node, context):
         res = RTResult()
         left = res.register(self.visit(node.left_node, context))
         if res.should_return():
             return res
+        if node.op_tok.type in SHORT_CIRCUITS:
+            result = short_circuit(node.op_tok.type, left)
+            if result is not None:
+                return res.success(result)
         right = res.register(self.visit(node.right_node, context))
         if res.should_return():
             return res
 
-        if node.op_tok.type == TT_PLUS:
-            result, error = left.added_to(right)
-        elif node.op_tok.type == TT_MINUS:
-            result, error = left.subbed_by(right)
-        elif node.op_tok.type == TT_MUL:
-            result, error = left.multed_by(right)
-        elif node.op_tok.type == TT_DIV:
-            result, error = left.divided_by(right)
-        elif node.op_tok.type == TT_POW:
-            result, error = left.power_by(right)
-        elif node.op_tok.type == TT_MOD:
-            result, error = left.modulo_by(right)
-        elif node.op_tok.type == TT_FLOORDIV:
-            result, error = left.floordiv_by(right)
-        elif node.op_tok.type == TT_NE:
-            result, error = left.get_comparison_ne(right)
-        elif node.op_tok.type == TT_EE:
-            result, error = left.get_comparison_eq(right)
-        elif node.op_tok.type == TT_LT:
-            result, error = left.get_comparison_lt(right)
-        elif node.op_tok.type == TT_LTE:
-            result, error = left.get_comparison_lte(right)
-        elif node.op_tok.type == TT_GT:
-            result, error = left.get_comparison_gt(right)
-        elif node.op_tok.type == TT_GTE:
-            result, error = left.get_comparison_gte(right)
-        elif node.op_tok.matches(TT_KEYWORD, "y"):
-            result, error = left.anded_by(right)
-        elif node.op_tok.matches(TT_KEYWORD, "o"):
-            result, error = left.ored_by(right)
-        else:
+        # Picked from BINARY_OPERATIONS when the node was made
+        operation = node.operation
+        if operation is None:
             return res.failure(
                 EjecucionError(
                     node.pos_start,
@@ -73,9 +80,19 @@ class Interpreter:
                 )
             )
 
+        result, error = operation(left, right)
         if error:
-            return res.failure(error)
-        return res.success(result.set_position(node.pos_start, node.pos_end))
+            return res.failure(
+                operation_error(
+                    left,
+                    right,
+                    OPERATOR_METHODS[node.op_tok.type],
+                    context,
+                    value_span(node.left_node),
+                    value_span(node.right_node),
+                )
+            )
+        return res.success(result)
 
     def visit_UnaryOpNode(self, node, context):
         res = RTResult()
@@ -83,16 +100,18 @@ class Interpreter:
         if res.should_return():
             return res
 
-        error = None
+        result, error = number, None
 
         if node.op_tok.type == TT_MINUS:
-            number, error = number.multed_by(Number(-1))
-        elif node.op_tok.matches(TT_KEYWORD, "jamas"):
-            number, error = number.notted()
+            result, error = number.multed_by(make_number(-1))
+        elif node.op_tok.type == TT_JAMAS:
+            result, error = number.notted()
 
         if error:
-            return res.failure(error)
-        return res.success(number.set_position(node.pos_start, node.pos_end))
+            return res.failure(
+                unary_error(number, node.op_tok.type, context, value_span(node.node))
+            )
+        return res.success(result)
 
     def visit_VarAssignNode(self, node, context):
         res = RTResult()
@@ -118,9 +137,6 @@ class Interpreter:
                     context,
                 )
             )
-        value = (
-            value.copy().set_position(node.pos_start, node.pos_end).set_context(context)
-        )
         return res.success(value)
 
     def visit_ConstAssignNode(self, node, context):
@@ -153,7 +169,6 @@ class Interpreter:
                     context,
                 )
             )
-        value = value.copy().set_position(node.pos_start, node.pos_end)
         return res.success(value)
 
     def visit_IfNode(self, node, context):
@@ -181,7 +196,8 @@ class Interpreter:
 
     def visit_ForNode(self, node, context):
         res = RTResult()
-        elements = []
+        # None when the value of the loop is never used
+        elements = None if self.resolution and self.resolution.discards(node) else []
 
         start_value = res.register(self.visit(node.start_value_node, context))
         if res.should_return():
@@ -198,16 +214,17 @@ class Interpreter:
         else:
             step_value = Number(1)
 
-        i = start_value.value
-
-        if step_value.value >= 0:
-            condition = lambda: i < end_value.value
-        else:
-            condition = lambda: i > end_value.value
+        name = node.var_name_tok.value
+        symbol_table = context.symbol_table
+        # Past the first step, the variable of a quiet loop is set on leaving
+        quiet = self.resolution is not None and self.resolution.quiet_counter(node)
+        write = True
+        i = None
 
-        while condition():
-            context.symbol_table.set(node.var_name_tok.value, Number(i))
-            i += step_value.value
+        for i in loop_steps(start_value.value, end_value.value, step_value.value):
+            if write:
+                symbol_table.set(name, make_number(i))
+                write = not quiet
 
             value = res.register(self.visit(node.body_node, context))
             if (
@@ -223,7 +240,12 @@ class Interpreter:
             if res.loop_should_break:
                 break
 
-            elements.append(value)
+            if elements is not None:
+                elements.append(value)
+        if quiet and i is not None:
+            symbol_table.set(name, make_number(i))
+        if elements is None:
+            return res.success(Number.null)
         return res.success(
             List(elements).with_meta(
                 context, pos_start=node.pos_start, pos_end=node.pos_end
@@ -232,7 +254,7 @@ class Interpreter:
 
     def visit_WhileNode(self, node, context):
         res = RTResult()
-        elements = []
+        elements = None if self.resolution and self.resolution.discards(node) else []
         while True:
             condition = res.register(self.visit(node.condition_node, context))
             if res.should_return():
@@ -255,7 +277,10 @@ class Interpreter:
             if res.loop_should_break:
                 break
 
-            elements.append(value)
+            if elements is not None:
+                elements.append(value)
+        if elements is None:
+            return res.success(Number.null)
         return res.success(
             List(elements).with_meta(
                 context, pos_start=node.pos_start, pos_end=node.pos_end
@@ -268,8 +293,9 @@ class Interpreter:
         func_name = node.var_name_tok.value if node.var_name_tok else None
         body_node = node.body_node
         arg_name = [arg_name.value for arg_name in node.arg_name_toks]
+        scope = self.resolution.scope(node) if self.resolution else None
         func_value = Function(
-            func_name, body_node, arg_name, node.should_auto_return
+            func_name, body_node, arg_name, node.should_auto_return, scope
         ).with_meta(context, node.pos_start, node.pos_end)
 
         if node.var_name_tok:
@@ -285,25 +311,52 @@ class Interpreter:
         if res.should_return():
             return res
 
-        value_to_call = value_to_call.copy().set_position(node.pos_start, node.pos_end)
-
         for arg_node in node.arg_nodes:
             args.append(res.register(self.visit(arg_node, context)))
             if res.should_return():
                 return res
 
-        return_value = res.register(value_to_call.execute(args))
+        if value_to_call.__class__ is Function:
+            return self.call_function(value_to_call, args, context, node)
+        if isinstance(value_to_call, BaseFunction):
+            # Called from here without a positioned copy of the function
+            return_value = res.register(
+                value_to_call.execute(args, context, node.pos_start, node.pos_end)
+            )
+        else:
+            value_to_call = value_to_call.copy().with_meta(
+                context, node.pos_start, node.pos_end
+            )
+            return_value = res.register(value_to_call.execute(args))
         if res.should_return():
             return res
-        return_value = return_value.copy().with_meta(
-            context, node.pos_start, node.pos_end
-        )
         return res.success(return_value)
 
-    def visit_StringNode(self, node, context):
-        return RTResult().success(
-            String(node.tok.value).with_meta(context, node.pos_start, node.pos_end)
+    def call_function(self, function, args, context, node):
+        """Runs a call of a function defined by the Interpreter, on this
+        interpreter and without copying the function."""
+        res = RTResult()
+        if len(args) != len(function.arg_names):
+            return res.failure(
+                function.copy()
+                .with_meta(context, node.pos_start, node.pos_end)
+                .check_args(function.arg_names, args)
+                .error
+            )
+
+        exec_ctx = function.frame(args, context, node.pos_start)
+        value = res.register(self.visit(function.body_node, exec_ctx))
+        if res.should_return() and res.func_return_value == None:
+            return res
+        ret_value = (
+            (value if function.should_auto_return else None)
+            or res.func_return_value
+            or Number.null
         )
+        return res.success(ret_value)
+
+    def visit_StringNode(self, node, context):
+        return RTResult().success(node.value)
 
     def visit_ListNode(self, node, context):
         res = RTResult()
@@ -348,6 +401,132 @@ class Interpreter:
         return res.success_continue()
 
 
+class VisitMethods(dict):
+    """The visit method of an interpreter class for each node class.
+
+    Methods are found by the name of the node class the first time a class
+    is visited, views of a NodeStore get the methods of their nodes.
+    """
+
+    def __init__(self, interpreter_class, prefix="visit_"):
+        super().__init__()
+        self.interpreter_class = interpreter_class
+        self.prefix = prefix
+
+    def __missing__(self, node_class):
+        method = getattr(
+            self.interpreter_class,
+            self.prefix + node_class.__name__,
+            self.interpreter_class.no_visit_method,
+        )
+        self[node_class] = method
+        return method
+
+
+Interpreter.visit_methods = VisitMethods(Interpreter)
+
+# Runs the functions called from outside of an Interpreter, it keeps no
+# state of its own so a single one is enough
+INTERPRETER = Interpreter()
+
+
+def value_span(node):
+    """The positions of the value of a node, for its errors.
+
+    Values are shared and do not know where they are used, the positions
+    of a value are those of the node giving it: the value of an assignment
+    or of a block is the value of its last node.
+    """
+    while True:
+        # By name, so that views of a NodeStore are found too
+        name = node.__class__.__name__
+        if name == "VarAssignNode" or name == "ConstAssignNode":
+            node = node.value_node
+        elif name == "BlockNode" and node.statement_nodes.element_nodes:
+            node = node.statement_nodes.element_nodes[-1]
+        else:
+            return node.pos_start, node.pos_end
+
+
+def operation_error(left, right, method, context, left_span, right_span):
+    """The error of a failed binary operation.
+
+    The operation is done again on copies of the operands that have the
+    positions of their nodes and the context of the operation, which only
+    failing operations pay for.
+    """
+    left = left.copy().with_meta(context, *left_span)
+    right = right.copy().with_meta(context, *right_span)
+    return getattr(left, method)(right)[1]
+
+
+def arithmetic(method, compute, divides=False):
+    """The operation of an operator giving a number: compute does it on the
+    values of two Numbers, method of the left Value on anything else or on
+    a division by 0, which gives the error."""
+
+    def operation(left, right):
+        if left.__class__ is Number and right.__class__ is Number:
+            if not divides or right.value != 0:
+                return make_number(compute(left.value, right.value)), None
+        return getattr(left, method)(right)
+
+    return operation
+
+
+def comparison(method, compare):
+    """The operation of a comparison, like arithmetic()."""
+
+    def operation(left, right):
+        if left.__class__ is Number and right.__class__ is Number:
+            if compare(left.value, right.value):
+                return Number.true, None
+            return Number.false, None
+        return getattr(left, method)(right)
+
+    return operation
+
+
+# What each binary operator does to two Values, giving a result and an
+# error like the methods of OPERATOR_METHODS, which it falls back to for
+# anything but two Numbers. Every BinaryOpNode keeps the operation of its
+# operator.
+BINARY_OPERATIONS = {
+    TT_PLUS: arithmetic("added_to", operator.add),
+    TT_MINUS: arithmetic("subbed_by", operator.sub),
+    TT_MUL: arithmetic("multed_by", operator.mul),
+    TT_DIV: arithmetic("divided_by", operator.truediv, divides=True),
+    TT_POW: arithmetic("power_by", operator.pow),
+    TT_MOD: arithmetic("modulo_by", operator.mod, divides=True),
+    TT_FLOORDIV: arithmetic("floordiv_by", operator.floordiv, divides=True),
+    TT_NE: comparison("get_comparison_ne", operator.ne),
+    TT_EE: comparison("get_comparison_eq", operator.eq),
+    TT_LT: comparison("get_comparison_lt", operator.lt),
+    TT_LTE: comparison("get_comparison_lte", operator.le),
+    TT_GT: comparison("get_comparison_gt", operator.gt),
+    TT_GTE: comparison("get_comparison_gte", operator.ge),
+    TT_Y: arithmetic("anded_by", lambda a, b: int(a and b)),
+    TT_O: arithmetic("ored_by", lambda a, b: int(a or b)),
+}
+
+
+def short_circuit(op_type, left):
+    """The value of a y or o decided by its left operand alone, None when
+    the right operand is needed: a number 0 for y, another number for o.
+    It is what anded_by() and ored_by() give for any right number."""
+    if isinstance(left, Number) and (left.value if op_type == TT_O else not left.value):
+        return make_number(int(left.value))
+    return None
+
+
+def unary_error(value, op_type, context, span):
+    """The error of a failed - or jamas, like operation_error()."""
+    value = value.copy().with_meta(context, *span)
+    if op_type == TT_MINUS:
+        return value.multed_by(Number(-1))[1]
+    return value.notted()[1]
+
+
 class SymbolTable:
     def __init__(self, parent=None):
         self.symbols = {}
@@ -355,12 +534,18 @@ class SymbolTable:
         self.parent = parent
 
     def get(self, name):
-        value = self.symbols.get(name)
-        if value is None:
-            value = self.constants.get(name)
-        if value is None and self.parent:
-            return self.parent.get(name)
-        return value
+        # A loop rather than recursion, calls nest as deep as the VM allows
+        table = self
+        while table:
+            if table.__class__ is SlotTable:
+                return table.get(name)
+            value = table.symbols.get(name)
+            if value is None:
+                value = table.constants.get(name)
+            if value is not None:
+                return value
+            table = table.parent
+        return None
 
     def set(self, name, value):
         if name in self.constants:
@@ -380,6 +565,52 @@ class SymbolTable:
         del self.symbols[name]
 
 
+class SlotTable:
+    """The symbol table of a call of a function with resolved names.
+
+    The names the function binds are kept in a list, at the slots its
+    Scope gives them, so that the function reads them by index. Lookups by
+    name go through the slots as well, then on to the table of the caller.
+    """
+
+    __slots__ = ("scope", "slots", "parent", "constants")
+
+    def __init__(self, scope, slots, parent):
+        self.scope = scope
+        self.slots = slots
+        self.parent = parent
+        # The slots set by fija, made by the first one
+        self.constants = None
+
+    def get(self, name):
+        table = self
+        while table.__class__ is SlotTable:
+            slot = table.scope.slots.get(name)
+            if slot is not None:
+                value = table.slots[slot]
+                if value is not None:
+                    return value
+            table = table.parent
+        return table.get(name) if table else None
+
+    def set(self, name, value):
+        slot = self.scope.slots[name]
+        if self.constants and slot in self.constants:
+            raise Exception(f"'{name}' es una constante y no se puede cambiar")
+        self.slots[slot] = value
+
+    def set_const(self, name, value):
+        slot = self.scope.slots[name]
+        if self.slots[slot] is not None:
+            raise Exception(
+                f"'{name}' ya está definido y no se puede redefinir como constante"
+            )
+        if self.constants is None:
+            self.constants = set()
+        self.constants.add(slot)
+        self.slots[slot] = value
+
+
 class Value:
     def __init__(self):
         self.set_position()
@@ -462,9 +693,13 @@ class BaseFunction(Value):
         super().__init__()
         self.name = name or "<anonimo>"
 
-    def generate_new_context(self):
-        new_context = Context(self.name, self.context, self.pos_start)
-        new_context.symbol_table = SymbolTable(new_context.parent.symbol_table)
+    def generate_new_context(self, context=None, pos_start=None):
+        """The context of a call from context at pos_start, by default from
+        the context and position of the function."""
+        if context is None:
+            context, pos_start = self.context, self.pos_start
+        new_context = Context(self.name, context, pos_start)
+        new_context.symbol_table = SymbolTable(context.symbol_table)
         return new_context
 
     def check_args(self, arg_names, args):
@@ -483,10 +718,7 @@ class BaseFunction(Value):
 
     def populate_args(self, arg_names, args, exec_ctx):
         for i in range(len(args)):
-            arg_name = arg_names[i]
-            arg_value = args[i]
-            arg_value.set_context(exec_ctx)
-            exec_ctx.symbol_table.set(arg_name, arg_value)
+            exec_ctx.symbol_table.set(arg_names[i], args[i])
 
     def check_and_populate_args(self, arg_names, args, exec_ctx):
         res = RTResult()
@@ -498,21 +730,54 @@ class BaseFunction(Value):
 
 
 class Function(BaseFunction):
-    def __init__(self, name, body_node, arg_names, should_auto_return):
+    """A function defined by the program.
+
+    With the Scope of its names its calls keep them in a SlotTable, made
+    of the list of arguments, rather than in a new SymbolTable.
+    """
+
+    def __init__(self, name, body_node, arg_names, should_auto_return, scope=None):
         super().__init__(name)
         self.body_node = body_node
         self.arg_names = arg_names
         self.should_auto_return = should_auto_return
-
-    def execute(self, args):
+        self.scope = scope
+
+    def frame(self, args, context, pos_start):
+        """The context of a call from context at pos_start, args must
+        already match the arguments of the function."""
+        exec_ctx = Context(self.name, context, pos_start)
+        scope = self.scope
+        if scope is None:
+            exec_ctx.symbol_table = SymbolTable(context.symbol_table)
+            self.populate_args(self.arg_names, args, exec_ctx)
+        else:
+            exec_ctx.symbol_table = SlotTable(
+                scope, args + scope.padding, context.symbol_table
+            )
+        return exec_ctx
+
+    def prepare_call(self, args, context=None, pos_start=None, pos_end=None):
+        """The context of a call from context at pos_start to pos_end, and
+        the error of its arguments. By default the call is made from the
+        context and position of the function."""
+        if len(args) != len(self.arg_names):
+            function = self
+            if context is not None:
+                function = self.copy().with_meta(context, pos_start, pos_end)
+            return None, function.check_args(self.arg_names, args).error
+        if context is None:
+            context, pos_start = self.context, self.pos_start
+        return self.frame(args, context, pos_start), None
+
+    def execute(self, args, context=None, pos_start=None, pos_end=None):
         res = RTResult()
-        interpreter = Interpreter()
-        exec_ctx = self.generate_new_context()
 
-        res.register(self.check_and_populate_args(self.arg_names, args, exec_ctx))
-        if res.should_return():
-            return res
+        exec_ctx, error = self.prepare_call(args, context, pos_start, pos_end)
+        if error:
+            return res.failure(error)
 
+        interpreter = INTERPRETER
         value = res.register(interpreter.visit(self.body_node, exec_ctx))
         if res.should_return() and res.func_return_value == None:
             return res
@@ -525,11 +790,14 @@ class Function(BaseFunction):
 
     def copy(self):
         copy = Function(
-            self.name, self.body_node, self.arg_names, self.should_auto_return
+            self.name,
+            self.body_node,
+            self.arg_names,
+            self.should_auto_return,
+            self.scope,
         )
         copy.set_context(self.context)
         copy.set_position(self.pos_start, self.pos_end)
-        print(copy)
         return copy
 
     def __repr__(self):
@@ -539,187 +807,179 @@ class Function(BaseFunction):
         return f"{self.name}"
 
 
-class BuiltInFunction(BaseFunction):
-    def __init__(self, name):
-        super().__init__(name)
+class BuiltInFailure(Exception):
+    """Raised by the body of a builtin, with the details of its error."""
 
-    def execute(self, args):
-        res = RTResult()
-        exec_ctx = self.generate_new_context()
+    def __init__(self, details):
+        self.details = details
 
-        method_name = f"execute_{self.name}"
-        method = getattr(self, method_name, self.no_visit_method)
 
-        res.register(self.check_and_populate_args(method.arg_names, args, exec_ctx))
-        if res.should_return():
-            return
+def builtin(name, *arg_names):
+    """Registers a plain function as the body of the builtin name.
 
-        return_value = res.register(method(exec_ctx))
-        if res.should_return():
-            return res
-        return res.success(return_value)
+    It is called with the Values of the arguments positionally, once
+    their number is checked, and returns a Value or raises BuiltInFailure.
+    BuiltInFunction also gets an execute_<name> method running it.
+    """
 
-    def no_visit_method(self, node, context):
-        raise Exception(f"execute_{self.name} function not defined.")
+    def register(body):
+        def execute(self, exec_ctx):
+            args = [exec_ctx.symbol_table.get(arg_name) for arg_name in arg_names]
+            try:
+                return RTResult().success(body(*args))
+            except BuiltInFailure as e:
+                return RTResult().failure(
+                    EjecucionError(self.pos_start, self.pos_end, e.details, exec_ctx)
+                )
 
-    def copy(self):
-        copy = BuiltInFunction(self.name)
-        copy.set_context(self.context)
-        copy.set_position(self.pos_start, self.pos_end)
-        return copy
+        execute.body = body
+        execute.arg_names = list(arg_names)
+        setattr(BuiltInFunction, f"execute_{name}", execute)
+        return body
 
-    def __repr__(self):
-        return f"<built-in function {self.name}>"
+    return register
 
-    def __str__(self):
-        return f"{self.name}"
 
-    def execute_canta(self, exec_ctx):
-        print(str(exec_ctx.symbol_table.get("value")))
-        return RTResult().success(Number.null)
+class BuiltInFunction(BaseFunction):
+    """A function of the language written in Python.
 
-    execute_canta.arg_names = ["value"]
+    It runs its execute_<name> method, which reads the arguments from the
+    symbol table of a context of its own. The methods of the builtins
+    registered with builtin() are skipped, their body is called directly.
+    """
 
-    def execute_eco(self, exec_ctx):
-        return RTResult().success(String(str(exec_ctx.symbol_table.get("value"))))
+    def __init__(self, name, body=None, arg_names=None):
+        super().__init__(name)
+        self.method = None
+        if body is None:
+            self.method = getattr(type(self), f"execute_{name}", None)
+            if self.method is None:
+                raise Exception(f"execute_{name} function not defined.")
+            body = getattr(self.method, "body", None)
+            arg_names = self.method.arg_names
+        self.body = body
+        self.arg_names = arg_names
 
-    execute_eco.arg_names = ["value"]
+    def execute(self, args, context=None, pos_start=None, pos_end=None):
+        """Calls the builtin from context at pos_start to pos_end, by
+        default from the context and position of the builtin."""
+        if context is None:
+            context, pos_start, pos_end = self.context, self.pos_start, self.pos_end
+        if len(args) != len(self.arg_names):
+            function = self.copy().with_meta(context, pos_start, pos_end)
+            return RTResult().failure(function.check_args(self.arg_names, args).error)
+        if self.body is None:
+            return self.execute_method(args, context, pos_start, pos_end)
 
-    def execute_escucha(self, exec_ctx):
-        text = input()
-        return RTResult.success(String(text))
+        try:
+            return RTResult().success(self.body(*args))
+        except BuiltInFailure as e:
+            # The context of the call is only made for its error
+            exec_ctx = Context(self.name, context, pos_start)
+            return RTResult().failure(
+                EjecucionError(pos_start, pos_end, e.details, exec_ctx)
+            )
 
-    execute_escucha.arg_names = []
+    def execute_method(self, args, context, pos_start, pos_end):
+        function = self.copy().with_meta(context, pos_start, pos_end)
+        exec_ctx = function.generate_new_context()
+        self.populate_args(self.arg_names, args, exec_ctx)
+        return self.method(function, exec_ctx)
 
-    def execute_escucha_num(self, exec_ctx):
-        while True:
-            text = input()
-            try:
-                number = int(text)
-                break
-            except ValueError:
-                print(f"{text} debe de ser un numero")
-        return RTResult().success(Number(number))
+    def copy(self):
+        copy = object.__new__(self.__class__)
+        copy.__dict__.update(self.__dict__)
+        return copy
 
-    execute_escucha_num.arg_names = []
+    def __repr__(self):
+        return f"<built-in function {self.name}>"
 
-    def execute_limpia(self, exec_ctx):
-        os.system("cls" if os.name == "nt" else "clear")
-        return RTResult().success(Number.null)
+    def __str__(self):
+        return f"{self.name}"
 
-    execute_limpia.arg_names = []
 
-    def execute_es_num(self, exec_ctx):
-        is_number = isinstance(exec_ctx.symbol_table.get("value"), Number)
-        return RTResult().success(Number.true if is_number else Number.false)
+@builtin("canta", "value")
+def canta(value):
+    print(str(value))
+    return Number.null
 
-    execute_es_num.arg_names = ["value"]
 
-    def execute_es_texto(self, exec_ctx):
-        is_string = isinstance(exec_ctx.symbol_table.get("value"), String)
-        return RTResult().success(Number.true if is_string else Number.false)
+@builtin("eco", "value")
+def eco(value):
+    return String(str(value))
 
-    execute_es_texto.arg_names = ["value"]
 
-    def execute_es_lista(self, exec_ctx):
-        is_list = isinstance(exec_ctx.symbol_table.get("value"), List)
-        return RTResult().success(Number.true if is_list else Number.false)
+@builtin("escucha")
+def escucha():
+    return String(input())
 
-    execute_es_lista.arg_names = ["value"]
 
-    def execute_es_funcion(self, exec_ctx):
-        is_function = isinstance(exec_ctx.symbol_table.get("value"), BaseFunction)
-        return RTResult().success(Number.true if is_function else Number.false)
+@builtin("escucha_num")
+def escucha_num():
+    while True:
+        text = input()
+        try:
+            return Number(int(text))
+        except ValueError:
+            print(f"{text} debe de ser un numero")
 
-    execute_es_funcion.arg_names = ["value"]
 
-    def execute_pon(self, exec_ctx):
-        list_ = exec_ctx.symbol_table.get("list")
-        value = exec_ctx.symbol_table.get("value")
+@builtin("limpia")
+def limpia():
+    os.system("cls" if os.name == "nt" else "clear")
+    return Number.null
 
-        if not isinstance(list_, List):
-            return RTResult().failure(
-                EjecucionError(
-                    self.pos_start,
-                    self.pos_end,
-                    "First argument must be list",
-                    exec_ctx,
-                )
-            )
 
-        list_.elements.append(value)
-        return RTResult().success(Number.null)
+@builtin("es_num", "value")
+def es_num(value):
+    return Number.true if isinstance(value, Number) else Number.false
 
-    execute_pon.arg_names = ["list", "value"]
 
-    def execute_roba(self, exec_ctx):
-        list_ = exec_ctx.symbol_table.get("list")
-        index = exec_ctx.symbol_table.get("index")
+@builtin("es_texto", "value")
+def es_texto(value):
+    return Number.true if isinstance(value, String) else Number.false
 
-        if not isinstance(list_, List):
-            return RTResult().failure(
-                EjecucionError(
-                    self.pos_start,
-                    self.pos_end,
-                    "First argument must be list",
-                    exec_ctx,
-                )
-            )
 
-        if not isinstance(index, Number):
-            return RTResult().failure(
-                EjecucionError(
-                    self.pos_start,
-                    self.pos_end,
-                    "Second argument must be number",
-                    exec_ctx,
-                )
-            )
+@builtin("es_lista", "value")
+def es_lista(value):
+    return Number.true if isinstance(value, List) else Number.false
 
-        try:
-            element = list_.elements.pop(index.value)
-        except:
-            return RTResult().failure(
-                EjecucionError(
-                    self.pos_start,
-                    self.pos_end,
-                    "Element at this index could not be removed from list because index is out of bounds",
-                    exec_ctx,
-                )
-            )
 
-        return RTResult().success(element)
+@builtin("es_funcion", "value")
+def es_funcion(value):
+    return Number.true if isinstance(value, BaseFunction) else Number.false
 
-    execute_roba.arg_names = ["list", "index"]
 
-    def execute_extiende(self, exec_ctx):
-        listA = exec_ctx.symbol_table.get("listA")
-        listB = exec_ctx.symbol_table.get("listB")
+@builtin("pon", "list", "value")
+def pon(list_, value):
+    if not isinstance(list_, List):
+        raise BuiltInFailure("First argument must be list")
+    list_.elements.append(value)
+    return Number.null
 
-        if not isinstance(listA, List):
-            return RTResult().failure(
-                EjecucionError(
-                    self.pos_start,
-                    self.pos_end,
-                    "First argument must be list",
-                    exec_ctx,
-                )
-            )
 
-        if not isinstance(listB, List):
-            return RTResult().failure(
-                EjecucionError(
-                    self.pos_start,
-                    self.pos_end,
-                    "Second argument must be list",
-                    exec_ctx,
-                )
-            )
+@builtin("roba", "list", "index")
+def roba(list_, index):
+    if not isinstance(list_, List):
+        raise BuiltInFailure("First argument must be list")
+    if not isinstance(index, Number):
+        raise BuiltInFailure("Second argument must be number")
+    try:
+        return list_.elements.pop(index.value)
+    except Exception:
+        raise BuiltInFailure(
+            "Element at this index could not be removed from list because index is out of bounds"
+        ) from None
 
-        listA.elements.extend(listB.elements)
-        return RTResult().success(Number.null)
 
-    execute_extiende.arg_names = ["listA", "listB"]
+@builtin("extiende", "listA", "listB")
+def extiende(list_a, list_b):
+    if not isinstance(list_a, List):
+        raise BuiltInFailure("First argument must be list")
+    if not isinstance(list_b, List):
+        raise BuiltInFailure("Second argument must be list")
+    list_a.elements.extend(list_b.elements)
+    return Number.null
 
 
 BuiltInFunction.canta = BuiltInFunction("canta")
@@ -745,7 +1005,7 @@ class Number(Value):
 
     def __add__(self, other):
         if hasattr(other, "value"):
-            return Number(self.value + other.value)
+            return make_number(self.value + other.value)
         else:
             return None
 
@@ -770,14 +1030,14 @@ class Number(Value):
     def subbed_by(self, other):
         """A function to represent subtraction."""
         if isinstance(other, Number):
-            return Number(self.value - other.value).set_context(self.context), None
+            return make_number(self.value - other.value), None
         else:
             return None, self.illegal_operation(self, other)
 
     def multed_by(self, other):
         """A function to represent multiplication."""
         if isinstance(other, Number):
-            return Number(self.value * other.value).set_context(self.context), None
+            return make_number(self.value * other.value), None
         else:
             return None, self.illegal_operation(self, other)
 
@@ -788,14 +1048,14 @@ class Number(Value):
                 return None, EjecucionError(
                     other.pos_start, other.pos_end, "Division por zero", self.context
                 )
-            return Number(self.value / other.value).set_context(self.context), None
+            return make_number(self.value / other.value), None
         else:
             return None, self.illegal_operation(self, other)
 
     def power_by(self, other):
         """A function to represent power multiplication."""
         if isinstance(other, Number):
-            return Number(self.value**other.value).set_context(self.context), None
+            return make_number(self.value**other.value), None
         else:
             return None, self.illegal_operation(self, other)
 
@@ -806,7 +1066,7 @@ class Number(Value):
                 return None, EjecucionError(
                     other.pos_start, other.pos_end, "Division por zero", self.context
                 )
-            return Number(self.value % other.value).set_context(self.context), None
+            return make_number(self.value % other.value), None
         else:
             return None, self.illegal_operation(self, other)
 
@@ -817,7 +1077,7 @@ class Number(Value):
                 return None, EjecucionError(
                     other.pos_start, other.pos_end, "Division por zero", self.context
                 )
-            return Number(self.value // other.value).set_context(self.context), None
+            return make_number(self.value // other.value), None
         else:
             return None, self.illegal_operation(self, other)
 
@@ -825,7 +1085,7 @@ class Number(Value):
         """Handles equals comparisons."""
         if isinstance(other, Number):
             return (
-                Number(int(self.value == other.value)).set_context(self.context),
+                Number.true if self.value == other.value else Number.false,
                 None,
             )
         else:
@@ -835,7 +1095,7 @@ class Number(Value):
         """Handles inequality operations."""
         if isinstance(other, Number):
             return (
-                Number(int(self.value != other.value)).set_context(self.context),
+                Number.true if self.value != other.value else Number.false,
                 None,
             )
         else:
@@ -844,7 +1104,7 @@ class Number(Value):
     def get_comparison_lt(self, other):
         """Less than comparisons."""
         if isinstance(other, Number):
-            return Number(int(self.value < other.value)).set_context(self.context), None
+            return Number.true if self.value < other.value else Number.false, None
         else:
             return None, self.illegal_operation(self, other)
 
@@ -852,7 +1112,7 @@ class Number(Value):
         """Less than or equal to comparisons."""
         if isinstance(other, Number):
             return (
-                Number(int(self.value <= other.value)).set_context(self.context),
+                Number.true if self.value <= other.value else Number.false,
                 None,
             )
         else:
@@ -861,7 +1121,7 @@ class Number(Value):
     def get_comparison_gt(self, other):
         """Greater than comparisons."""
         if isinstance(other, Number):
-            return Number(int(self.value > other.value)).set_context(self.context), None
+            return Number.true if self.value > other.value else Number.false, None
         else:
             return None, self.illegal_operation(self, other)
 
@@ -869,7 +1129,7 @@ class Number(Value):
         """Greater than or equal to comparisons."""
         if isinstance(other, Number):
             return (
-                Number(int(self.value >= other.value)).set_context(self.context),
+                Number.true if self.value >= other.value else Number.false,
                 None,
             )
         else:
@@ -878,7 +1138,7 @@ class Number(Value):
     def anded_by(self, other):
         if isinstance(other, Number):
             return (
-                Number(int(self.value and other.value)).set_context(self.context),
+                make_number(int(self.value and other.value)),
                 None,
             )
         else:
@@ -887,14 +1147,14 @@ class Number(Value):
     def ored_by(self, other):
         if isinstance(other, Number):
             return (
-                Number(int(self.value or other.value)).set_context(self.context),
+                make_number(int(self.value or other.value)),
                 None,
             )
         else:
             return None, self.illegal_operation(self, other)
 
     def notted(self):
-        return Number(1 if self.value == 0 else 0).set_context(self.context), None
+        return Number.true if self.value == 0 else Number.false, None
 
     def is_true(self):
         return self.value != 0
@@ -913,9 +1173,43 @@ class Number(Value):
         return f"{self.value}"
 
 
-Number.null = Number(0)
-Number.true = Number(1)
-Number.false = Number(0)
+# Integers from SMALL_INT_MIN to SMALL_INT_MAX are made once and shared,
+# like CPython does with its own small ints
+SMALL_INT_MIN = -5
+SMALL_INT_MAX = 256
+SMALL_INTS = [Number(n) for n in range(SMALL_INT_MIN, SMALL_INT_MAX + 1)]
+
+
+def make_number(value):
+    """The Number of a result, a shared one for small integers."""
+    if value.__class__ is int and SMALL_INT_MIN <= value <= SMALL_INT_MAX:
+        return SMALL_INTS[value - SMALL_INT_MIN]
+    return Number(value)
+
+
+def loop_steps(start, end, step):
+    """The values a para loop gives its variable, a range when they are all
+    integers and the step is not 0."""
+    if start.__class__ is int and end.__class__ is int and step.__class__ is int:
+        if step:
+            return range(start, end, step)
+    return float_steps(start, end, step)
+
+
+def float_steps(start, end, step):
+    i = start
+    if step >= 0:
+        while i < end:
+            yield i
+            i += step
+    else:
+        while i > end:
+            yield i
+            i += step
+
+
+Number.null = Number.false = make_number(0)
+Number.true = make_number(1)
 
 
 class String(Value):
@@ -931,7 +1225,7 @@ class String(Value):
 
     def added_to(self, other):
         if isinstance(other, String):
-            return String(self.value + other.value).set_context(self.context), None
+            return String(self.value + other.value), None
         return None, ErrorDeTipo(
             self.pos_start,
             other.pos_end,
@@ -940,7 +1234,7 @@ class String(Value):
 
     def multed_by(self, other):
         if isinstance(other, Number):
-            return String(self.value * other.value).set_context(self.context), None
+            return String(self.value * other.value), None
         return None, ErrorDeTipo(
             self.pos_start,
             other.pos_end,
@@ -963,6 +1257,40 @@ class String(Value):
         return f"{self.value}"
 
 
+class ConstantPool:
+    """The Numbers and Strings of the literals of a program, one per value.
+
+    Values are immutable, so every node of the same literal shares one and
+    evaluating a literal allocates nothing.
+    """
+
+    def __init__(self):
+        self.values = {}
+
+    def number(self, value):
+        if value.__class__ is int and SMALL_INT_MIN <= value <= SMALL_INT_MAX:
+            return SMALL_INTS[value - SMALL_INT_MIN]
+        # By class too, 1 and 1.0 are equal keys
+        key = (value.__class__, value)
+        number = self.values.get(key)
+        if number is None:
+            number = self.values[key] = Number(value)
+        return number
+
+    def string(self, value):
+        key = (str, value)
+        string = self.values.get(key)
+        if string is None:
+            string = self.values[key] = String(value)
+        return string
+
+    def literal(self, tok):
+        """The Value of a number or string token."""
+        if tok.type == TT_STRING:
+            return self.string(tok.value)
+        return self.number(tok.value)
+
+
 class List(Value):
     def __init__(self, elements):
         super().__init__()
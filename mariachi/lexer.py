@@ -1,289 +1,248 @@
+import re
+
+import os
+
 from .token import *
 from .errors import *
+from .source import *
+
+# Lexemes longer than one character are consumed whole with these patterns.
+NUMBER_RE = re.compile(r"[0-9]+(?:\.[0-9]*)?")
+IDENTIFIER_RE = re.compile(r"[A-Za-z][A-Za-z0-9_]*")
+STRING_RE = re.compile(r'"((?:[^"\\]|\\.)*)(\\?)("?)', re.DOTALL)
+ESCAPE_RE = re.compile(r"\\(.)", re.DOTALL)
+
+# Size of the pieces a script file is read in when it is streamed
+CHUNK_SIZE = 1 << 16
+
+ESCAPE_CHARACTERS = {
+    "n": "\n",
+    "t": "\t",
+    "b": "\b",
+}
+
+# Character classes used to dispatch on the first character of a lexeme.
+CC_BLANK = 0
+CC_NEWLINE = 1
+CC_DIGIT = 2
+CC_LETTER = 3
+CC_STRING = 4
+CC_COMMENT = 5
+CC_SINGLE = 6
+CC_OPERATOR = 7
+CC_BANG = 8
+
+# Tokens that are always exactly one character long.
+SINGLE_CHAR_TOKENS = {
+    "+": TT_PLUS,
+    "%": TT_MOD,
+    "(": TT_LPAREN,
+    ")": TT_RPAREN,
+    "{": TT_LBRACE,
+    "}": TT_RBRACE,
+    "[": TT_LSQUARE,
+    "]": TT_RSQUARE,
+    ",": TT_COMMA,
+}
+
+# Operators that may be extended by a second character.
+OPERATOR_TOKENS = {
+    "-": (TT_MINUS, {">": TT_ARROW}),
+    "*": (TT_MUL, {"*": TT_POW}),
+    "/": (TT_DIV, {"/": TT_FLOORDIV}),
+    "=": (TT_EQ, {"=": TT_EE}),
+    "<": (TT_LT, {"=": TT_LTE}),
+    ">": (TT_GT, {"=": TT_GTE}),
+}
+
+# Two character operators whose span only covers their first character.
+SHORT_SPAN_TOKENS = frozenset((TT_ARROW, TT_POW, TT_FLOORDIV))
+
+CHAR_CLASSES = {" ": CC_BLANK, "\t": CC_BLANK, "\n": CC_NEWLINE, ";": CC_NEWLINE}
+CHAR_CLASSES.update(dict.fromkeys(DIGITS, CC_DIGIT))
+CHAR_CLASSES.update(dict.fromkeys(LETTERS, CC_LETTER))
+CHAR_CLASSES.update(dict.fromkeys(SINGLE_CHAR_TOKENS, CC_SINGLE))
+CHAR_CLASSES.update(dict.fromkeys(OPERATOR_TOKENS, CC_OPERATOR))
+CHAR_CLASSES.update({'"': CC_STRING, "#": CC_COMMENT, "!": CC_BANG})
+
+
+def unescape(match):
+    """Replaces an escape sequence matched inside a string."""
+    char = match.group(1)
+    return ESCAPE_CHARACTERS.get(char, char)
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    """Yields the text of a file in pieces of at most chunk_size characters."""
+    with open(path, encoding="utf-8") as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
 
 
 class Lexer:
-    def __init__(self, fn, text):
+    def __init__(self, fn, text, source=None, chunks=None):
         # The input file name
         self.fn = fn
-        # The processed text
+        # The processed text, None when it is streamed from a file
         self.text = text
-        # Tracks current position
-        self.pos = Position(-1, 0, -1, fn, text)
-        # Tracks current character, default is None type
-        self.current_char = None
-        self.advance()
-
-    def advance(self):
-        """A class method to increment position in text."""
-        self.pos.advance(self.current_char)
-        # Sets incremented character as the current character
-        if self.pos.idx < len(self.text):
-            self.current_char = self.text[self.pos.idx]
-        else:
-            # We need to set the current char back to None to prevent infinite loops
-            self.current_char = None
+        # Tokens hold integer positions relative to the base of the source
+        self.source = source or SOURCES.add(fn, text)
+        # The pieces of text the tokens are generated from
+        self.chunks = chunks if chunks is not None else iter((text,))
+        # Set when the token stream stopped at an invalid character
+        self.error = None
+
+    @classmethod
+    def from_file(cls, path, chunk_size=CHUNK_SIZE):
+        """Creates a lexer that reads its script lazily, piece by piece."""
+        # A character never takes less than a byte, so the file size is
+        # enough room for every position in it.
+        source = SOURCES.add(path, None, size=os.path.getsize(path), path=path)
+        return cls(path, None, source, read_chunks(path, chunk_size))
 
     def make_tokens(self):
         """A class method to tokenize input text."""
-        # Initialize an empty list to store the token
-        tokens = []
-
-        while self.current_char != None:
-
-            # Ignore white spaces
-            if self.current_char in " \t":
-                self.advance()
-
-            # Handle comments
-            elif self.current_char == "#":
-                self.skip_comment()
-
-            # Handle newlines
-            elif self.current_char in ";\n":
-                tokens.append(Token(TT_NEWLINE, pos_start=self.pos))
-                self.advance()
-
-            # Tokenize numbers
-            elif self.current_char in DIGITS:
-                tokens.append(self.make_number())
-
-            # Tokenize identifiers and keywords
-            elif self.current_char in LETTERS:
-                tokens.append(self.make_identifier())
-
-            # Handle strings
-            elif self.current_char == '"':
-                tokens.append(self.make_string())
-
-            # Math operations
-            elif self.current_char == "+":
-                tokens.append(Token(TT_PLUS, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == "-":
-                pos_start = self.pos.copy()
-                self.advance()
-                if self.current_char == ">":
-                    tokens.append(
-                        Token(TT_ARROW, pos_start=pos_start, pos_end=self.pos)
-                    )
-                    self.advance()
-                else:
-                    tokens.append(
-                        Token(TT_MINUS, pos_start=pos_start, pos_end=self.pos)
-                    )
-            elif self.current_char == "*":
-                pos_start = self.pos.copy()
-                self.advance()
-                if self.current_char == "*":
-                    tokens.append(Token(TT_POW, pos_start=pos_start, pos_end=self.pos))
-                    self.advance()
-                else:
-                    tokens.append(Token(TT_MUL, pos_start=pos_start, pos_end=self.pos))
-            elif self.current_char == "/":
-                pos_start = self.pos.copy()
-                self.advance()
-                if self.current_char == "/":
-                    tokens.append(
-                        Token(TT_FLOORDIV, pos_start=pos_start, pos_end=self.pos)
-                    )
-                    self.advance()
-                else:
-                    tokens.append(Token(TT_DIV, pos_start=pos_start, pos_end=self.pos))
-            elif self.current_char == "%":
-                tokens.append(Token(TT_MOD, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == "(":
-                tokens.append(Token(TT_LPAREN, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == ")":
-                tokens.append(Token(TT_RPAREN, pos_start=self.pos))
-                self.advance()
-
-            # Braces
-            elif self.current_char == "{":
-                tokens.append(Token(TT_LBRACE, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == "}":
-                tokens.append(Token(TT_RBRACE, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == "[":
-                tokens.append(Token(TT_LSQUARE, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == "]":
-                tokens.append(Token(TT_RSQUARE, pos_start=self.pos))
-                self.advance()
-
-            # Logical operations
-            elif self.current_char == "!":
-                token, error = self.make_not_equals()
-                if error:
-                    return [], error
-                tokens.append(token)
-            elif self.current_char == "=":
-                tokens.append(self.make_equals())
-            elif self.current_char == "<":
-                tokens.append(self.make_less_than())
-            elif self.current_char == ">":
-                tokens.append(self.make_greater_than())
-
-            # Commas and comments
-            elif self.current_char == ",":
-                tokens.append(Token(TT_COMMA, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == "#":
-                tokens.append(Token(TT_COMMENT, pos_start=self.pos))
-                self.advance()
-            else:
-                pos_start = self.pos.copy()
-                char = self.current_char
-                self.advance()
-                # Returns no tokens and bad character error
-                return [], InesperadoError(pos_start, self.pos, char)
-
-        # End of file
-        tokens.append(Token(TT_EOF, pos_start=self.pos))
+        tokens = list(self.generate_tokens())
+        if self.error:
+            return [], self.error
         return tokens, None
 
-    def make_number(self):
-        """A class to handle tokenization of numbers."""
-        # We handle all numbers as strings for tokenization.
-        num_str = ""
-        dot_count = 0
-        pos_start = self.pos.copy()
-
-        # The logic for handling integers vs floating point values.
-        while self.current_char != None and self.current_char in DIGITS + ".":
-            if self.current_char == ".":
-                if dot_count == 1:
-                    break
-                dot_count += 1
-                num_str += "."
-            else:
-                num_str += self.current_char
-            self.advance()
-        # Tokenization logic following evaluation of token type.
-        if dot_count == 0:
-            return Token(TT_INT, int(num_str), pos_start, self.pos)
-        else:
-            return Token(TT_FLOAT, float(num_str), pos_start, self.pos)
-
-    def make_identifier(self):
-        """A function to tokenize keywords and identifiers."""
-        id_string = ""
-        pos_start = self.pos.copy()
-
-        while self.current_char != None and self.current_char in LETTERS_DIGITS + "_":
-            id_string += self.current_char
-            self.advance()
-
-        tok_type = TT_KEYWORD if id_string in KEYWORDS else TT_IDENTIFIER
-        return Token(tok_type, id_string, pos_start, self.pos)
-
-    def make_not_equals(self):
-        """A function to handle inequalities."""
-        pos_start = self.pos.copy()
-        self.advance()
-
-        if self.current_char == "=":
-            self.advance()
-            return Token(TT_NE, pos_start=pos_start, pos_end=self.pos), None
-
-        self.advance()
-        return None, CaracterEsperadoError(pos_start, self.pos, "'=' despues de '!'")
-
-    def make_equals(self):
-        """A function to handle equalities."""
-        tok_type = TT_EQ
-        pos_start = self.pos.copy()
-        self.advance()
-
-        if self.current_char == "=":
-            self.advance()
-            tok_type = TT_EE
-        return Token(tok_type, pos_start=pos_start, pos_end=self.pos)
-
-    def make_less_than(self):
-        """A function to handle equalities."""
-        tok_type = TT_LT
-        pos_start = self.pos.copy()
-        self.advance()
-
-        if self.current_char == "=":
-            self.advance()
-            tok_type = TT_LTE
-        return Token(tok_type, pos_start=pos_start, pos_end=self.pos)
-
-    def make_greater_than(self):
-        """A function to handle equalities."""
-        tok_type = TT_GT
-        pos_start = self.pos.copy()
-        self.advance()
-
-        if self.current_char == "=":
-            self.advance()
-            tok_type = TT_GTE
-        return Token(tok_type, pos_start=pos_start, pos_end=self.pos)
-
-    def make_string(self):
-        string_ = ""
-        pos_start = self.pos.copy()
-        escape = False
-        self.advance()
-
-        escape_characters = {
-            "n": "\n",
-            "t": "\t",
-            "b": "\b",
-        }
-
-        while self.current_char != None and (self.current_char != '"' or escape):
-            if escape:
-                string_ += escape_characters.get(self.current_char, self.current_char)
-                escape = False
-            else:
-                if self.current_char == "\\":
-                    escape = True
-                else:
-                    string_ += self.current_char
-            self.advance()
-
-        self.advance()
-        return Token(TT_STRING, string_, pos_start, pos_end=self.pos)
-
-    def skip_comment(self):
-        self.advance()
+    def generate_tokens(self):
+        """Generates the tokens of the text one at a time.
 
-        while self.current_char != "\n":
-            self.advance()
-
-        self.advance()
+        Dispatches on the first character of every lexeme and consumes the
+        whole lexeme at once, slicing its value out of the current piece of
+        text. When a lexeme may continue in the next piece, the rest of the
+        current piece is carried over and lexing resumes once more text has
+        been read, so only a single piece is held in memory at a time.
 
+        An invalid character ends the stream with an EOF token and leaves
+        the error in self.error.
+        """
+        chunks = self.chunks
+        classes = CHAR_CLASSES
+        # The position of the first character of the current piece
+        base = self.source.base
+        text = ""
+        idx = 0
+        eof = False
+
+        while True:
+            chunk = next(chunks, "")
+            if chunk:
+                text = text[idx:] + chunk
+                base += idx
+                idx = 0
+            else:
+                eof = True
+            length = len(text)
+
+            while idx < length:
+                char = text[idx]
+                char_class = classes.get(char)
+
+                # Ignore white spaces
+                if char_class == CC_BLANK:
+                    idx += 1
+
+                # Tokenize identifiers and keywords
+                elif char_class == CC_LETTER:
+                    end = IDENTIFIER_RE.match(text, idx).end()
+                    if end == length and not eof:
+                        break
+                    id_string = text[idx:end]
+                    tok_type = KEYWORDS.get(id_string, TT_IDENTIFIER)
+                    yield Token(tok_type, id_string, base + idx, base + end)
+                    idx = end
+
+                # Math, comparison and arrow operators
+                elif char_class == CC_OPERATOR:
+                    end = idx + 1
+                    if end == length and not eof:
+                        break
+                    tok_type, extensions = OPERATOR_TOKENS[char]
+                    if end < length and text[end] in extensions:
+                        tok_type = extensions[text[end]]
+                        if tok_type in SHORT_SPAN_TOKENS:
+                            yield Token(tok_type, pos_start=base + idx)
+                            idx += 2
+                            continue
+                        end += 1
+                    yield Token(tok_type, pos_start=base + idx, pos_end=base + end)
+                    idx = end
+
+                # Parenthesis, braces, brackets and commas
+                elif char_class == CC_SINGLE:
+                    yield Token(SINGLE_CHAR_TOKENS[char], pos_start=base + idx)
+                    idx += 1
+
+                # Handle newlines
+                elif char_class == CC_NEWLINE:
+                    yield Token(TT_NEWLINE, pos_start=base + idx)
+                    idx += 1
+
+                # Tokenize numbers
+                elif char_class == CC_DIGIT:
+                    end = NUMBER_RE.match(text, idx).end()
+                    if end == length and not eof:
+                        break
+                    num_str = text[idx:end]
+                    if "." in num_str:
+                        yield Token(TT_FLOAT, float(num_str), base + idx, base + end)
+                    else:
+                        yield Token(TT_INT, int(num_str), base + idx, base + end)
+                    idx = end
+
+                # Handle strings
+                elif char_class == CC_STRING:
+                    match = STRING_RE.match(text, idx)
+                    end = match.end()
+                    if not match.group(3):
+                        if not eof:
+                            break
+                        # An unterminated string also steps over the end
+                        end += 1
+                    string_ = match.group(1)
+                    if "\\" in string_:
+                        string_ = ESCAPE_RE.sub(unescape, string_)
+                    yield Token(TT_STRING, string_, base + idx, base + end)
+                    idx = end
+
+                # Comments run up to and including the end of the line
+                elif char_class == CC_COMMENT:
+                    end = text.find("\n", idx)
+                    if end >= 0:
+                        idx = end + 1
+                    elif eof:
+                        idx = length
+                    else:
+                        break
+
+                # Inequality, the only operator that needs a second character
+                elif char_class == CC_BANG:
+                    if idx + 1 == length and not eof:
+                        break
+                    pos_start = base + idx
+                    if text.startswith("=", idx + 1):
+                        yield Token(TT_NE, pos_start=pos_start, pos_end=pos_start + 2)
+                        idx += 2
+                    else:
+                        self.error = CaracterEsperadoError(
+                            pos_start, pos_start + 2, "'=' despues de '!'"
+                        )
+                        yield Token(TT_EOF, pos_start=pos_start)
+                        return
+                else:
+                    # Stops at the bad character
+                    self.error = InesperadoError(base + idx, base + idx + 1, char)
+                    yield Token(TT_EOF, pos_start=base + idx)
+                    return
 
-class Position:
-    """A class to store the position of the different code attributes."""
+            if eof:
+                break
 
-    def __init__(self, idx, ln, col, fn, ftxt):
-        """Initial parameters for the position class.
-        Stores index, line, column, file name, and file text.
-        """
-        self.idx = idx
-        self.ln = ln
-        self.col = col
-        self.fn = fn
-        self.ftxt = ftxt
-
-    def advance(self, current_char=None):
-        """A function to advance through a file, line by line."""
-        self.idx += 1
-        self.col += 1
-        # Checks for new lines
-        if current_char == "\n":
-            self.ln += 1
-            self.col = 0
-
-        return self
-
-    def copy(self):
-        """Copies all of the stored values at a given position."""
-        return Position(self.idx, self.ln, self.col, self.fn, self.ftxt)
+        # End of file
+        yield Token(TT_EOF, pos_start=base + idx)
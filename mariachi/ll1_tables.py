@@ -0,0 +1,828 @@
+# Generated by mariachi.grammar from grammar/grammar.txt, do not edit.
+
+from .token import *
+
+NONTERMINAL_BASE = 100
+
+# Nonterminals, numbered from NONTERMINAL_BASE
+NONTERMINALS = [
+    "program",
+    "block",
+    "statements",
+    "statement",
+    "expr",
+    "comp",
+    "math",
+    "term",
+    "factor",
+    "power",
+    "call",
+    "atom",
+    "list",
+    "if",
+    "for",
+    "while",
+    "define",
+    "statements.1",
+    "statements.2",
+    "statements.3",
+    "statement.1",
+    "expr.1",
+    "expr.2",
+    "comp.1",
+    "comp.2",
+    "math.1",
+    "math.2",
+    "term.1",
+    "term.2",
+    "factor.1",
+    "power.1",
+    "call.1",
+    "call.2",
+    "call.3",
+    "list.1",
+    "list.2",
+    "if.1",
+    "if.2",
+    "for.1",
+    "define.1",
+    "define.2",
+    "define.3",
+]
+
+# Helper nonterminals, their children belong to the rule they come from
+GROUPS = frozenset(
+    (
+        117,  # statements.1
+        118,  # statements.2
+        119,  # statements.3
+        120,  # statement.1
+        121,  # expr.1
+        122,  # expr.2
+        123,  # comp.1
+        124,  # comp.2
+        125,  # math.1
+        126,  # math.2
+        127,  # term.1
+        128,  # term.2
+        129,  # factor.1
+        130,  # power.1
+        131,  # call.1
+        132,  # call.2
+        133,  # call.3
+        134,  # list.1
+        135,  # list.2
+        136,  # if.1
+        137,  # if.2
+        138,  # for.1
+        139,  # define.1
+        140,  # define.2
+        141,  # define.3
+    )
+)
+
+START = 100
+
+# Productions as (nonterminal, symbols)
+PRODUCTIONS = [
+    # 0: program -> statements TT_EOF
+    (100, (102, TT_EOF)),
+    # 1: block -> TT_LBRACE statements TT_RBRACE
+    (101, (TT_LBRACE, 102, TT_RBRACE)),
+    # 2: statements.1 -> TT_NEWLINE statements.1
+    (117, (TT_NEWLINE, 117)),
+    # 3: statements.1 -> <empty>
+    (117, ()),
+    # 4: statements.3 -> statement
+    (119, (103,)),
+    # 5: statements.3 -> <empty>
+    (119, ()),
+    # 6: statements.2 -> TT_NEWLINE statements.3 statements.2
+    (118, (TT_NEWLINE, 119, 118)),
+    # 7: statements.2 -> <empty>
+    (118, ()),
+    # 8: statements -> statements.1 statement statements.2
+    (102, (117, 103, 118)),
+    # 9: statement.1 -> expr
+    (120, (104,)),
+    # 10: statement.1 -> <empty>
+    (120, ()),
+    # 11: statement -> TT_ENTREGA statement.1
+    (103, (TT_ENTREGA, 120)),
+    # 12: statement -> TT_SIGUE
+    (103, (TT_SIGUE,)),
+    # 13: statement -> TT_ROMPE
+    (103, (TT_ROMPE,)),
+    # 14: statement -> expr
+    (103, (104,)),
+    # 15: expr -> TT_SEA TT_IDENTIFIER TT_EQ expr
+    (104, (TT_SEA, TT_IDENTIFIER, TT_EQ, 104)),
+    # 16: expr -> TT_FIJA TT_IDENTIFIER TT_EQ expr
+    (104, (TT_FIJA, TT_IDENTIFIER, TT_EQ, 104)),
+    # 17: expr.2 -> TT_Y
+    (122, (TT_Y,)),
+    # 18: expr.2 -> TT_O
+    (122, (TT_O,)),
+    # 19: expr.1 -> expr.2 comp expr.1
+    (121, (122, 105, 121)),
+    # 20: expr.1 -> <empty>
+    (121, ()),
+    # 21: expr -> comp expr.1
+    (104, (105, 121)),
+    # 22: comp -> TT_JAMAS comp
+    (105, (TT_JAMAS, 105)),
+    # 23: comp.2 -> TT_EE
+    (124, (TT_EE,)),
+    # 24: comp.2 -> TT_NE
+    (124, (TT_NE,)),
+    # 25: comp.2 -> TT_LT
+    (124, (TT_LT,)),
+    # 26: comp.2 -> TT_GT
+    (124, (TT_GT,)),
+    # 27: comp.2 -> TT_LTE
+    (124, (TT_LTE,)),
+    # 28: comp.2 -> TT_GTE
+    (124, (TT_GTE,)),
+    # 29: comp.1 -> comp.2 math comp.1
+    (123, (124, 106, 123)),
+    # 30: comp.1 -> <empty>
+    (123, ()),
+    # 31: comp -> math comp.1
+    (105, (106, 123)),
+    # 32: math.2 -> TT_PLUS
+    (126, (TT_PLUS,)),
+    # 33: math.2 -> TT_MINUS
+    (126, (TT_MINUS,)),
+    # 34: math.1 -> math.2 term math.1
+    (125, (126, 107, 125)),
+    # 35: math.1 -> <empty>
+    (125, ()),
+    # 36: math -> term math.1
+    (106, (107, 125)),
+    # 37: term.2 -> TT_MUL
+    (128, (TT_MUL,)),
+    # 38: term.2 -> TT_DIV
+    (128, (TT_DIV,)),
+    # 39: term.2 -> TT_MOD
+    (128, (TT_MOD,)),
+    # 40: term.2 -> TT_FLOORDIV
+    (128, (TT_FLOORDIV,)),
+    # 41: term.1 -> term.2 factor term.1
+    (127, (128, 108, 127)),
+    # 42: term.1 -> <empty>
+    (127, ()),
+    # 43: term -> factor term.1
+    (107, (108, 127)),
+    # 44: factor.1 -> TT_PLUS
+    (129, (TT_PLUS,)),
+    # 45: factor.1 -> TT_MINUS
+    (129, (TT_MINUS,)),
+    # 46: factor -> factor.1 factor
+    (108, (129, 108)),
+    # 47: factor -> power
+    (108, (109,)),
+    # 48: power.1 -> TT_POW factor power.1
+    (130, (TT_POW, 108, 130)),
+    # 49: power.1 -> <empty>
+    (130, ()),
+    # 50: power -> call power.1
+    (109, (110, 130)),
+    # 51: call.3 -> TT_COMMA expr call.3
+    (133, (TT_COMMA, 104, 133)),
+    # 52: call.3 -> <empty>
+    (133, ()),
+    # 53: call.2 -> expr call.3
+    (132, (104, 133)),
+    # 54: call.2 -> <empty>
+    (132, ()),
+    # 55: call.1 -> TT_LPAREN call.2 TT_RPAREN
+    (131, (TT_LPAREN, 132, TT_RPAREN)),
+    # 56: call.1 -> <empty>
+    (131, ()),
+    # 57: call -> atom call.1
+    (110, (111, 131)),
+    # 58: atom -> TT_INT
+    (111, (TT_INT,)),
+    # 59: atom -> TT_FLOAT
+    (111, (TT_FLOAT,)),
+    # 60: atom -> TT_STRING
+    (111, (TT_STRING,)),
+    # 61: atom -> TT_IDENTIFIER
+    (111, (TT_IDENTIFIER,)),
+    # 62: atom -> TT_LPAREN expr TT_RPAREN
+    (111, (TT_LPAREN, 104, TT_RPAREN)),
+    # 63: atom -> list
+    (111, (112,)),
+    # 64: atom -> if
+    (111, (113,)),
+    # 65: atom -> for
+    (111, (114,)),
+    # 66: atom -> while
+    (111, (115,)),
+    # 67: atom -> define
+    (111, (116,)),
+    # 68: list.2 -> TT_COMMA expr list.2
+    (135, (TT_COMMA, 104, 135)),
+    # 69: list.2 -> <empty>
+    (135, ()),
+    # 70: list.1 -> expr list.2
+    (134, (104, 135)),
+    # 71: list.1 -> <empty>
+    (134, ()),
+    # 72: list -> TT_LSQUARE list.1 TT_RSQUARE
+    (112, (TT_LSQUARE, 134, TT_RSQUARE)),
+    # 73: if.1 -> TT_QUIZAS expr block if.1
+    (136, (TT_QUIZAS, 104, 101, 136)),
+    # 74: if.1 -> <empty>
+    (136, ()),
+    # 75: if.2 -> TT_SINO block
+    (137, (TT_SINO, 101)),
+    # 76: if.2 -> <empty>
+    (137, ()),
+    # 77: if -> TT_SI expr block if.1 if.2
+    (113, (TT_SI, 104, 101, 136, 137)),
+    # 78: for.1 -> TT_PASO expr
+    (138, (TT_PASO, 104)),
+    # 79: for.1 -> <empty>
+    (138, ()),
+    # 80: for -> TT_PARA TT_IDENTIFIER TT_EQ expr TT_HASTA expr for.1 block
+    (114, (TT_PARA, TT_IDENTIFIER, TT_EQ, 104, TT_HASTA, 104, 138, 101)),
+    # 81: while -> TT_MIENTRAS expr block
+    (115, (TT_MIENTRAS, 104, 101)),
+    # 82: define.1 -> TT_IDENTIFIER
+    (139, (TT_IDENTIFIER,)),
+    # 83: define.1 -> <empty>
+    (139, ()),
+    # 84: define.3 -> TT_COMMA TT_IDENTIFIER define.3
+    (141, (TT_COMMA, TT_IDENTIFIER, 141)),
+    # 85: define.3 -> <empty>
+    (141, ()),
+    # 86: define.2 -> TT_IDENTIFIER define.3
+    (140, (TT_IDENTIFIER, 141)),
+    # 87: define.2 -> <empty>
+    (140, ()),
+    # 88: define -> TT_DEFINE define.1 TT_LPAREN define.2 TT_RPAREN block
+    (116, (TT_DEFINE, 139, TT_LPAREN, 140, TT_RPAREN, 101)),
+]
+
+# The production to expand a nonterminal with, by lookahead token type
+TABLE = {
+    100: {  # program
+        TT_INT: 0,
+        TT_FLOAT: 0,
+        TT_IDENTIFIER: 0,
+        TT_STRING: 0,
+        TT_PLUS: 0,
+        TT_MINUS: 0,
+        TT_LPAREN: 0,
+        TT_LSQUARE: 0,
+        TT_NEWLINE: 0,
+        TT_SEA: 0,
+        TT_FIJA: 0,
+        TT_JAMAS: 0,
+        TT_SI: 0,
+        TT_MIENTRAS: 0,
+        TT_PARA: 0,
+        TT_DEFINE: 0,
+        TT_ENTREGA: 0,
+        TT_SIGUE: 0,
+        TT_ROMPE: 0,
+    },
+    101: {  # block
+        TT_LBRACE: 1,
+    },
+    102: {  # statements
+        TT_INT: 8,
+        TT_FLOAT: 8,
+        TT_IDENTIFIER: 8,
+        TT_STRING: 8,
+        TT_PLUS: 8,
+        TT_MINUS: 8,
+        TT_LPAREN: 8,
+        TT_LSQUARE: 8,
+        TT_NEWLINE: 8,
+        TT_SEA: 8,
+        TT_FIJA: 8,
+        TT_JAMAS: 8,
+        TT_SI: 8,
+        TT_MIENTRAS: 8,
+        TT_PARA: 8,
+        TT_DEFINE: 8,
+        TT_ENTREGA: 8,
+        TT_SIGUE: 8,
+        TT_ROMPE: 8,
+    },
+    103: {  # statement
+        TT_INT: 14,
+        TT_FLOAT: 14,
+        TT_IDENTIFIER: 14,
+        TT_STRING: 14,
+        TT_PLUS: 14,
+        TT_MINUS: 14,
+        TT_LPAREN: 14,
+        TT_LSQUARE: 14,
+        TT_SEA: 14,
+        TT_FIJA: 14,
+        TT_JAMAS: 14,
+        TT_SI: 14,
+        TT_MIENTRAS: 14,
+        TT_PARA: 14,
+        TT_DEFINE: 14,
+        TT_ENTREGA: 11,
+        TT_SIGUE: 12,
+        TT_ROMPE: 13,
+    },
+    104: {  # expr
+        TT_INT: 21,
+        TT_FLOAT: 21,
+        TT_IDENTIFIER: 21,
+        TT_STRING: 21,
+        TT_PLUS: 21,
+        TT_MINUS: 21,
+        TT_LPAREN: 21,
+        TT_LSQUARE: 21,
+        TT_SEA: 15,
+        TT_FIJA: 16,
+        TT_JAMAS: 21,
+        TT_SI: 21,
+        TT_MIENTRAS: 21,
+        TT_PARA: 21,
+        TT_DEFINE: 21,
+    },
+    105: {  # comp
+        TT_INT: 31,
+        TT_FLOAT: 31,
+        TT_IDENTIFIER: 31,
+        TT_STRING: 31,
+        TT_PLUS: 31,
+        TT_MINUS: 31,
+        TT_LPAREN: 31,
+        TT_LSQUARE: 31,
+        TT_JAMAS: 22,
+        TT_SI: 31,
+        TT_MIENTRAS: 31,
+        TT_PARA: 31,
+        TT_DEFINE: 31,
+    },
+    106: {  # math
+        TT_INT: 36,
+        TT_FLOAT: 36,
+        TT_IDENTIFIER: 36,
+        TT_STRING: 36,
+        TT_PLUS: 36,
+        TT_MINUS: 36,
+        TT_LPAREN: 36,
+        TT_LSQUARE: 36,
+        TT_SI: 36,
+        TT_MIENTRAS: 36,
+        TT_PARA: 36,
+        TT_DEFINE: 36,
+    },
+    107: {  # term
+        TT_INT: 43,
+        TT_FLOAT: 43,
+        TT_IDENTIFIER: 43,
+        TT_STRING: 43,
+        TT_PLUS: 43,
+        TT_MINUS: 43,
+        TT_LPAREN: 43,
+        TT_LSQUARE: 43,
+        TT_SI: 43,
+        TT_MIENTRAS: 43,
+        TT_PARA: 43,
+        TT_DEFINE: 43,
+    },
+    108: {  # factor
+        TT_INT: 47,
+        TT_FLOAT: 47,
+        TT_IDENTIFIER: 47,
+        TT_STRING: 47,
+        TT_PLUS: 46,
+        TT_MINUS: 46,
+        TT_LPAREN: 47,
+        TT_LSQUARE: 47,
+        TT_SI: 47,
+        TT_MIENTRAS: 47,
+        TT_PARA: 47,
+        TT_DEFINE: 47,
+    },
+    109: {  # power
+        TT_INT: 50,
+        TT_FLOAT: 50,
+        TT_IDENTIFIER: 50,
+        TT_STRING: 50,
+        TT_LPAREN: 50,
+        TT_LSQUARE: 50,
+        TT_SI: 50,
+        TT_MIENTRAS: 50,
+        TT_PARA: 50,
+        TT_DEFINE: 50,
+    },
+    110: {  # call
+        TT_INT: 57,
+        TT_FLOAT: 57,
+        TT_IDENTIFIER: 57,
+        TT_STRING: 57,
+        TT_LPAREN: 57,
+        TT_LSQUARE: 57,
+        TT_SI: 57,
+        TT_MIENTRAS: 57,
+        TT_PARA: 57,
+        TT_DEFINE: 57,
+    },
+    111: {  # atom
+        TT_INT: 58,
+        TT_FLOAT: 59,
+        TT_IDENTIFIER: 61,
+        TT_STRING: 60,
+        TT_LPAREN: 62,
+        TT_LSQUARE: 63,
+        TT_SI: 64,
+        TT_MIENTRAS: 66,
+        TT_PARA: 65,
+        TT_DEFINE: 67,
+    },
+    112: {  # list
+        TT_LSQUARE: 72,
+    },
+    113: {  # if
+        TT_SI: 77,
+    },
+    114: {  # for
+        TT_PARA: 80,
+    },
+    115: {  # while
+        TT_MIENTRAS: 81,
+    },
+    116: {  # define
+        TT_DEFINE: 88,
+    },
+    117: {  # statements.1
+        TT_INT: 3,
+        TT_FLOAT: 3,
+        TT_IDENTIFIER: 3,
+        TT_STRING: 3,
+        TT_PLUS: 3,
+        TT_MINUS: 3,
+        TT_LPAREN: 3,
+        TT_LSQUARE: 3,
+        TT_NEWLINE: 2,
+        TT_SEA: 3,
+        TT_FIJA: 3,
+        TT_JAMAS: 3,
+        TT_SI: 3,
+        TT_MIENTRAS: 3,
+        TT_PARA: 3,
+        TT_DEFINE: 3,
+        TT_ENTREGA: 3,
+        TT_SIGUE: 3,
+        TT_ROMPE: 3,
+    },
+    118: {  # statements.2
+        TT_RBRACE: 7,
+        TT_NEWLINE: 6,
+        TT_EOF: 7,
+    },
+    119: {  # statements.3
+        TT_INT: 4,
+        TT_FLOAT: 4,
+        TT_IDENTIFIER: 4,
+        TT_STRING: 4,
+        TT_PLUS: 4,
+        TT_MINUS: 4,
+        TT_LPAREN: 4,
+        TT_RBRACE: 5,
+        TT_LSQUARE: 4,
+        TT_NEWLINE: 5,
+        TT_EOF: 5,
+        TT_SEA: 4,
+        TT_FIJA: 4,
+        TT_JAMAS: 4,
+        TT_SI: 4,
+        TT_MIENTRAS: 4,
+        TT_PARA: 4,
+        TT_DEFINE: 4,
+        TT_ENTREGA: 4,
+        TT_SIGUE: 4,
+        TT_ROMPE: 4,
+    },
+    120: {  # statement.1
+        TT_INT: 9,
+        TT_FLOAT: 9,
+        TT_IDENTIFIER: 9,
+        TT_STRING: 9,
+        TT_PLUS: 9,
+        TT_MINUS: 9,
+        TT_LPAREN: 9,
+        TT_RBRACE: 10,
+        TT_LSQUARE: 9,
+        TT_NEWLINE: 10,
+        TT_EOF: 10,
+        TT_SEA: 9,
+        TT_FIJA: 9,
+        TT_JAMAS: 9,
+        TT_SI: 9,
+        TT_MIENTRAS: 9,
+        TT_PARA: 9,
+        TT_DEFINE: 9,
+    },
+    121: {  # expr.1
+        TT_RPAREN: 20,
+        TT_LBRACE: 20,
+        TT_RBRACE: 20,
+        TT_RSQUARE: 20,
+        TT_COMMA: 20,
+        TT_NEWLINE: 20,
+        TT_EOF: 20,
+        TT_Y: 19,
+        TT_O: 19,
+        TT_HASTA: 20,
+        TT_PASO: 20,
+    },
+    122: {  # expr.2
+        TT_Y: 17,
+        TT_O: 18,
+    },
+    123: {  # comp.1
+        TT_EE: 29,
+        TT_NE: 29,
+        TT_LT: 29,
+        TT_GT: 29,
+        TT_LTE: 29,
+        TT_GTE: 29,
+        TT_RPAREN: 30,
+        TT_LBRACE: 30,
+        TT_RBRACE: 30,
+        TT_RSQUARE: 30,
+        TT_COMMA: 30,
+        TT_NEWLINE: 30,
+        TT_EOF: 30,
+        TT_Y: 30,
+        TT_O: 30,
+        TT_HASTA: 30,
+        TT_PASO: 30,
+    },
+    124: {  # comp.2
+        TT_EE: 23,
+        TT_NE: 24,
+        TT_LT: 25,
+        TT_GT: 26,
+        TT_LTE: 27,
+        TT_GTE: 28,
+    },
+    125: {  # math.1
+        TT_PLUS: 34,
+        TT_MINUS: 34,
+        TT_EE: 35,
+        TT_NE: 35,
+        TT_LT: 35,
+        TT_GT: 35,
+        TT_LTE: 35,
+        TT_GTE: 35,
+        TT_RPAREN: 35,
+        TT_LBRACE: 35,
+        TT_RBRACE: 35,
+        TT_RSQUARE: 35,
+        TT_COMMA: 35,
+        TT_NEWLINE: 35,
+        TT_EOF: 35,
+        TT_Y: 35,
+        TT_O: 35,
+        TT_HASTA: 35,
+        TT_PASO: 35,
+    },
+    126: {  # math.2
+        TT_PLUS: 32,
+        TT_MINUS: 33,
+    },
+    127: {  # term.1
+        TT_PLUS: 42,
+        TT_MINUS: 42,
+        TT_MUL: 41,
+        TT_DIV: 41,
+        TT_MOD: 41,
+        TT_FLOORDIV: 41,
+        TT_EE: 42,
+        TT_NE: 42,
+        TT_LT: 42,
+        TT_GT: 42,
+        TT_LTE: 42,
+        TT_GTE: 42,
+        TT_RPAREN: 42,
+        TT_LBRACE: 42,
+        TT_RBRACE: 42,
+        TT_RSQUARE: 42,
+        TT_COMMA: 42,
+        TT_NEWLINE: 42,
+        TT_EOF: 42,
+        TT_Y: 42,
+        TT_O: 42,
+        TT_HASTA: 42,
+        TT_PASO: 42,
+    },
+    128: {  # term.2
+        TT_MUL: 37,
+        TT_DIV: 38,
+        TT_MOD: 39,
+        TT_FLOORDIV: 40,
+    },
+    129: {  # factor.1
+        TT_PLUS: 44,
+        TT_MINUS: 45,
+    },
+    130: {  # power.1
+        TT_PLUS: 49,
+        TT_MINUS: 49,
+        TT_MUL: 49,
+        TT_DIV: 49,
+        TT_MOD: 49,
+        TT_FLOORDIV: 49,
+        TT_POW: 48,
+        TT_EE: 49,
+        TT_NE: 49,
+        TT_LT: 49,
+        TT_GT: 49,
+        TT_LTE: 49,
+        TT_GTE: 49,
+        TT_RPAREN: 49,
+        TT_LBRACE: 49,
+        TT_RBRACE: 49,
+        TT_RSQUARE: 49,
+        TT_COMMA: 49,
+        TT_NEWLINE: 49,
+        TT_EOF: 49,
+        TT_Y: 49,
+        TT_O: 49,
+        TT_HASTA: 49,
+        TT_PASO: 49,
+    },
+    131: {  # call.1
+        TT_PLUS: 56,
+        TT_MINUS: 56,
+        TT_MUL: 56,
+        TT_DIV: 56,
+        TT_MOD: 56,
+        TT_FLOORDIV: 56,
+        TT_POW: 56,
+        TT_EE: 56,
+        TT_NE: 56,
+        TT_LT: 56,
+        TT_GT: 56,
+        TT_LTE: 56,
+        TT_GTE: 56,
+        TT_LPAREN: 55,
+        TT_RPAREN: 56,
+        TT_LBRACE: 56,
+        TT_RBRACE: 56,
+        TT_RSQUARE: 56,
+        TT_COMMA: 56,
+        TT_NEWLINE: 56,
+        TT_EOF: 56,
+        TT_Y: 56,
+        TT_O: 56,
+        TT_HASTA: 56,
+        TT_PASO: 56,
+    },
+    132: {  # call.2
+        TT_INT: 53,
+        TT_FLOAT: 53,
+        TT_IDENTIFIER: 53,
+        TT_STRING: 53,
+        TT_PLUS: 53,
+        TT_MINUS: 53,
+        TT_LPAREN: 53,
+        TT_RPAREN: 54,
+        TT_LSQUARE: 53,
+        TT_SEA: 53,
+        TT_FIJA: 53,
+        TT_JAMAS: 53,
+        TT_SI: 53,
+        TT_MIENTRAS: 53,
+        TT_PARA: 53,
+        TT_DEFINE: 53,
+    },
+    133: {  # call.3
+        TT_RPAREN: 52,
+        TT_COMMA: 51,
+    },
+    134: {  # list.1
+        TT_INT: 70,
+        TT_FLOAT: 70,
+        TT_IDENTIFIER: 70,
+        TT_STRING: 70,
+        TT_PLUS: 70,
+        TT_MINUS: 70,
+        TT_LPAREN: 70,
+        TT_LSQUARE: 70,
+        TT_RSQUARE: 71,
+        TT_SEA: 70,
+        TT_FIJA: 70,
+        TT_JAMAS: 70,
+        TT_SI: 70,
+        TT_MIENTRAS: 70,
+        TT_PARA: 70,
+        TT_DEFINE: 70,
+    },
+    135: {  # list.2
+        TT_RSQUARE: 69,
+        TT_COMMA: 68,
+    },
+    136: {  # if.1
+        TT_PLUS: 74,
+        TT_MINUS: 74,
+        TT_MUL: 74,
+        TT_DIV: 74,
+        TT_MOD: 74,
+        TT_FLOORDIV: 74,
+        TT_POW: 74,
+        TT_EE: 74,
+        TT_NE: 74,
+        TT_LT: 74,
+        TT_GT: 74,
+        TT_LTE: 74,
+        TT_GTE: 74,
+        TT_LPAREN: 74,
+        TT_RPAREN: 74,
+        TT_LBRACE: 74,
+        TT_RBRACE: 74,
+        TT_RSQUARE: 74,
+        TT_COMMA: 74,
+        TT_NEWLINE: 74,
+        TT_EOF: 74,
+        TT_Y: 74,
+        TT_O: 74,
+        TT_QUIZAS: 73,
+        TT_SINO: 74,
+        TT_HASTA: 74,
+        TT_PASO: 74,
+    },
+    137: {  # if.2
+        TT_PLUS: 76,
+        TT_MINUS: 76,
+        TT_MUL: 76,
+        TT_DIV: 76,
+        TT_MOD: 76,
+        TT_FLOORDIV: 76,
+        TT_POW: 76,
+        TT_EE: 76,
+        TT_NE: 76,
+        TT_LT: 76,
+        TT_GT: 76,
+        TT_LTE: 76,
+        TT_GTE: 76,
+        TT_LPAREN: 76,
+        TT_RPAREN: 76,
+        TT_LBRACE: 76,
+        TT_RBRACE: 76,
+        TT_RSQUARE: 76,
+        TT_COMMA: 76,
+        TT_NEWLINE: 76,
+        TT_EOF: 76,
+        TT_Y: 76,
+        TT_O: 76,
+        TT_SINO: 75,
+        TT_HASTA: 76,
+        TT_PASO: 76,
+    },
+    138: {  # for.1
+        TT_LBRACE: 79,
+        TT_PASO: 78,
+    },
+    139: {  # define.1
+        TT_IDENTIFIER: 82,
+        TT_LPAREN: 83,
+    },
+    140: {  # define.2
+        TT_IDENTIFIER: 86,
+        TT_RPAREN: 87,
+    },
+    141: {  # define.3
+        TT_RPAREN: 85,
+        TT_COMMA: 84,
+    },
+}
+
+# The production that skips a repetition or option, taken on any other
+# lookahead so that a syntax error is reported where something is missing
+DEFAULTS = {
+    117: 3,  # statements.1
+    119: 5,  # statements.3
+    118: 7,  # statements.2
+    120: 10,  # statement.1
+    121: 20,  # expr.1
+    123: 30,  # comp.1
+    125: 35,  # math.1
+    127: 42,  # term.1
+    130: 49,  # power.1
+    133: 52,  # call.3
+    132: 54,  # call.2
+    131: 56,  # call.1
+    135: 69,  # list.2
+    134: 71,  # list.1
+    136: 74,  # if.1
+    137: 76,  # if.2
+    138: 79,  # for.1
+    139: 83,  # define.1
+    141: 85,  # define.3
+    140: 87,  # define.2
+}
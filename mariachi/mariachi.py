@@ -1,8 +1,15 @@
+import os
 from pathlib import Path
 
 from .values import *
 from .lexer import *
 from .parser import *
+from .table_parser import TableParser
+from .node_store import NodeStore
+from .resolver import resolve
+from . import closure_compiler, native, transpiler, unwinding, vm
+from .bytecode import compile_program, disassemble
+from . import cache
 from .interpreter import *
 
 global_symbol_table = SymbolTable()
@@ -22,34 +29,227 @@ global_symbol_table.set("pon", BuiltInFunction.pon)
 global_symbol_table.set("roba", BuiltInFunction.roba)
 global_symbol_table.set("extiende", BuiltInFunction.extiende)
 
+# The parsers run() can build the AST with
+PARSERS = {
+    "recursive": Parser,
+    "table": TableParser,
+}
 
-def run(fn, code, symbol_table=None):
-    """The code runner used to parse the code and tokenize inputs."""
-    # Generates the tokens
-    lexer = Lexer(fn, code)
-    tokens, error = lexer.make_tokens()
+
+def run_tree(ast, context, resolution):
+    """Walks a resolved AST with the Interpreter, returns its value and error."""
+    result = Interpreter(resolution).visit(ast, context)
+    return result.value, result.error
+
+
+# The engines run() can execute the AST with, given the AST, the context
+# and the Resolution of its names
+ENGINES = {
+    "tree": run_tree,
+    "unwind": unwinding.execute,
+    "native": native.execute,
+    "closure": closure_compiler.execute,
+    "vm": vm.execute,
+    "python": transpiler.execute,
+}
+
+
+def run(fn, code, symbol_table=None, parser="recursive", compact=False, engine="tree"):
+    """The code runner used to parse the code and tokenize inputs.
+
+    parser names one of PARSERS, the hand written recursive descent parser
+    or the table parser generated from grammar/grammar.txt. With compact
+    the AST is packed into a NodeStore before it runs. engine names one of
+    ENGINES, the tree walking Interpreter by default.
+    """
+    return run_lexer(Lexer(fn, code), symbol_table, parser, compact, engine)
+
+
+def run_lexer(
+    lexer, symbol_table=None, parser="recursive", compact=False, engine="tree"
+):
+    """Parses and runs the tokens of a lexer as they are generated."""
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine {engine!r}")
+    ast, error = parse_lexer(lexer, parser)
     if error:
         return None, error
+    if compact:
+        store = NodeStore.pack(ast)
+        ast = store.node(store.root)
+    return interpret(ast, engine)
+
+
+def parse_lexer(lexer, parser="recursive"):
+    """Builds the AST of the tokens of a lexer, returns it and the error."""
+    if parser not in PARSERS:
+        raise ValueError(f"unknown parser {parser!r}")
+
+    # Generates the tokens, the parser pulls them one at a time
+    tokens = lexer.generate_tokens()
 
     # Generates the AST
-    parser = Parser(tokens)
-    ast = parser.parse()
+    ast = PARSERS[parser](tokens).parse()
+
+    # A bad character anywhere in the file is reported before syntax errors
+    if ast.error and not lexer.error:
+        for _ in tokens:
+            pass
+    if lexer.error:
+        return None, lexer.error
     if ast.error:
         return None, ast.error
+    return ast.node, None
+
+
+def interpret(ast, engine="tree"):
+    """Runs an AST in the global context with one of ENGINES.
+
+    Names bound nowhere are reported before the AST runs.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine {engine!r}")
+    context = global_context()
+    resolution, error = resolve(ast, context)
+    if error:
+        return None, error
+    try:
+        return ENGINES[engine](ast, context, resolution)
+    except RecursionError as e:
+        return None, too_deep(e, ast.pos_start, ast.pos_end, context)
 
-    # Run interpreter
-    interpreter = Interpreter()
-    context = Context("<programma>")
 
+def too_deep(recursion_error, pos_start, pos_end, context):
+    """The error of a program whose calls or expressions nest deeper than
+    the Python stack allows. Only the vm engine keeps them off it.
+
+    The error points at the innermost call found in the traceback of the
+    RecursionError, or at the program span when there is none.
+    """
+    call = innermost_call(recursion_error.__traceback__)
+    if call:
+        pos_start, pos_end, context = call.parent_entry_pos, None, call.parent
+    return EjecucionError(
+        pos_start,
+        pos_end,
+        "Demasiadas llamadas anidadas, --engine vm permite una recursion mas profunda",
+        context,
+    )
+
+
+def innermost_call(tb):
+    """The context of the innermost call in the frames of a traceback."""
+    call = None
+    while tb:
+        contexts = [
+            value
+            for value in tb.tb_frame.f_locals.values()
+            if isinstance(value, Context)
+        ]
+        for value in contexts:
+            # A frame may hold the context of a call and the one it is made in
+            if value.parent and not any(other.parent is value for other in contexts):
+                call = value
+                break
+        tb = tb.tb_next
+    return call
+
+
+def global_context():
+    context = Context("<programma>")
     context.symbol_table = global_symbol_table
-    result = interpreter.visit(ast.node, context)
-    return result.value, result.error
+    return context
+
+
+def parse_path(path, parser="recursive", use_cache=True):
+    """Builds the AST of a script file, returns it, its source and the error.
+
+    The script is streamed from disk instead of being read all at once, and
+    with use_cache its AST is kept in __marcache__ next to it, so that it
+    is only parsed again after it changed. The source must be kept until
+    the errors of the AST are displayed.
+    """
+
+    def parse(path):
+        lexer = Lexer.from_file(path)
+        ast, error = parse_lexer(lexer, parser)
+        return ast, lexer.source, error
+
+    if use_cache:
+        return cache.parse_file(path, parse)
+    return parse(path)
+
+
+def run_path(path, parser="recursive", use_cache=True, engine="tree"):
+    """Runs a script file, see parse_path()."""
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine {engine!r}")
+    if engine == "python":
+        code, source, error = transpile_path(path, parser, use_cache)
+        if error:
+            return None, error
+        context = global_context()
+        try:
+            return transpiler.run_code(code, source, context)
+        except RecursionError as e:
+            return None, too_deep(e, source.base, source.base, context)
+
+    ast, source, error = parse_path(path, parser, use_cache)
+    if error:
+        return None, error
+    # Runtime errors find the script through the source, held until here
+    result = interpret(ast, engine)
+    del source
+    return result
+
+
+def transpile_path(path, parser="recursive", use_cache=True):
+    """The Python code object of a script file, its source and the error.
+
+    With use_cache the code object is kept in __marcache__ as well, so that
+    an unchanged script is neither parsed nor transpiled again.
+    """
+
+    def transpile(path):
+        ast, source, error = parse_path(path, parser, use_cache)
+        if not error:
+            resolution, error = resolve(ast, global_context())
+        if error:
+            return None, source, error
+        try:
+            code = transpiler.compile_ast(ast, os.fspath(path), resolution)
+            return code, source, None
+        except RecursionError as e:
+            error = too_deep(e, ast.pos_start, ast.pos_end, global_context())
+            return None, source, error
+
+    if use_cache:
+        return cache.compile_file(path, transpile)
+    return transpile(path)
+
+
+def emit_python_path(path, parser="recursive", use_cache=True):
+    """The Python source a script file is transpiled to, and the error."""
+    ast, source, error = parse_path(path, parser, use_cache)
+    if not error:
+        resolution, error = resolve(ast, global_context())
+    if error:
+        return None, error
+    return transpiler.transpile(ast, os.fspath(path), resolution), None
+
+
+def disassemble_path(path, parser="recursive", use_cache=True):
+    """The bytecode of a script file as text, and the error."""
+    ast, source, error = parse_path(path, parser, use_cache)
+    if not error:
+        resolution, error = resolve(ast, global_context())
+    if error:
+        return None, error
+    return disassemble(compile_program(ast, resolution=resolution)), None
 
 
 def run_file(file):
-    fn = Path(file)
-    script = fn.read_text(encoding="utf-8")
-    result, error = run(fn, script)
+    result, error = run_path(Path(file))
 
     if error:
         print(error.as_string())
@@ -0,0 +1,429 @@
+"""A runtime where numbers and strings are bare Python int, float and str.
+
+The interpreter walks the AST like the UnwindingInterpreter, but the value
+of a number or string node is the Python object itself: arithmetic on two
+numbers is a single Python operation and nothing is allocated for the
+counter of a para loop. Lists, functions and errors keep their Value
+classes, as do lists and functions inside of them.
+
+A bare value has no position or context, when one is needed, for an error
+or for anything but two numbers, it is wrapped into a Number or String
+positioned at the node that produced it, and the Value method does the
+work. Builtins are called the same way, so BuiltInFunction works
+unchanged, and execute() wraps the final result, so callers get the same
+values as from the other engines.
+"""
+
+import operator
+
+from .token import *
+from .results import *
+from .errors import *
+from .interpreter import (
+    OPERATOR_METHODS,
+    SHORT_CIRCUITS,
+    BaseFunction,
+    Function,
+    List,
+    Number,
+    String,
+    VisitMethods,
+    loop_steps,
+    operation_error,
+    unary_error,
+    value_span,
+)
+
+# What each operator does to two numbers
+NUMBER_OPERATIONS = {
+    TT_PLUS: operator.add,
+    TT_MINUS: operator.sub,
+    TT_MUL: operator.mul,
+    TT_DIV: operator.truediv,
+    TT_POW: operator.pow,
+    TT_MOD: operator.mod,
+    TT_FLOORDIV: operator.floordiv,
+    TT_NE: lambda a, b: int(a != b),
+    TT_EE: lambda a, b: int(a == b),
+    TT_LT: lambda a, b: int(a < b),
+    TT_LTE: lambda a, b: int(a <= b),
+    TT_GT: lambda a, b: int(a > b),
+    TT_GTE: lambda a, b: int(a >= b),
+    TT_Y: lambda a, b: int(a and b),
+    TT_O: lambda a, b: int(a or b),
+}
+
+# The operators that fail when the right number is zero
+DIVISIONS = frozenset((TT_DIV, TT_MOD, TT_FLOORDIV))
+
+
+def wrap(value, context, node):
+    """The Value of a bare value, positioned at the node it came from."""
+    cls = value.__class__
+    if cls is int or cls is float:
+        return Number(value).with_meta(context, *value_span(node))
+    if cls is str:
+        return String(value).with_meta(context, *value_span(node))
+    return value
+
+
+def unwrap(value):
+    """The bare value of a Number or String."""
+    cls = value.__class__
+    if cls is Number or cls is String:
+        return value.value
+    return value
+
+
+def to_value(value, converted=None):
+    """Wraps a bare value, and those in lists, for code outside the runtime."""
+    cls = value.__class__
+    if cls is int or cls is float:
+        return Number(value)
+    if cls is str:
+        return String(value)
+    if cls is not List:
+        return value
+
+    if converted is None:
+        converted = {}
+    if id(value) in converted:
+        return converted[id(value)]
+    copy = List([])
+    copy.set_position(value.pos_start, value.pos_end).set_context(value.context)
+    converted[id(value)] = copy
+    copy.elements = [to_value(element, converted) for element in value.elements]
+    return copy
+
+
+def is_true(value):
+    cls = value.__class__
+    if cls is int or cls is float:
+        return value != 0
+    if cls is str:
+        return len(value) > 0
+    return value.is_true()
+
+
+def number_value(value):
+    cls = value.__class__
+    if cls is int or cls is float or cls is str:
+        return value
+    return value.value
+
+
+class NativeFunction(Function):
+    """A function defined in the native runtime, run by its interpreter."""
+
+    def __init__(
+        self, name, body_node, arg_names, should_auto_return, interpreter, scope=None
+    ):
+        super().__init__(name, body_node, arg_names, should_auto_return, scope)
+        self.interpreter = interpreter
+
+    def call(self, args, node, context):
+        """Runs the function and returns its bare value, raising on errors."""
+        if len(args) != len(self.arg_names):
+            args = [
+                wrap(arg, context, arg_node)
+                for arg, arg_node in zip(args, node.arg_nodes)
+            ]
+            function = self.copy().with_meta(context, node.pos_start, node.pos_end)
+            raise RuntimeFailure(function.check_args(self.arg_names, args).error)
+
+        exec_ctx = self.frame(args, context, node.pos_start)
+        try:
+            value = self.interpreter.visit(self.body_node, exec_ctx)
+        except ReturnValue as e:
+            return e.value
+        return value if self.should_auto_return else 0
+
+    def copy(self):
+        copy = NativeFunction(
+            self.name,
+            self.body_node,
+            self.arg_names,
+            self.should_auto_return,
+            self.interpreter,
+            self.scope,
+        )
+        copy.set_context(self.context)
+        copy.set_position(self.pos_start, self.pos_end)
+        return copy
+
+
+class NativeInterpreter:
+    """Walks the AST with bare values, one visit method per node class."""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.visit_methods = VisitMethods(cls)
+
+    def __init__(self, resolution=None):
+        self.resolution = resolution
+
+    def visit(self, node, context):
+        return self.visit_methods[node.__class__](self, node, context)
+
+    def no_visit_method(self, node, context):
+        raise Exception(f"No visit_{type(node).__name__} method defined.")
+
+    def visit_NumberNode(self, node, context):
+        return node.tok.value
+
+    def visit_StringNode(self, node, context):
+        return node.tok.value
+
+    def visit_BinaryOpNode(self, node, context):
+        left = self.visit(node.left_node, context)
+        op = node.op_tok.type
+        if op in SHORT_CIRCUITS:
+            # A number deciding the value alone, like short_circuit()
+            left_class = left.__class__
+            if (left_class is int or left_class is float) and (
+                left if op == TT_O else not left
+            ):
+                return int(left)
+        right = self.visit(node.right_node, context)
+
+        left_class = left.__class__
+        right_class = right.__class__
+        if (left_class is int or left_class is float) and (
+            right_class is int or right_class is float
+        ):
+            operation = NUMBER_OPERATIONS.get(op)
+            if operation is not None and not (op in DIVISIONS and right == 0):
+                return operation(left, right)
+
+        method = OPERATOR_METHODS.get(op)
+        if method is None:
+            raise RuntimeFailure(
+                EjecucionError(
+                    node.pos_start,
+                    node.pos_end,
+                    f"Operador desconocido '{node.op_tok}'",
+                    context,
+                )
+            )
+
+        # Anything else is done by the Value methods
+        left = wrap(left, context, node.left_node)
+        right = wrap(right, context, node.right_node)
+        result, error = getattr(left, method)(right)
+        if error:
+            raise RuntimeFailure(
+                operation_error(
+                    left,
+                    right,
+                    method,
+                    context,
+                    value_span(node.left_node),
+                    value_span(node.right_node),
+                )
+            )
+        return unwrap(result)
+
+    def visit_UnaryOpNode(self, node, context):
+        value = self.visit(node.node, context)
+        value_class = value.__class__
+        op = node.op_tok.type
+
+        if value_class is int or value_class is float:
+            if op == TT_MINUS:
+                return value * -1
+            if op == TT_JAMAS:
+                return 1 if value == 0 else 0
+            return value
+
+        if op not in (TT_MINUS, TT_JAMAS):
+            return value
+
+        value = wrap(value, context, node.node)
+        if op == TT_MINUS:
+            result, error = value.multed_by(Number(-1))
+        else:
+            result, error = value.notted()
+        if error:
+            raise RuntimeFailure(unary_error(value, op, context, value_span(node.node)))
+        return unwrap(result)
+
+    def visit_VarAssignNode(self, node, context):
+        value = self.visit(node.value_node, context)
+        context.symbol_table.set(node.var_name_tok.value, value)
+        return value
+
+    def load(self, node, context):
+        var_name = node.var_name_tok.value
+        value = context.symbol_table.get(var_name)
+        if value is None:
+            raise RuntimeFailure(
+                EjecucionError(
+                    node.pos_start,
+                    node.pos_end,
+                    f"'{var_name}' no es definido",
+                    context,
+                )
+            )
+        return value
+
+    def visit_VarAccessNode(self, node, context):
+        value = self.load(node, context)
+        cls = value.__class__
+        if cls is int or cls is float or cls is str:
+            return value
+        if cls is Number or cls is String:
+            # nada, cierto and falso are Values in the global table
+            return value.value
+        return value
+
+    def visit_ConstAssignNode(self, node, context):
+        value = self.visit(node.value_node, context)
+        try:
+            context.symbol_table.set_const(node.const_name_tok.value, value)
+        except Exception as e:
+            raise RuntimeFailure(
+                EjecucionError(node.pos_start, node.pos_end, str(e), context)
+            )
+        return value
+
+    def visit_ConstAccessNode(self, node, context):
+        value = self.load(node, context)
+        cls = value.__class__
+        if cls is int or cls is float or cls is str:
+            return value
+        if cls is Number or cls is String:
+            return value.value
+        return value
+
+    def visit_IfNode(self, node, context):
+        for condition, expr in node.cases:
+            if is_true(self.visit(condition, context)):
+                return self.visit(expr, context)
+
+        if node.else_case:
+            return self.visit(node.else_case, context)
+        return 0
+
+    def visit_ForNode(self, node, context):
+        # None when the value of the loop is never used
+        elements = None if self.resolution and self.resolution.discards(node) else []
+        var_name = node.var_name_tok.value
+        symbol_table = context.symbol_table
+
+        start = number_value(self.visit(node.start_value_node, context))
+        end = number_value(self.visit(node.end_value_node, context))
+        if node.step_value_node:
+            step = number_value(self.visit(node.step_value_node, context))
+        else:
+            step = 1
+
+        # Past the first step, the variable of a quiet loop is set on leaving
+        quiet = self.resolution is not None and self.resolution.quiet_counter(node)
+        write = True
+        i = None
+
+        for i in loop_steps(start, end, step):
+            if write:
+                symbol_table.set(var_name, i)
+                write = not quiet
+
+            try:
+                value = self.visit(node.body_node, context)
+            except ContinueLoop:
+                continue
+            except BreakLoop:
+                break
+            if elements is not None:
+                elements.append(value)
+        if quiet and i is not None:
+            symbol_table.set(var_name, i)
+        if elements is None:
+            return 0
+        return List(elements).with_meta(context, node.pos_start, node.pos_end)
+
+    def visit_WhileNode(self, node, context):
+        elements = None if self.resolution and self.resolution.discards(node) else []
+        while is_true(self.visit(node.condition_node, context)):
+            try:
+                value = self.visit(node.body_node, context)
+            except ContinueLoop:
+                continue
+            except BreakLoop:
+                break
+            if elements is not None:
+                elements.append(value)
+        if elements is None:
+            return 0
+        return List(elements).with_meta(context, node.pos_start, node.pos_end)
+
+    def visit_FuncDefNode(self, node, context):
+        func_name = node.var_name_tok.value if node.var_name_tok else None
+        arg_names = [arg_name.value for arg_name in node.arg_name_toks]
+        scope = self.resolution.scope(node) if self.resolution else None
+        func_value = NativeFunction(
+            func_name, node.body_node, arg_names, node.should_auto_return, self, scope
+        ).with_meta(context, node.pos_start, node.pos_end)
+
+        if func_name:
+            context.symbol_table.set(func_name, func_value)
+        return func_value
+
+    def visit_CallNode(self, node, context):
+        value_to_call = self.visit(node.node_to_call, context)
+        args = [self.visit(arg_node, context) for arg_node in node.arg_nodes]
+
+        if value_to_call.__class__ is NativeFunction:
+            return value_to_call.call(args, node, context)
+
+        # Builtins get Values and give one back
+        value_to_call = wrap(value_to_call, context, node.node_to_call)
+        args = [
+            wrap(arg, context, arg_node) for arg, arg_node in zip(args, node.arg_nodes)
+        ]
+        if isinstance(value_to_call, BaseFunction):
+            res = value_to_call.execute(args, context, node.pos_start, node.pos_end)
+        else:
+            value_to_call = value_to_call.copy().with_meta(
+                context, node.pos_start, node.pos_end
+            )
+            res = value_to_call.execute(args)
+        if res.error:
+            raise RuntimeFailure(res.error)
+        return unwrap(res.value)
+
+    def visit_ListNode(self, node, context):
+        elements = [
+            self.visit(element_node, context) for element_node in node.element_nodes
+        ]
+        return List(elements).with_meta(context, node.pos_start, node.pos_end)
+
+    def visit_BlockNode(self, node, context):
+        result = 0
+        for statement in node.statement_nodes.element_nodes:
+            result = self.visit(statement, context)
+        return result
+
+    def visit_ReturnNode(self, node, context):
+        if node.node_to_return:
+            raise ReturnValue(self.visit(node.node_to_return, context))
+        raise ReturnValue(0)
+
+    def visit_BreakNode(self, node, context):
+        raise BreakLoop
+
+    def visit_ContinueNode(self, node, context):
+        raise ContinueLoop
+
+
+NativeInterpreter.visit_methods = VisitMethods(NativeInterpreter)
+
+
+def execute(ast, context, resolution):
+    """Walks a resolved AST with bare values, returns its value as Values and error."""
+    try:
+        return to_value(NativeInterpreter(resolution).visit(ast, context)), None
+    except RuntimeFailure as e:
+        return None, e.error
+    except Unwind:
+        # rompe, sigue and entrega outside of loops and functions
+        return None, None
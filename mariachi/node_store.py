@@ -0,0 +1,512 @@
+"""An AST packed into parallel typed arrays instead of node objects.
+
+NodeStore.pack(tree) lays every node of a tree out as a row of a few
+columns: its kind, its positions, its first token and the range of its
+links, the indices of its children in the links column. Tokens are rows of
+their own columns, with their values kept once in a table. Apart from the
+values and the Values of the literals nothing in a store is a Python
+object, so a packed AST takes a fraction of the memory of the tree and is
+cheap for the garbage collector.
+
+The Interpreter walks a store through node(index), which returns a view
+with the attributes of the node class of the row. Views are made on the
+fly and hold nothing but the store and the index.
+"""
+
+from array import array
+
+from . import nodes
+from .interpreter import BINARY_OPERATIONS
+from .token import Token
+
+# A missing child, like the step of a para loop without paso
+NO_NODE = -1
+
+# Flags of a row
+FLAG_AUTO_RETURN = 1  # should_auto_return of a function
+FLAG_RETURN_NULL = 2  # should_return_null of a block
+FLAG_NAMED = 4  # a function with a name, its first token
+
+# The kinds of the rows, in the order of their views below
+NODE_CLASSES = (
+    nodes.NumberNode,
+    nodes.StringNode,
+    nodes.BinaryOpNode,
+    nodes.UnaryOpNode,
+    nodes.VarAssignNode,
+    nodes.VarAccessNode,
+    nodes.ConstAssignNode,
+    nodes.ConstAccessNode,
+    nodes.IfNode,
+    nodes.ForNode,
+    nodes.WhileNode,
+    nodes.FuncDefNode,
+    nodes.CallNode,
+    nodes.ListNode,
+    nodes.BlockNode,
+    nodes.ReturnNode,
+    nodes.ContinueNode,
+    nodes.BreakNode,
+)
+KINDS = {cls: kind for kind, cls in enumerate(NODE_CLASSES)}
+
+
+class NodeStore:
+    """The nodes and tokens of an AST as columns of typed arrays."""
+
+    __slots__ = (
+        "kinds",
+        "starts",
+        "ends",
+        "tokens",
+        "first_links",
+        "link_counts",
+        "flags",
+        "links",
+        "token_types",
+        "token_values",
+        "token_starts",
+        "token_ends",
+        "values",
+        "value_ids",
+        "constants",
+        "source",
+        "root",
+    )
+
+    def __init__(self):
+        # One item per node
+        self.kinds = array("B")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.tokens = array("i")
+        self.first_links = array("i")
+        self.link_counts = array("i")
+        self.flags = array("B")
+        # The children of the nodes, NO_NODE for the missing ones
+        self.links = array("i")
+
+        # One item per token
+        self.token_types = array("B")
+        self.token_values = array("i")
+        self.token_starts = array("q")
+        self.token_ends = array("q")
+
+        # Every distinct token value once
+        self.values = []
+        self.value_ids = {}
+        # The shared Values of the literals, by the index of their value
+        self.constants = {}
+
+        # Blocks keep their source alive for as long as a function needs it
+        self.source = None
+        self.root = NO_NODE
+
+    @classmethod
+    def pack(cls, tree):
+        """Packs a tree of nodes, the root is node(store.root)."""
+        store = cls()
+        store.root = store.add(tree)
+        # Only needed while packing
+        store.value_ids = None
+        return store
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def node(self, index):
+        """The view of a node, or None for NO_NODE."""
+        if index == NO_NODE:
+            return None
+        return VIEWS[self.kinds[index]](self, index)
+
+    def token(self, index):
+        return Token(
+            self.token_types[index],
+            self.values[self.token_values[index]],
+            self.token_starts[index],
+            self.token_ends[index],
+        )
+
+    def unpack(self, index=None):
+        """Rebuilds the tree of a node, the root by default."""
+        view = self.node(self.root if index is None else index)
+        return unpack_view(view)
+
+    ####################################
+    # Packing
+
+    def add_token(self, tok):
+        value_key = (tok.value.__class__, tok.value)
+        value_id = self.value_ids.get(value_key)
+        if value_id is None:
+            value_id = self.value_ids[value_key] = len(self.values)
+            self.values.append(tok.value)
+        self.token_types.append(tok.type)
+        self.token_values.append(value_id)
+        self.token_starts.append(tok.pos_start)
+        self.token_ends.append(tok.pos_end)
+        return len(self.token_types) - 1
+
+    def add(self, tree):
+        """Adds the nodes of a tree and returns the index of its root.
+
+        Nodes are added parents first, their children are filled in once
+        they are added in turn, so deep trees need no recursion.
+        """
+        root = len(self.kinds)
+        # (node, index in the links it goes to)
+        pending = [(tree, NO_NODE)]
+        while pending:
+            node, link = pending.pop()
+            if link != NO_NODE:
+                self.links[link] = NO_NODE if node is None else len(self.kinds)
+            if node is None:
+                continue
+
+            tokens, children, flags = describe(node)
+            self.kinds.append(KINDS[node.__class__])
+            self.starts.append(node.pos_start)
+            self.ends.append(node.pos_end)
+            self.flags.append(flags)
+
+            first_token = NO_NODE
+            for tok in tokens:
+                index = self.add_token(tok)
+                if first_token == NO_NODE:
+                    first_token = index
+            self.tokens.append(first_token)
+            if node.__class__ is nodes.NumberNode or node.__class__ is nodes.StringNode:
+                self.constants[self.token_values[first_token]] = node.value
+
+            first_link = len(self.links)
+            self.first_links.append(first_link)
+            self.link_counts.append(len(children))
+            self.links.extend([NO_NODE] * len(children))
+            for i in range(len(children) - 1, -1, -1):
+                pending.append((children[i], first_link + i))
+
+            if node.__class__ is nodes.BlockNode and node.source is not None:
+                self.source = node.source
+        return root
+
+
+def describe(node):
+    """The tokens, the children and the flags of a node, in row order."""
+    cls = node.__class__
+    if cls is nodes.NumberNode or cls is nodes.StringNode:
+        return (node.tok,), (), 0
+    if cls is nodes.BinaryOpNode:
+        return (node.op_tok,), (node.left_node, node.right_node), 0
+    if cls is nodes.UnaryOpNode:
+        return (node.op_tok,), (node.node,), 0
+    if cls is nodes.VarAssignNode:
+        return (node.var_name_tok,), (node.value_node,), 0
+    if cls is nodes.VarAccessNode or cls is nodes.ConstAccessNode:
+        return (node.var_name_tok,), (), 0
+    if cls is nodes.ConstAssignNode:
+        return (node.const_name_tok,), (node.value_node,), 0
+    if cls is nodes.IfNode:
+        children = [child for case in node.cases for child in case]
+        return (), children + [node.else_case], 0
+    if cls is nodes.ForNode:
+        children = (
+            node.start_value_node,
+            node.end_value_node,
+            node.step_value_node,
+            node.body_node,
+        )
+        return (node.var_name_tok,), children, 0
+    if cls is nodes.WhileNode:
+        return (), (node.condition_node, node.body_node), 0
+    if cls is nodes.FuncDefNode:
+        flags = FLAG_AUTO_RETURN if node.should_auto_return else 0
+        tokens = list(node.arg_name_toks)
+        if node.var_name_tok:
+            tokens.insert(0, node.var_name_tok)
+            flags |= FLAG_NAMED
+        # The arguments are counted by the links, after the body
+        return tokens, [node.body_node] + [None] * len(node.arg_name_toks), flags
+    if cls is nodes.CallNode:
+        return (), [node.node_to_call] + node.arg_nodes, 0
+    if cls is nodes.ListNode:
+        return (), node.element_nodes, 0
+    if cls is nodes.BlockNode:
+        flags = FLAG_RETURN_NULL if node.should_return_null else 0
+        return (), (node.statement_nodes,), flags
+    if cls is nodes.ReturnNode:
+        return (), (node.node_to_return,), 0
+    if cls is nodes.ContinueNode or cls is nodes.BreakNode:
+        return (), (), 0
+    raise TypeError(f"cannot pack {cls.__name__}")
+
+
+def unpack_view(view):
+    """Rebuilds the tree of a view, parents are made after their children."""
+    if view is None:
+        return None
+    cls = NODE_CLASSES[view.store.kinds[view.index]]
+    if cls is nodes.NumberNode or cls is nodes.StringNode:
+        return cls(view.tok, view.value)
+    if cls is nodes.BinaryOpNode:
+        return cls(
+            unpack_view(view.left_node), view.op_tok, unpack_view(view.right_node)
+        )
+    if cls is nodes.UnaryOpNode:
+        return cls(view.op_tok, unpack_view(view.node))
+    if cls is nodes.VarAssignNode:
+        return cls(view.var_name_tok, unpack_view(view.value_node))
+    if cls is nodes.VarAccessNode or cls is nodes.ConstAccessNode:
+        return cls(view.var_name_tok)
+    if cls is nodes.ConstAssignNode:
+        return cls(view.const_name_tok, unpack_view(view.value_node))
+    if cls is nodes.IfNode:
+        cases = [(unpack_view(c), unpack_view(e)) for c, e in view.cases]
+        return cls(cases, unpack_view(view.else_case))
+    if cls is nodes.ForNode:
+        return cls(
+            view.var_name_tok,
+            unpack_view(view.start_value_node),
+            unpack_view(view.end_value_node),
+            unpack_view(view.step_value_node),
+            unpack_view(view.body_node),
+        )
+    if cls is nodes.WhileNode:
+        return cls(unpack_view(view.condition_node), unpack_view(view.body_node))
+    if cls is nodes.FuncDefNode:
+        return cls(
+            view.var_name_tok,
+            view.arg_name_toks,
+            unpack_view(view.body_node),
+            view.should_auto_return,
+        )
+    if cls is nodes.CallNode:
+        return cls(
+            unpack_view(view.node_to_call),
+            [unpack_view(arg) for arg in view.arg_nodes],
+        )
+    if cls is nodes.ListNode:
+        return cls(
+            [unpack_view(element) for element in view.element_nodes],
+            view.pos_start,
+            view.pos_end,
+        )
+    if cls is nodes.BlockNode:
+        return cls(
+            unpack_view(view.statement_nodes),
+            view.pos_start,
+            view.pos_end,
+            view.should_return_null,
+            view.source,
+        )
+    if cls is nodes.ReturnNode:
+        return cls(unpack_view(view.node_to_return), view.pos_start, view.pos_end)
+    return cls(view.pos_start, view.pos_end)
+
+
+####################################
+# Views, named like the node classes so that the Interpreter visits them
+# with the same methods.
+
+
+class NodeView:
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def pos_start(self):
+        return self.store.starts[self.index]
+
+    @property
+    def pos_end(self):
+        return self.store.ends[self.index]
+
+    def link(self, n):
+        """The view of the nth child."""
+        store = self.store
+        return store.node(store.links[store.first_links[self.index] + n])
+
+    def linked(self, start=0, stop=None):
+        """The views of a range of children."""
+        store = self.store
+        first = store.first_links[self.index]
+        if stop is None:
+            stop = store.link_counts[self.index]
+        return [store.node(store.links[first + n]) for n in range(start, stop)]
+
+    def first_token(self):
+        return self.store.token(self.store.tokens[self.index])
+
+    def literal(self):
+        """The shared Value of a number or string."""
+        store = self.store
+        return store.constants[store.token_values[store.tokens[self.index]]]
+
+    def has_flag(self, flag):
+        return bool(self.store.flags[self.index] & flag)
+
+
+class NumberNode(NodeView):
+    __slots__ = ()
+
+    tok = property(NodeView.first_token)
+    value = property(NodeView.literal)
+
+
+class StringNode(NodeView):
+    __slots__ = ()
+
+    tok = property(NodeView.first_token)
+    value = property(NodeView.literal)
+
+
+class BinaryOpNode(NodeView):
+    __slots__ = ()
+
+    op_tok = property(NodeView.first_token)
+    left_node = property(lambda self: self.link(0))
+    right_node = property(lambda self: self.link(1))
+    operation = property(lambda self: BINARY_OPERATIONS.get(self.op_tok.type))
+
+
+class UnaryOpNode(NodeView):
+    __slots__ = ()
+
+    op_tok = property(NodeView.first_token)
+    node = property(lambda self: self.link(0))
+
+
+class VarAssignNode(NodeView):
+    __slots__ = ()
+
+    var_name_tok = property(NodeView.first_token)
+    value_node = property(lambda self: self.link(0))
+
+
+class VarAccessNode(NodeView):
+    __slots__ = ()
+
+    var_name_tok = property(NodeView.first_token)
+
+
+class ConstAssignNode(NodeView):
+    __slots__ = ()
+
+    const_name_tok = property(NodeView.first_token)
+    value_node = property(lambda self: self.link(0))
+
+
+class ConstAccessNode(NodeView):
+    __slots__ = ()
+
+    var_name_tok = property(NodeView.first_token)
+
+
+class IfNode(NodeView):
+    __slots__ = ()
+
+    @property
+    def cases(self):
+        children = self.linked()[:-1]
+        return list(zip(children[::2], children[1::2]))
+
+    @property
+    def else_case(self):
+        return self.link(self.store.link_counts[self.index] - 1)
+
+
+class ForNode(NodeView):
+    __slots__ = ()
+
+    var_name_tok = property(NodeView.first_token)
+    start_value_node = property(lambda self: self.link(0))
+    end_value_node = property(lambda self: self.link(1))
+    step_value_node = property(lambda self: self.link(2))
+    body_node = property(lambda self: self.link(3))
+
+
+class WhileNode(NodeView):
+    __slots__ = ()
+
+    condition_node = property(lambda self: self.link(0))
+    body_node = property(lambda self: self.link(1))
+
+
+class FuncDefNode(NodeView):
+    __slots__ = ()
+
+    body_node = property(lambda self: self.link(0))
+    should_auto_return = property(lambda self: self.has_flag(FLAG_AUTO_RETURN))
+
+    @property
+    def var_name_tok(self):
+        if self.has_flag(FLAG_NAMED):
+            return self.first_token()
+        return None
+
+    @property
+    def arg_name_toks(self):
+        store = self.store
+        first = store.tokens[self.index] + self.has_flag(FLAG_NAMED)
+        count = store.link_counts[self.index] - 1
+        return [store.token(first + n) for n in range(count)]
+
+
+class CallNode(NodeView):
+    __slots__ = ()
+
+    node_to_call = property(lambda self: self.link(0))
+    arg_nodes = property(lambda self: self.linked(1))
+
+
+class ListNode(NodeView):
+    __slots__ = ()
+
+    element_nodes = property(NodeView.linked)
+
+
+class BlockNode(NodeView):
+    __slots__ = ()
+
+    statement_nodes = property(lambda self: self.link(0))
+    should_return_null = property(lambda self: self.has_flag(FLAG_RETURN_NULL))
+    source = property(lambda self: self.store.source)
+
+
+class ReturnNode(NodeView):
+    __slots__ = ()
+
+    node_to_return = property(lambda self: self.link(0))
+
+
+class ContinueNode(NodeView):
+    __slots__ = ()
+
+
+class BreakNode(NodeView):
+    __slots__ = ()
+
+
+VIEWS = (
+    NumberNode,
+    StringNode,
+    BinaryOpNode,
+    UnaryOpNode,
+    VarAssignNode,
+    VarAccessNode,
+    ConstAssignNode,
+    ConstAccessNode,
+    IfNode,
+    ForNode,
+    WhileNode,
+    FuncDefNode,
+    CallNode,
+    ListNode,
+    BlockNode,
+    ReturnNode,
+    ContinueNode,
+    BreakNode,
+)
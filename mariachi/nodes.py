@@ -1,6 +1,13 @@
+from .interpreter import BINARY_OPERATIONS
+
+
 class StringNode:
-    def __init__(self, tok):
+    __slots__ = ("tok", "value", "pos_start", "pos_end")
+
+    def __init__(self, tok, value):
         self.tok = tok
+        # The shared Value of the literal, from the ConstantPool of the program
+        self.value = value
         self.pos_start = self.tok.pos_start
         self.pos_end = self.tok.pos_end
 
@@ -10,8 +17,12 @@ class StringNode:
 
 
 class NumberNode:
-    def __init__(self, tok):
+    __slots__ = ("tok", "value", "pos_start", "pos_end")
+
+    def __init__(self, tok, value):
         self.tok = tok
+        # The shared Value of the literal, from the ConstantPool of the program
+        self.value = value
         self.pos_start = self.tok.pos_start
         self.pos_end = self.tok.pos_end
 
@@ -23,10 +34,21 @@ class NumberNode:
 class BinaryOpNode:
     """Node class for binary operations."""
 
+    __slots__ = (
+        "left_node",
+        "op_tok",
+        "right_node",
+        "operation",
+        "pos_start",
+        "pos_end",
+    )
+
     def __init__(self, left_node, op_tok, right_node):
         self.left_node = left_node
         self.op_tok = op_tok
         self.right_node = right_node
+        # What the operator does, None for an unknown one
+        self.operation = BINARY_OPERATIONS.get(op_tok.type)
         self.pos_start = self.left_node.pos_start
         self.pos_end = self.right_node.pos_end
 
@@ -37,6 +59,8 @@ class BinaryOpNode:
 class UnaryOpNode:
     """Node class for unary operations."""
 
+    __slots__ = ("op_tok", "node", "pos_start", "pos_end")
+
     def __init__(self, op_tok, node):
         self.op_tok = op_tok
         self.node = node
@@ -49,6 +73,8 @@ class UnaryOpNode:
 
 
 class VarAssignNode:
+    __slots__ = ("var_name_tok", "value_node", "pos_start", "pos_end")
+
     def __init__(self, var_name_tok, value_node):
         self.var_name_tok = var_name_tok
         self.value_node = value_node
@@ -58,6 +84,8 @@ class VarAssignNode:
 
 
 class VarAccessNode:
+    __slots__ = ("var_name_tok", "pos_start", "pos_end")
+
     def __init__(self, var_name_tok):
         self.var_name_tok = var_name_tok
 
@@ -66,6 +94,8 @@ class VarAccessNode:
 
 
 class ConstAssignNode:
+    __slots__ = ("const_name_tok", "value_node", "pos_start", "pos_end")
+
     def __init__(self, const_name_tok, value_node):
         self.const_name_tok = const_name_tok
         self.value_node = value_node
@@ -75,6 +105,8 @@ class ConstAssignNode:
 
 
 class ConstAccessNode:
+    __slots__ = ("var_name_tok", "pos_start", "pos_end")
+
     def __init__(self, var_name_tok):
         self.var_name_tok = var_name_tok
 
@@ -83,6 +115,8 @@ class ConstAccessNode:
 
 
 class IfNode:
+    __slots__ = ("cases", "else_case", "pos_start", "pos_end")
+
     def __init__(self, cases, else_case):
         self.cases = cases
         self.else_case = else_case
@@ -94,6 +128,16 @@ class IfNode:
 
 
 class ForNode:
+    __slots__ = (
+        "var_name_tok",
+        "start_value_node",
+        "end_value_node",
+        "step_value_node",
+        "body_node",
+        "pos_start",
+        "pos_end",
+    )
+
     def __init__(
         self,
         var_name_tok,
@@ -113,6 +157,8 @@ class ForNode:
 
 
 class WhileNode:
+    __slots__ = ("condition_node", "body_node", "pos_start", "pos_end")
+
     def __init__(self, condition_node, body_node):
         self.condition_node = condition_node
         self.body_node = body_node
@@ -122,6 +168,15 @@ class WhileNode:
 
 
 class FuncDefNode:
+    __slots__ = (
+        "var_name_tok",
+        "arg_name_toks",
+        "body_node",
+        "should_auto_return",
+        "pos_start",
+        "pos_end",
+    )
+
     def __init__(self, var_name_tok, arg_name_toks, body_node, should_auto_return):
         self.var_name_tok = var_name_tok
         self.arg_name_toks = arg_name_toks
@@ -139,6 +194,8 @@ class FuncDefNode:
 
 
 class CallNode:
+    __slots__ = ("node_to_call", "arg_nodes", "pos_start", "pos_end")
+
     def __init__(self, node_to_call, arg_nodes):
         self.node_to_call = node_to_call
         self.arg_nodes = arg_nodes
@@ -152,6 +209,8 @@ class CallNode:
 
 
 class ListNode:
+    __slots__ = ("element_nodes", "pos_start", "pos_end")
+
     def __init__(self, element_nodes, pos_start, pos_end):
         self.element_nodes = element_nodes
         self.pos_start = pos_start
@@ -159,14 +218,27 @@ class ListNode:
 
 
 class BlockNode:
-    def __init__(self, statement_nodes, pos_start, pos_end, should_return_null):
+    __slots__ = (
+        "statement_nodes",
+        "should_return_null",
+        "source",
+        "pos_start",
+        "pos_end",
+    )
+
+    def __init__(
+        self, statement_nodes, pos_start, pos_end, should_return_null, source=None
+    ):
         self.statement_nodes = statement_nodes
         self.pos_start = pos_start
         self.pos_end = pos_end
         self.should_return_null = should_return_null
+        self.source = source
 
 
 class ReturnNode:
+    __slots__ = ("node_to_return", "pos_start", "pos_end")
+
     def __init__(self, node_to_return, pos_start, pos_end):
         self.node_to_return = node_to_return
         self.pos_start = pos_start
@@ -174,12 +246,16 @@ class ReturnNode:
 
 
 class ContinueNode:
+    __slots__ = ("pos_start", "pos_end")
+
     def __init__(self, pos_start, pos_end):
         self.pos_start = pos_start
         self.pos_end = pos_end
 
 
 class BreakNode:
+    __slots__ = ("pos_start", "pos_end")
+
     def __init__(self, pos_start, pos_end):
         self.pos_start = pos_start
         self.pos_end = pos_end
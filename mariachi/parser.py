@@ -4,768 +4,491 @@ from .token import *
 from .interpreter import *
 from .context import *
 
+# The tokens an expression or a statement can start with. They are enough
+# to decide every production with a single token of lookahead.
+EXPR_START = frozenset(
+    (
+        TT_FIJA,
+        TT_SEA,
+        TT_JAMAS,
+        TT_PLUS,
+        TT_MINUS,
+        TT_INT,
+        TT_FLOAT,
+        TT_STRING,
+        TT_IDENTIFIER,
+        TT_LSQUARE,
+        TT_LPAREN,
+        TT_SI,
+        TT_PARA,
+        TT_MIENTRAS,
+        TT_DEFINE,
+    )
+)
+STATEMENT_START = EXPR_START | {TT_ENTREGA, TT_SIGUE, TT_ROMPE}
+OPERAND_START = EXPR_START - {TT_FIJA, TT_SEA}
+
+# Binding powers of the binary operators, from loosest to tightest
+BP_LOGIC = 1
+BP_COMPARISON = 2
+BP_SUM = 3
+BP_PRODUCT = 4
+BP_POWER = 5
+
+# The power an operator binds its left operand with, and the minimum power
+# of the operators its right operand may contain. The right operand of a
+# left associative operator can only hold tighter operators, '**' is right
+# associative.
+BINDING_POWERS = {
+    TT_Y: (BP_LOGIC, BP_COMPARISON),
+    TT_O: (BP_LOGIC, BP_COMPARISON),
+    TT_EE: (BP_COMPARISON, BP_SUM),
+    TT_NE: (BP_COMPARISON, BP_SUM),
+    TT_LT: (BP_COMPARISON, BP_SUM),
+    TT_LTE: (BP_COMPARISON, BP_SUM),
+    TT_GT: (BP_COMPARISON, BP_SUM),
+    TT_GTE: (BP_COMPARISON, BP_SUM),
+    TT_PLUS: (BP_SUM, BP_PRODUCT),
+    TT_MINUS: (BP_SUM, BP_PRODUCT),
+    TT_MUL: (BP_PRODUCT, BP_POWER),
+    TT_DIV: (BP_PRODUCT, BP_POWER),
+    TT_MOD: (BP_PRODUCT, BP_POWER),
+    TT_FLOORDIV: (BP_PRODUCT, BP_POWER),
+    TT_POW: (BP_POWER, BP_POWER),
+}
+# What every other token binds with, it ends the expression
+NOT_AN_OPERATOR = (0, 0)
+
+
+class ParseError(Exception):
+    """Raised to unwind the parser when the syntax is invalid.
+
+    depth is set when the error belongs to the caller of the statement list
+    at that depth, see Parser.statements.
+    """
+
+    def __init__(self, error, depth=None):
+        super().__init__(error.details)
+        self.error = error
+        self.depth = depth
+
 
 class Parser:
-    """The parser class for our language."""
+    """The parser class for our language.
+
+    A predictive recursive descent parser: every rule decides what to do
+    from the current token alone, never rewinds and returns its node
+    directly. Errors are raised as ParseError and caught once in parse().
+    """
 
     def __init__(self, tokens):
-        self.tokens = tokens
-        self.tok_idx = -1
+        # Tokens are pulled from the list or stream only when they are needed
+        self.tokens = iter(tokens)
+        self.current_tok = None
         self.repl = False
+        # Nesting of the statement lists and the error their caller reports
+        # when a list is not followed by what it expects
+        self.depth = 0
+        self.end_details = None
+        self.constants = ConstantPool()
         self.advance()
+        # Blocks keep their source alive for as long as a function needs it
+        self.source = SOURCES.lookup(self.current_tok.pos_start)
 
     def advance(self):
         """Advance through our tokens."""
-        self.tok_idx += 1
-        self.update_current_tok()
+        # The end of file token is kept once the stream runs out
+        self.current_tok = next(self.tokens, self.current_tok)
         return self.current_tok
 
-    def reverse(self, amount=1):
-        self.tok_idx -= amount
-        self.update_current_tok()
-        return self.current_tok
-
-    def update_current_tok(self):
-        if self.tok_idx >= 0 and self.tok_idx < len(self.tokens):
-            self.current_tok = self.tokens[self.tok_idx]
+    def syntax_error(self, details, tok=None, depth=None):
+        """Builds the exception for an invalid token, the current by default."""
+        tok = tok or self.current_tok
+        return ParseError(
+            SintaxisInvalidoError(tok.pos_start, tok.pos_end, details), depth
+        )
 
     def parse(self):
         """Parser function for the grammar rules."""
-        res = self.statements()
-        if not res.error and self.current_tok.type != TT_EOF:
-            return res.failure(
-                SintaxisInvalidoError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    "'+', '-', '*', '/', '^', '==', '!=', '<', '>', <=', '>=', 'y' or 'o' esperado",
-                )
-            )
-        return res
+        res = ParseResult()
+        details = "'+', '-', '*', '/', '^', '==', '!=', '<', '>', <=', '>=', 'y' or 'o' esperado"
+        try:
+            node = self.statements(details)
+            if self.current_tok.type != TT_EOF:
+                raise self.syntax_error(details)
+        except ParseError as e:
+            return res.failure(e.error)
+        return res.success(node)
 
     ####################################
 
     def block(self):
-        res = ParseResult()
-        pos_start = self.current_tok.pos_start.copy()
+        pos_start = self.current_tok.pos_start
 
         if self.current_tok.type != TT_LBRACE:
-            return res.failure(
-                SintaxisInvalidoError(
-                    self.current_tok.pos_start, self.current_tok.pos_end, "'{' esperado"
-                )
-            )
-
-        res.register_advancement()
+            raise self.syntax_error("'{' esperado")
         self.advance()
 
-        statements = res.register(self.statements())
-        if res.error:
-            return res
+        statements = self.statements("'}' esperado")
 
         if self.current_tok.type != TT_RBRACE:
-            return res.failure(
-                SintaxisInvalidoError(
-                    self.current_tok.pos_start, self.current_tok.pos_end, "'}' esperado"
-                )
-            )
-
-        res.register_advancement()
+            raise self.syntax_error("'}' esperado")
         self.advance()
 
-        return res.success(
-            BlockNode(statements, pos_start, self.current_tok.pos_end, True)
+        return BlockNode(
+            statements, pos_start, self.current_tok.pos_end, True, self.source
         )
 
-    def statements(self):
-        res = ParseResult()
+    def statements(self, end_details):
+        """Parses statements separated by newlines.
+
+        A statement after a newline that turns out to be invalid ends the
+        list, so its error is reported as end_details, the error of the
+        caller, at the token the statement started with.
+        """
         statements = []
-        pos_start = self.current_tok.pos_start.copy()
+        pos_start = self.current_tok.pos_start
+        outer_end_details = self.end_details
+        self.end_details = end_details
+        self.depth += 1
+        depth = self.depth
 
         while self.current_tok.type == TT_NEWLINE:
-            res.register_advancement()
             self.advance()
 
-        stmt = res.register(self.statement())
-        if res.error:
-            return res
-        statements.append(stmt)
-        more_stmts = True
+        statements.append(self.statement())
 
-        while True:
-            nl_count = 0
+        while self.current_tok.type == TT_NEWLINE:
             while self.current_tok.type == TT_NEWLINE:
-                res.register_advancement()
                 self.advance()
-                nl_count += 1
-
-            if nl_count == 0:
-                more_stmts = False
 
-            if not more_stmts:
+            if self.current_tok.type not in STATEMENT_START:
                 break
 
-            stmt = res.try_register(self.statement())
-            if not stmt:
-                self.reverse(res.to_reverse_count)
-                more_stmts = False
-                continue
-            statements.append(stmt)
-        return res.success(
-            ListNode(statements, pos_start, self.current_tok.pos_end.copy())
-        )
+            start_tok = self.current_tok
+            try:
+                statements.append(self.statement())
+            except ParseError as e:
+                # Errors already raised on behalf of the caller pass through
+                if e.depth == depth:
+                    raise
+                raise self.syntax_error(end_details, start_tok)
 
-    def statement(
-        self,
-    ):
-        res = ParseResult()
-        pos_start = self.current_tok.pos_start.copy()
+        self.depth -= 1
+        self.end_details = outer_end_details
+        return ListNode(statements, pos_start, self.current_tok.pos_end)
 
-        if self.current_tok.matches(TT_KEYWORD, "entrega"):
-            res.register_advancement()
-            self.advance()
+    def statement(self):
+        pos_start = self.current_tok.pos_start
 
-            expr = res.try_register(self.expr())
-            if not expr:
-                self.reverse(res.to_reverse_count)
-            return res.success(
-                ReturnNode(expr, pos_start, self.current_tok.pos_end.copy())
-            )
+        if self.current_tok.type == TT_ENTREGA:
+            self.advance()
 
-        if self.current_tok.matches(TT_KEYWORD, "sigue"):
-            res.register_advancement()
+            expr = None
+            if self.current_tok.type in EXPR_START:
+                start_tok = self.current_tok
+                try:
+                    expr = self.expr()
+                except ParseError:
+                    # Without a valid expression the statement ends right
+                    # after 'entrega' and the caller of the list complains
+                    raise self.syntax_error(self.end_details, start_tok, self.depth)
+            return ReturnNode(expr, pos_start, self.current_tok.pos_end)
+
+        if self.current_tok.type == TT_SIGUE:
             self.advance()
-            return res.success(ContinueNode(pos_start, self.current_tok.pos_end.copy()))
+            return ContinueNode(pos_start, self.current_tok.pos_end)
 
-        if self.current_tok.matches(TT_KEYWORD, "rompe"):
-            res.register_advancement()
+        if self.current_tok.type == TT_ROMPE:
             self.advance()
-            return res.success(BreakNode(pos_start, self.current_tok.pos_end.copy()))
-
-        expr = res.register(self.expr())
-        if res.error:
-            return res.failure(
-                SintaxisInvalidoError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    "'regresa', 'rompe', 'sigue', 'sea', int, float, identificador, '+', '-', '(', '[', o 'jamas' esperado",
-                )
+            return BreakNode(pos_start, self.current_tok.pos_end)
+
+        if self.current_tok.type not in EXPR_START:
+            raise self.syntax_error(
+                "'regresa', 'rompe', 'sigue', 'sea', int, float, identificador, '+', '-', '(', '[', o 'jamas' esperado"
             )
-        return res.success(expr)
+        return self.expr()
 
     def expr(self):
         """Creates our expression."""
-        res = ParseResult()
-
         # Assigning constants
-        if self.current_tok.matches(TT_KEYWORD, "fija"):
-            res.register_advancement()
+        if self.current_tok.type == TT_FIJA:
             self.advance()
 
             if self.current_tok.type != TT_IDENTIFIER:
-                return res.failure(
-                    SintaxisInvalidoError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        "Identificador esperado",
-                    )
-                )
-
+                raise self.syntax_error("Identificador esperado")
             const_name = self.current_tok
-            res.register_advancement()
             self.advance()
 
             if self.current_tok.type != TT_EQ:
-                return res.failure(
-                    SintaxisInvalidoError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        "'=' esperado",
-                    )
-                )
-
-            res.register_advancement()
+                raise self.syntax_error("'=' esperado")
             self.advance()
 
-            value = res.register(self.expr())
-            if res.error:
-                return res
-            return res.success(ConstAssignNode(const_name, value))
+            return ConstAssignNode(const_name, self.expr())
 
         # Assigning variables
-        if self.current_tok.matches(TT_KEYWORD, "sea"):
-            res.register_advancement()
+        if self.current_tok.type == TT_SEA:
             self.advance()
 
             # Check to make sure following token is an indentifier
             if self.current_tok.type != TT_IDENTIFIER:
-                return res.failure(
-                    SintaxisInvalidoError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        "Identificador esperado",
-                    )
-                )
+                raise self.syntax_error("Identificador esperado")
 
             # Assigns the variable name
             var_name = self.current_tok
-            res.register_advancement()
             self.advance()
 
             # Check to ensure that following a var name is an =
             if self.current_tok.type != TT_EQ:
-                return res.failure(
-                    SintaxisInvalidoError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        "'=' esperado",
-                    )
-                )
+                raise self.syntax_error("'=' esperado")
 
             # Assign a new expression to the created variable
-            res.register_advancement()
             self.advance()
-            expr = res.register(self.expr())
-            if res.error:
-                return res
-            return res.success(VarAssignNode(var_name, expr))
-
-        node = res.register(
-            self.binary_operation(
-                self.comp_expr, ((TT_KEYWORD, "y"), (TT_KEYWORD, "o"))
-            )
-        )
+            return VarAssignNode(var_name, self.expr())
 
-        if res.error:
-            return res.failure(
-                SintaxisInvalidoError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    "'sea', int, float, identificador, '+', '-', '(', '[', o 'jamas' esperado",
-                )
+        if self.current_tok.type not in EXPR_START:
+            raise self.syntax_error(
+                "'sea', int, float, identificador, '+', '-', '(', '[', o 'jamas' esperado"
             )
-        return res.success(node)
+        return self.expression(BP_LOGIC)
 
-    def comp_expr(self):
-        """Handles comparison expression."""
-        res = ParseResult()
+    def expression(self, min_power):
+        """Parses operands joined by operators binding at least min_power.
 
-        if self.current_tok.matches(TT_KEYWORD, "jamas"):
+        A Pratt parser: the left operand is extended for as long as the next
+        operator binds tighter than the caller's, so each operand costs one
+        call whatever its precedence.
+        """
+        left = self.operand(min_power)
+        powers = BINDING_POWERS
+
+        while True:
             op_tok = self.current_tok
-            res.register_advancement()
+            left_power, right_power = powers.get(op_tok.type, NOT_AN_OPERATOR)
+            if left_power < min_power:
+                return left
             self.advance()
+            left = BinaryOpNode(left, op_tok, self.expression(right_power))
 
-            node = res.register(self.comp_expr())
-            if res.error:
-                return res
-            return res.success(UnaryOpNode(op_tok, node))
-
-        node = res.register(
-            self.binary_operation(
-                self.arith_expr, (TT_EE, TT_NE, TT_LT, TT_LTE, TT_GT, TT_GTE)
-            )
-        )
-        if res.error:
-            return res.failure(
-                SintaxisInvalidoError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    "'+', '-', '(', '[', 'si', 'para', 'mientras', 'define' o 'jamas' esperado",
-                )
-            )
-        return res.success(node)
+    def operand(self, min_power):
+        """Parses a prefix operator and its operand, an atom or a call."""
+        tok = self.current_tok
 
-    def arith_expr(self):
-        """Handles arithmetic logic."""
-        return self.binary_operation(self.term, (TT_PLUS, TT_MINUS))
+        # Unary plus and minus bind tighter than everything except '**'
+        if tok.type in (TT_PLUS, TT_MINUS):
+            self.advance()
+            return UnaryOpNode(tok, self.expression(BP_POWER))
 
-    def term(self):
-        """Creates our terms."""
-        return self.binary_operation(self.factor, (TT_DIV, TT_MUL, TT_MOD, TT_FLOORDIV))
+        # 'jamas' applies to a whole comparison, so it is only allowed
+        # where a comparison could start
+        if min_power <= BP_COMPARISON:
+            if tok.type == TT_JAMAS:
+                self.advance()
+                return UnaryOpNode(tok, self.expression(BP_COMPARISON))
+            if tok.type not in OPERAND_START:
+                raise self.syntax_error(
+                    "'+', '-', '(', '[', 'si', 'para', 'mientras', 'define' o 'jamas' esperado"
+                )
 
-    def factor(self):
-        """Logic for handling factors."""
-        res = ParseResult()
-        tok = self.current_tok
-        # Checks to see if our token type is a plus or a minus
-        if tok.type in (TT_PLUS, TT_MINUS):
-            res.register_advancement()
+        # Parenthesized expressions are handled here rather than in atom()
+        # so every level of nesting only costs three calls
+        if tok.type == TT_LPAREN:
             self.advance()
-            factor = res.register(self.factor())
-            # Check for any errors
-            if res.error:
-                return res
-            return res.success(UnaryOpNode(tok, factor))
-        return self.power()
-
-    def power(self):
-        """Handles powers."""
-        return self.binary_operation(self.call, (TT_POW,), self.factor)
-
-    def call(self):
-        res = ParseResult()
-        atom = res.register(self.atom())
-        if res.error:
-            return res
+            node = self.expr()
+            if self.current_tok.type != TT_RPAREN:
+                raise self.syntax_error("')' esperado")
+            self.advance()
+        else:
+            node = self.atom()
 
         if self.current_tok.type == TT_LPAREN:
-            res.register_advancement()
+            return self.call(node)
+        return node
+
+    def call(self, node):
+        """Parses the arguments of a call to node."""
+        if self.current_tok.type != TT_LPAREN:
+            raise self.syntax_error("'(' esperado")
+        self.advance()
+        arg_nodes = []
+
+        if self.current_tok.type == TT_RPAREN:
             self.advance()
-            arg_nodes = []
+        else:
+            arg_nodes.append(self.expr())
 
-            if self.current_tok.type == TT_RPAREN:
-                res.register_advancement()
-                self.advance()
-            else:
-                arg_nodes.append(res.register(self.expr()))
-                if res.error:
-                    return res.failure(
-                        SintaxisInvalidoError(
-                            self.current_tok.pos_start,
-                            self.current_tok.pos_end,
-                            "')', 'sea', 'si', 'para', 'mientras', int, float, identificador, '+', '-', '(', '[' o 'jamas' esperado",
-                        )
-                    )
-
-                while self.current_tok.type == TT_COMMA:
-                    res.register_advancement()
-                    self.advance()
-
-                    arg_nodes.append(res.register(self.expr()))
-                    if res.error:
-                        return res
-
-                if self.current_tok.type != TT_RPAREN:
-                    return res.failure(
-                        SintaxisInvalidoError(
-                            self.current_tok.pos_start,
-                            self.current_tok.pos_end,
-                            "',' o ')' esperado",
-                        )
-                    )
-
-                res.register_advancement()
+            while self.current_tok.type == TT_COMMA:
                 self.advance()
-            return res.success(CallNode(atom, arg_nodes))
-        return res.success(atom)
+                arg_nodes.append(self.expr())
+
+            if self.current_tok.type != TT_RPAREN:
+                raise self.syntax_error("',' o ')' esperado")
+            self.advance()
+        return CallNode(node, arg_nodes)
 
     def atom(self):
         """Logic for handling atoms."""
-        res = ParseResult()
         tok = self.current_tok
 
         # Checks if our current token is a number type
         if tok.type in (TT_INT, TT_FLOAT):
-            res.register_advancement()
             self.advance()
-            return res.success(NumberNode(tok))
+            return NumberNode(tok, self.constants.number(tok.value))
 
         # Handling strings
-        elif tok.type == (TT_STRING):
-            res.register_advancement()
+        elif tok.type == TT_STRING:
             self.advance()
-            return res.success(StringNode(tok))
+            return StringNode(tok, self.constants.string(tok.value))
 
         # Check for identifier
         elif tok.type == TT_IDENTIFIER:
-            res.register_advancement()
             self.advance()
-            return res.success(VarAccessNode(tok))
+            return VarAccessNode(tok)
 
         # Check for brackets
         elif tok.type == TT_LSQUARE:
-            list_expr = res.register(self.list_expr())
-            if res.error:
-                return res
-            return res.success(list_expr)
-
-        # Parenthesis check
-        elif tok.type == TT_LPAREN:
-            res.register_advancement()
-            self.advance()
-            expr = res.register(self.expr())
-            # Check for errors
-            if res.error:
-                return res
-            if self.current_tok.type == TT_RPAREN:
-                res.register_advancement()
-                self.advance()
-                return res.success(expr)
-            else:
-                return res.failure(
-                    SintaxisInvalidoError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        "')' esperado",
-                    )
-                )
+            return self.list_expr()
+
         # If statement
-        elif tok.matches(TT_KEYWORD, "si"):
-            if_expr = res.register(self.if_expr())
-            if res.error:
-                return res
-            return res.success(if_expr)
+        elif tok.type == TT_SI:
+            return self.if_expr()
 
         # For statement
-        elif tok.matches(TT_KEYWORD, "para"):
-            for_expr = res.register(self.for_expr())
-            if res.error:
-                return res
-            return res.success(for_expr)
+        elif tok.type == TT_PARA:
+            return self.for_expr()
 
         # While expression
-        elif tok.matches(TT_KEYWORD, "mientras"):
-            while_expr = res.register(self.while_expr())
-            if res.error:
-                return res
-            return res.success(while_expr)
+        elif tok.type == TT_MIENTRAS:
+            return self.while_expr()
 
         # Define functions
-        elif tok.matches(TT_KEYWORD, "define"):
-            func_expr = res.register(self.func_def())
-            if res.error:
-                return res
-            return res.success(func_expr)
-
-        return res.failure(
-            SintaxisInvalidoError(
-                tok.pos_start,
-                tok.pos_end,
-                "int, float, identificador, '+', '-', '(', '[', 'si', 'para', 'mientras', o 'define' esperado",
-            )
+        elif tok.type == TT_DEFINE:
+            return self.func_def()
+
+        raise self.syntax_error(
+            "int, float, identificador, '+', '-', '(', '[', 'si', 'para', 'mientras', o 'define' esperado"
         )
 
     def list_expr(self):
-        res = ParseResult()
         element_nodes = []
-        pos_start = self.current_tok.pos_start.copy()
+        pos_start = self.current_tok.pos_start
 
         if self.current_tok.type != TT_LSQUARE:
-            return res.failure(
-                SintaxisInvalidoError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    f"'[' esperado",
-                )
-            )
-
-        res.register_advancement()
+            raise self.syntax_error("'[' esperado")
         self.advance()
 
         if self.current_tok.type == TT_RSQUARE:
-            res.register_advancement()
             self.advance()
         else:
-            element_nodes.append(res.register(self.expr()))
-            if res.error:
-                return res.failure(
-                    SintaxisInvalidoError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        "']', 'sea', 'define', 'para', 'mientras', int, float, identificador, '+', '-', '(', '[' o 'jamas' esperado",
-                    )
-                )
+            element_nodes.append(self.expr())
 
             while self.current_tok.type == TT_COMMA:
-                res.register_advancement()
                 self.advance()
-
-                element_nodes.append(res.register(self.expr()))
-                if res.error:
-                    return res
+                element_nodes.append(self.expr())
 
             if self.current_tok.type != TT_RSQUARE:
-                return res.failure(
-                    SintaxisInvalidoError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        "',' o ')' esperado",
-                    )
-                )
-
-            res.register_advancement()
+                raise self.syntax_error("',' o ')' esperado")
             self.advance()
-        return res.success(
-            ListNode(element_nodes, pos_start, self.current_tok.pos_end.copy())
-        )
+        return ListNode(element_nodes, pos_start, self.current_tok.pos_end)
 
     def if_expr(self):
-        res = ParseResult()
         cases = []
         else_case = None
 
-        if not self.current_tok.matches(TT_KEYWORD, "si"):
-            return res.failure(
-                SintaxisInvalidoError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    "'si' esperado",
-                )
-            )
-
-        res.register_advancement()
+        if self.current_tok.type != TT_SI:
+            raise self.syntax_error("'si' esperado")
         self.advance()
 
-        condition = res.register(self.expr())
-        if res.error:
-            return res
+        condition = self.expr()
+        cases.append((condition, self.block()))
 
-        body = res.register(self.block())
-        if res.error:
-            return res
-
-        cases.append((condition, body))
-
-        while self.current_tok.matches(TT_KEYWORD, "quizas"):
-            res.register_advancement()
+        while self.current_tok.type == TT_QUIZAS:
             self.advance()
+            condition = self.expr()
+            cases.append((condition, self.block()))
 
-            condition = res.register(self.expr())
-            if res.error:
-                return res
-
-            body = res.register(self.block())
-            if res.error:
-                return res
-
-            cases.append((condition, body))
-
-        if self.current_tok.matches(TT_KEYWORD, "sino"):
-            res.register_advancement()
+        if self.current_tok.type == TT_SINO:
             self.advance()
+            else_case = self.block()
 
-            body = res.register(self.block())
-            if res.error:
-                return res
-
-            else_case = body
-
-        return res.success(IfNode(cases, else_case))
+        return IfNode(cases, else_case)
 
     def for_expr(self):
-        res = ParseResult()
-
-        if not self.current_tok.matches(TT_KEYWORD, "para"):
-            return res.failure(
-                SintaxisInvalidoError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    "'para' esperado",
-                )
-            )
-
-        res.register_advancement()
+        if self.current_tok.type != TT_PARA:
+            raise self.syntax_error("'para' esperado")
         self.advance()
 
         if self.current_tok.type != TT_IDENTIFIER:
-            return res.failure(
-                SintaxisInvalidoError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    "Identificador esperado",
-                )
-            )
-
+            raise self.syntax_error("Identificador esperado")
         var_name = self.current_tok
-        res.register_advancement()
         self.advance()
 
         if self.current_tok.type != TT_EQ:
-            return res.failure(
-                SintaxisInvalidoError(
-                    self.current_tok.pos_start, self.current_tok.pos_end, "'=' esperado"
-                )
-            )
-
-        res.register_advancement()
+            raise self.syntax_error("'=' esperado")
         self.advance()
 
-        start_value = res.register(self.expr())
-        if res.error:
-            return res
+        start_value = self.expr()
 
-        if not self.current_tok.matches(TT_KEYWORD, "hasta"):
-            return res.failure(
-                SintaxisInvalidoError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    "'hasta' esperado",
-                )
-            )
-
-        res.register_advancement()
+        if self.current_tok.type != TT_HASTA:
+            raise self.syntax_error("'hasta' esperado")
         self.advance()
 
-        end_value = res.register(self.expr())
-        if res.error:
-            return res
+        end_value = self.expr()
 
         step_value = None
-        if self.current_tok.matches(TT_KEYWORD, "paso"):
-            res.register_advancement()
+        if self.current_tok.type == TT_PASO:
             self.advance()
-            step_value = res.register(self.expr())
-            if res.error:
-                return res
+            step_value = self.expr()
 
-        body = res.register(self.block())
-        if res.error:
-            return res
-
-        return res.success(ForNode(var_name, start_value, end_value, step_value, body))
+        body = self.block()
+        return ForNode(var_name, start_value, end_value, step_value, body)
 
     def while_expr(self):
-        res = ParseResult()
-
-        if not self.current_tok.matches(TT_KEYWORD, "mientras"):
-            return res.failure(
-                SintaxisInvalidoError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    "'mientras' esperado",
-                )
-            )
-
-        res.register_advancement()
+        if self.current_tok.type != TT_MIENTRAS:
+            raise self.syntax_error("'mientras' esperado")
         self.advance()
 
-        condition = res.register(self.expr())
-        if res.error:
-            return res
-
-        body = res.register(self.block())
-        if res.error:
-            return res
-
-        return res.success(WhileNode(condition, body))
+        condition = self.expr()
+        return WhileNode(condition, self.block())
 
     def func_def(self):
         """Defines functions."""
-        res = ParseResult()
-
-        if not self.current_tok.matches(TT_KEYWORD, "define"):
-            return res.failure(
-                SintaxisInvalidoError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    "'define' esperado",
-                )
-            )
-
-        res.register_advancement()
+        if self.current_tok.type != TT_DEFINE:
+            raise self.syntax_error("'define' esperado")
         self.advance()
 
         if self.current_tok.type == TT_IDENTIFIER:
             var_name_tok = self.current_tok
-            res.register_advancement()
             self.advance()
 
             if self.current_tok.type != TT_LPAREN:
-                return res.failure(
-                    SintaxisInvalidoError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        "'(' esperado",
-                    )
-                )
+                raise self.syntax_error("'(' esperado")
         else:
             var_name_tok = None
             if self.current_tok.type != TT_LPAREN:
-                return res.failure(
-                    SintaxisInvalidoError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        "'identificador o '(' esperado",
-                    )
-                )
-
-        res.register_advancement()
+                raise self.syntax_error("'identificador o '(' esperado")
         self.advance()
 
         arg_name_toks = []
 
         if self.current_tok.type == TT_IDENTIFIER:
             arg_name_toks.append(self.current_tok)
-            res.register_advancement()
             self.advance()
 
             while self.current_tok.type == TT_COMMA:
-                res.register_advancement()
                 self.advance()
 
                 if self.current_tok.type != TT_IDENTIFIER:
-                    return res.failure(
-                        SintaxisInvalidoError(
-                            self.current_tok.pos_start,
-                            self.current_tok.pos_end,
-                            "identificador esperado",
-                        )
-                    )
-
+                    raise self.syntax_error("identificador esperado")
                 arg_name_toks.append(self.current_tok)
-                res.register_advancement()
                 self.advance()
 
             if self.current_tok.type != TT_RPAREN:
-                return res.failure(
-                    SintaxisInvalidoError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        "')' esperado",
-                    )
-                )
+                raise self.syntax_error("')' esperado")
         else:
             if self.current_tok.type != TT_RPAREN:
-                return res.failure(
-                    SintaxisInvalidoError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        "'identificador o '(' esperado",
-                    )
-                )
-
-        res.register_advancement()
+                raise self.syntax_error("'identificador o '(' esperado")
         self.advance()
 
-        body = res.register(self.block())
-        if res.error:
-            return res
-
-        res.register_advancement()
-        if res.error:
-            return res
-
-        return res.success(FuncDefNode(var_name_tok, arg_name_toks, body, False))
-
-    def binary_operation(self, func_a, ops, func_b=None):
-        """Refactored logic for handling operators."""
-        if func_b == None:
-            func_b = func_a
-
-        res = ParseResult()
-        left = res.register(func_a())
-        # Early exit if an error is found
-        if res.error:
-            return res
-
-        while (
-            self.current_tok.type in ops
-            or (self.current_tok.type, self.current_tok.value) in ops
-        ):
-            # We assign the operation tokens
-            op_tok = self.current_tok
-
-            # We have to advance to prevent infinite loops
-
-            res.register_advancement()
-            self.advance()
-
-            # We assign the right factor
-            right = res.register(func_b())
-
-            # Early exit if an error is found
-            if res.error:
-                return res
-
-            # Reassign to a BindaryOpNode
-            left = BinaryOpNode(left, op_tok, right)
-        return res.success(left)
+        body = self.block()
+        return FuncDefNode(var_name_tok, arg_name_toks, body, False)
@@ -0,0 +1,312 @@
+"""Resolves the names of a program before it runs.
+
+Scoping is dynamic: a function sees the variables of the function calling
+it, and those of the program at the bottom. A name read in a function is
+resolved to one of:
+
+LOCAL, bound by the function itself, by an argument, sea, fija, para or
+define. It gets a slot, its index in the SlotTable of a call. Until the
+call binds it a read falls back to the callers, like any other name.
+
+ENCLOSING, bound by another function, whose calls might be the callers,
+so it is looked up through them.
+
+GLOBAL, bound by no function, only by the program or in the globals it
+starts with, so it is read from the global table directly.
+
+The functions of the programs run before in the same global table can
+still be called, so the names they bind count as bound by a function too.
+A program run later can define functions binding a name read as GLOBAL,
+code reading one checks FUNCTION_NAMES before it skips the callers. The
+names a function may read from the calls of other functions are kept in
+SHARED_NAMES the same way, the calls binding none of them can be dropped
+once they are left.
+
+A name bound nowhere can never be read, it is reported before anything
+runs, with the error its first read would give.
+
+The resolver also finds the loops whose value is never used, like a loop
+that is not the last statement of a block, so that the engines do not
+build the list of the values of its body, and the para loops of functions
+whose body neither reads nor binds their variable, see quiet_counter().
+"""
+
+import weakref
+
+from .errors import EjecucionError
+from .interpreter import VisitMethods
+
+LOCAL = 0
+ENCLOSING = 1
+GLOBAL = 2
+
+
+# The names bound by the functions of every program resolved against a
+# global table, by the table
+FUNCTION_NAMES = weakref.WeakKeyDictionary()
+# The names read by those functions, other than their own arguments
+SHARED_NAMES = weakref.WeakKeyDictionary()
+
+
+class Scope:
+    """The names bound by a function and their slots, the arguments first."""
+
+    __slots__ = ("slots", "size", "arg_count", "constants", "padding")
+
+    def __init__(self, arg_names):
+        # The last of repeated arguments wins, like in the symbol tables
+        self.slots = {name: index for index, name in enumerate(arg_names)}
+        self.size = len(arg_names)
+        # The arguments are bound as soon as a call starts
+        self.arg_count = len(arg_names)
+        # The names bound with fija, only they are checked when set
+        self.constants = set()
+        # Appended to the arguments of a call, the slots of the other names
+        self.padding = []
+
+    def bind(self, name):
+        if name not in self.slots:
+            self.slots[name] = self.size
+            self.size += 1
+            self.padding.append(None)
+
+
+class Resolution:
+    """The scopes of the functions of a program, by their position."""
+
+    def __init__(self, symbol_table):
+        self.symbol_table = symbol_table
+        self.scopes = {}
+        # Every name bound by a function, of this program or an earlier one,
+        # and by the program itself
+        self.function_names = FUNCTION_NAMES.setdefault(symbol_table, set())
+        self.program_names = set()
+        # The names a read may find in the call of another function
+        self.shared_names = SHARED_NAMES.setdefault(symbol_table, set())
+        # The spans of the loops whose value is never used, a mientras loop
+        # starts where its condition does
+        self.discarded_loops = set()
+        # The spans of the para loops of functions whose body neither reads
+        # nor binds their variable
+        self.quiet_loops = set()
+
+    def scope(self, func_def_node):
+        return self.scopes[func_def_node.pos_start]
+
+    def discards(self, loop_node):
+        """Whether the value of a para or mientras loop is never used."""
+        return (loop_node.pos_start, loop_node.pos_end) in self.discarded_loops
+
+    def quiet_counter(self, for_node):
+        """Whether nothing reads the variable of a para loop while it runs,
+        so that only its first and last steps need to set it.
+
+        Its body does not, nor may the functions it calls since no function
+        reads the name, checked as the loop starts so that the functions of
+        the programs run since count. The loop is in a function, which has
+        returned by the time anything else can read the variable.
+        """
+        return (
+            self.may_be_quiet(for_node)
+            and for_node.var_name_tok.value not in self.shared_names
+        )
+
+    def may_be_quiet(self, for_node):
+        """Whether a para loop of a function neither reads nor binds its
+        variable in its body, what quiet_counter() knows before running."""
+        return (for_node.pos_start, for_node.pos_end) in self.quiet_loops
+
+    def classify(self, name, scope=None):
+        """The kind of a name read in scope, None for the program, and its
+        slot. The kind is None for names bound nowhere."""
+        if scope is not None:
+            slot = scope.slots.get(name)
+            if slot is not None:
+                return LOCAL, slot
+            if name in self.function_names:
+                return ENCLOSING, None
+        if name in self.program_names or self.symbol_table.get(name) is not None:
+            return GLOBAL, None
+        return None, None
+
+
+class Resolver:
+    """Walks an AST without recursion, one resolve method per node class.
+
+    The methods record what a node binds or reads and return its
+    children, which are walked in the same scope unless the method makes
+    a new one. Whether the value of a node is used is walked along with
+    it, see values_used().
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.resolve_methods = VisitMethods(cls, "resolve_")
+
+    def __init__(self, resolution):
+        self.resolution = resolution
+        # (name, node, scope) of every read, in the order of the source
+        self.reads = []
+        # (name, node, scope) of every name bound
+        self.binds = []
+        # (node, scope) of every para loop in a function
+        self.for_loops = []
+
+    def resolve(self, ast):
+        pending = [(ast, None, True)]
+        while pending:
+            node, scope, used = pending.pop()
+            children = self.resolve_methods[node.__class__](self, node, scope)
+            if children.__class__ is Scope:
+                # A function, its body is walked in its own scope
+                pending.append((node.body_node, children, node.should_auto_return))
+                continue
+            name = node.__class__.__name__
+            if name in VALUE_NODES:
+                flags = self.values_used(name, node, children, used)
+            else:
+                flags = [True] * len(children)
+            for child, child_used in zip(reversed(children), reversed(flags)):
+                if child is not None:
+                    pending.append((child, scope, child_used))
+
+    def values_used(self, name, node, children, used):
+        """Whether the value of each child is used, for the nodes whose
+        value is the value of some of their children. used tells whether
+        the value of the node is."""
+        last = len(children) - 1
+        if name == "BlockNode":
+            # The value of the last statement, the others are dropped
+            return [used and i == last for i in range(len(children))]
+        if name == "IfNode":
+            # The value of a case, or of the else case last, never of the
+            # conditions before them
+            return [used or (i % 2 == 0 and i < last) for i in range(len(children))]
+        # A loop, the values of its body, last, are its elements
+        if not used:
+            self.resolution.discarded_loops.add((node.pos_start, node.pos_end))
+        return [used or i < last for i in range(len(children))]
+
+    def find_quiet_loops(self):
+        """Adds the para loops whose body neither reads nor binds their
+        variable in the scope of the loop to the Resolution."""
+        uses = {}
+        for name, node, scope in self.reads + self.binds:
+            uses.setdefault((name, scope), []).append(node.pos_start)
+        for node, scope in self.for_loops:
+            body = node.body_node
+            start, end = body.pos_start, body.pos_end
+            positions = uses[node.var_name_tok.value, scope]
+            if not any(start <= pos < end for pos in positions):
+                self.resolution.quiet_loops.add((node.pos_start, node.pos_end))
+
+    def no_visit_method(self, node, scope):
+        raise Exception(f"No resolve_{type(node).__name__} method defined.")
+
+    def bind(self, name, node, scope):
+        self.binds.append((name, node, scope))
+        if scope is None:
+            self.resolution.program_names.add(name)
+        else:
+            scope.bind(name)
+            self.resolution.function_names.add(name)
+
+    def resolve_NumberNode(self, node, scope):
+        return ()
+
+    resolve_StringNode = resolve_NumberNode
+    resolve_BreakNode = resolve_NumberNode
+    resolve_ContinueNode = resolve_NumberNode
+
+    def resolve_BinaryOpNode(self, node, scope):
+        return (node.left_node, node.right_node)
+
+    def resolve_UnaryOpNode(self, node, scope):
+        return (node.node,)
+
+    def resolve_VarAssignNode(self, node, scope):
+        self.bind(node.var_name_tok.value, node, scope)
+        return (node.value_node,)
+
+    def resolve_VarAccessNode(self, node, scope):
+        self.reads.append((node.var_name_tok.value, node, scope))
+        return ()
+
+    resolve_ConstAccessNode = resolve_VarAccessNode
+
+    def resolve_ConstAssignNode(self, node, scope):
+        name = node.const_name_tok.value
+        self.bind(name, node, scope)
+        if scope is not None:
+            scope.constants.add(name)
+        return (node.value_node,)
+
+    def resolve_IfNode(self, node, scope):
+        children = [child for case in node.cases for child in case]
+        children.append(node.else_case)
+        return children
+
+    def resolve_ForNode(self, node, scope):
+        self.bind(node.var_name_tok.value, node, scope)
+        if scope is not None:
+            self.for_loops.append((node, scope))
+        return (
+            node.start_value_node,
+            node.end_value_node,
+            node.step_value_node,
+            node.body_node,
+        )
+
+    def resolve_WhileNode(self, node, scope):
+        return (node.condition_node, node.body_node)
+
+    def resolve_FuncDefNode(self, node, scope):
+        if node.var_name_tok:
+            self.bind(node.var_name_tok.value, node, scope)
+        function_scope = Scope([tok.value for tok in node.arg_name_toks])
+        self.resolution.scopes[node.pos_start] = function_scope
+        self.resolution.function_names.update(function_scope.slots)
+        return function_scope
+
+    def resolve_CallNode(self, node, scope):
+        return [node.node_to_call] + list(node.arg_nodes)
+
+    def resolve_ListNode(self, node, scope):
+        return node.element_nodes
+
+    def resolve_BlockNode(self, node, scope):
+        return node.statement_nodes.element_nodes
+
+    def resolve_ReturnNode(self, node, scope):
+        return (node.node_to_return,)
+
+
+Resolver.resolve_methods = VisitMethods(Resolver, "resolve_")
+
+# The nodes whose value is the value of some of their children, by name so
+# that views of a NodeStore are found too
+VALUE_NODES = frozenset(("BlockNode", "IfNode", "ForNode", "WhileNode"))
+
+
+def resolve(ast, context):
+    """Resolves the names of a program run in context, returns the
+    Resolution and the error of the first name bound nowhere.
+
+    The engines are given the Resolution, a program is resolved once.
+    """
+    resolution = Resolution(context.symbol_table)
+    resolver = Resolver(resolution)
+    resolver.resolve(ast)
+    resolver.find_quiet_loops()
+    for name, node, scope in resolver.reads:
+        kind, slot = resolution.classify(name, scope)
+        if kind is None:
+            error = EjecucionError(
+                node.pos_start, node.pos_end, f"'{name}' no es definido", context
+            )
+            return None, error
+        if scope is not None and not (kind == LOCAL and slot < scope.arg_count):
+            # Read from the callers, until the call binds it for LOCAL, or
+            # once a later program binds it in a function for GLOBAL
+            resolution.shared_names.add(name)
+    return resolution, None
@@ -1,31 +1,13 @@
 class ParseResult:
-    """A class for handling the results from parsing."""
+    """A class for handling the results from parsing.
+
+    Only the outcome of a whole parse is wrapped, the rules of the parser
+    return their nodes directly and raise on invalid syntax.
+    """
 
     def __init__(self):
         self.error = None
         self.node = None
-        self.last_registered_advance_count = 0
-        self.advance_count = 0
-        self.to_reverse_count = 0
-
-    def register_advancement(self):
-        """A function to keep track of advancements."""
-        self.last_registered_advance_count = 1
-        self.advance_count += 1
-
-    def register(self, res):
-        """A function to pass parse results."""
-        self.last_registered_advance_count = res.advance_count
-        self.advance_count += res.advance_count
-        if res.error:
-            self.error = res.error
-        return res.node
-
-    def try_register(self, res):
-        if res.error:
-            self.to_reverse_count = res.advance_count
-            return None
-        return self.register(res)
 
     def success(self, node):
         """A function to declare succesful parsing."""
@@ -34,8 +16,7 @@ class ParseResult:
 
     def failure(self, error):
         """A function to declare unsuccessful parsing."""
-        if not self.error or self.advance_count == 0:
-            self.error = error
+        self.error = error
         return self
 
 
@@ -96,3 +77,26 @@ class RTResult:
             or self.loop_should_break
             or self.loop_should_continue
         )
+
+
+class Unwind(Exception):
+    """Raised by the engines that do not pass RTResults around, to leave
+    the running code for rompe, sigue, entrega or a runtime error."""
+
+
+class BreakLoop(Unwind):
+    pass
+
+
+class ContinueLoop(Unwind):
+    pass
+
+
+class ReturnValue(Unwind):
+    def __init__(self, value):
+        self.value = value
+
+
+class RuntimeFailure(Unwind):
+    def __init__(self, error):
+        self.error = error
@@ -0,0 +1,148 @@
+import weakref
+from bisect import bisect_right
+
+
+class Position:
+    """A resolved position in a source file.
+
+    Tokens, nodes and values only carry plain integer positions; a Position
+    with its line and column is built from them when an error is displayed.
+    """
+
+    def __init__(self, idx, ln, col, fn, ftxt):
+        """Initial parameters for the position class.
+        Stores index, line, column, file name, and file text.
+        """
+        self.idx = idx
+        self.ln = ln
+        self.col = col
+        self.fn = fn
+        self.ftxt = ftxt
+
+    def copy(self):
+        """Copies all of the stored values at a given position."""
+        return Position(self.idx, self.ln, self.col, self.fn, self.ftxt)
+
+
+class Source:
+    """A source text and the range of integer positions assigned to it."""
+
+    __slots__ = ("fn", "path", "_text", "base", "size", "line_starts", "__weakref__")
+
+    def __init__(self, fn, text, base, size=None, path=None):
+        self.fn = fn
+        # Streamed scripts are only read back from their file on error
+        self.path = path
+        self._text = text
+        self.base = base
+        # Positions up to two characters past the end are still valid, the
+        # end of file token and unterminated strings point there.
+        self.size = (len(text) if size is None else size) + 3
+        # The line index is only built the first time a position is resolved
+        self.line_starts = None
+
+    @property
+    def text(self):
+        if self._text is None:
+            with open(self.path, encoding="utf-8") as file:
+                self._text = file.read()
+        return self._text
+
+    def contains(self, pos):
+        return self.base <= pos < self.base + self.size
+
+    def position(self, pos):
+        """Resolves a start position to its line and column."""
+        if self.line_starts is None:
+            starts = [0]
+            find = self.text.find
+            idx = find("\n")
+            while idx >= 0:
+                starts.append(idx + 1)
+                idx = find("\n", idx + 1)
+            self.line_starts = starts
+
+        idx = pos - self.base
+        ln = bisect_right(self.line_starts, idx) - 1
+        return Position(idx, ln, idx - self.line_starts[ln], self.fn, self.text)
+
+    def end_position(self, pos):
+        """Resolves an exclusive end position to its line and column.
+
+        The end stays on the line of the last character it covers, so a
+        newline token ends on its own line instead of the next one.
+        """
+        if pos - self.base <= 0:
+            return self.position(pos)
+        last = self.position(pos - 1)
+        return Position(last.idx + 1, last.ln, last.col + 1, self.fn, self.text)
+
+
+class SourceSet:
+    """Gives every source a disjoint range of integer positions.
+
+    A single integer is then enough to find the file, line and column of a
+    token, node or value. Sources are only held weakly, they stay alive as
+    long as the lexer, a block of code or an error still refers to them.
+    Only their file names are kept after they have been collected.
+    """
+
+    def __init__(self):
+        self.next_base = 0
+        self.bases = []
+        self.sources = []
+        self.names = []
+        self.prune_at = 64
+
+    def add(self, fn, text, size=None, path=None):
+        """Registers a new source text and returns it.
+
+        The text of a script that is streamed from a file may be left out,
+        as long as an upper bound of its size is given.
+        """
+        source = Source(fn, text, self.next_base, size, path)
+        self.next_base += source.size
+
+        # Merge the runs of collected sources of the same file, only their
+        # name is still needed
+        if len(self.sources) >= self.prune_at:
+            kept = []
+            for i, ref in enumerate(self.sources):
+                if (
+                    ref() is None
+                    and kept
+                    and self.sources[kept[-1]]() is None
+                    and self.names[kept[-1]] == self.names[i]
+                ):
+                    continue
+                kept.append(i)
+            self.bases = [self.bases[i] for i in kept]
+            self.sources = [self.sources[i] for i in kept]
+            self.names = [self.names[i] for i in kept]
+            self.prune_at = max(64, 2 * len(kept))
+
+        self.bases.append(source.base)
+        self.sources.append(weakref.ref(source))
+        self.names.append(fn)
+        return source
+
+    def lookup(self, pos):
+        """Returns the source a position belongs to, or None."""
+        if pos is None:
+            return None
+        i = bisect_right(self.bases, pos) - 1
+        if i < 0:
+            return None
+        source = self.sources[i]()
+        if source is None or not source.contains(pos):
+            return None
+        return source
+
+    def name(self, pos):
+        """Returns the file name of a position, even once its source is gone."""
+        if pos is None or not 0 <= pos < self.next_base:
+            return None
+        return self.names[bisect_right(self.bases, pos) - 1]
+
+
+SOURCES = SourceSet()
@@ -0,0 +1,281 @@
+from .lexer import *
+from .nodes import *
+from .token import *
+from .results import ParseResult
+from .interpreter import ConstantPool
+from .ll1_tables import *
+
+# How the tokens are named in the messages of syntax errors
+TOKEN_DISPLAY = {
+    TT_INT: "int",
+    TT_FLOAT: "float",
+    TT_IDENTIFIER: "identificador",
+    TT_STRING: "texto",
+    TT_PLUS: "'+'",
+    TT_MINUS: "'-'",
+    TT_MUL: "'*'",
+    TT_DIV: "'/'",
+    TT_MOD: "'%'",
+    TT_FLOORDIV: "'//'",
+    TT_POW: "'**'",
+    TT_EQ: "'='",
+    TT_EE: "'=='",
+    TT_NE: "'!='",
+    TT_LT: "'<'",
+    TT_GT: "'>'",
+    TT_LTE: "'<='",
+    TT_GTE: "'>='",
+    TT_LPAREN: "'('",
+    TT_RPAREN: "')'",
+    TT_LBRACE: "'{'",
+    TT_RBRACE: "'}'",
+    TT_LSQUARE: "'['",
+    TT_RSQUARE: "']'",
+    TT_COMMA: "','",
+    TT_ARROW: "'->'",
+    TT_NEWLINE: "nueva linea",
+    TT_EOF: "fin del archivo",
+}
+TOKEN_DISPLAY.update({type_: f"'{name}'" for name, type_ in KEYWORDS.items()})
+
+
+def expected_details(types):
+    """The message of a syntax error when one of types was expected."""
+    names = [TOKEN_DISPLAY[type_] for type_ in sorted(types)]
+    if len(names) > 1:
+        names[-2:] = [f"{names[-2]} o {names[-1]}"]
+    return ", ".join(names) + " esperado"
+
+
+def fold_binary_operations(children):
+    """Builds left associative operations from operand, op, operand, ..."""
+    left = children[0]
+    for i in range(1, len(children), 2):
+        left = BinaryOpNode(left, children[i], children[i + 1])
+    return left
+
+
+class TableParser:
+    """A non-recursive parser driven by the tables of grammar/grammar.txt.
+
+    The LL(1) tables are generated by mariachi.grammar. Symbols waiting to
+    be matched are kept on an explicit stack together with the markers of
+    the rules to build once all of their children are parsed, so neither
+    the speed nor the stack use depend on how deeply the code is nested.
+    It builds the same nodes as Parser.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = iter(tokens)
+        self.current_tok = next(self.tokens)
+        self.repl = False
+        self.constants = ConstantPool()
+        # Blocks keep their source alive for as long as a function needs it
+        self.source = SOURCES.lookup(self.current_tok.pos_start)
+
+    def parse(self):
+        """Parses the tokens and returns the ParseResult of the program."""
+        res = ParseResult()
+        tokens = self.tokens
+        tok = self.current_tok
+        rows = ROWS
+        transparent = TRANSPARENT_BUILDS
+
+        # Matched tokens and built nodes, waiting for the rule they are in
+        values = []
+        stack = [START]
+
+        while stack:
+            symbol = stack.pop()
+
+            # The children of a rule are complete, build its node
+            if symbol.__class__ is tuple:
+                build, base, start_tok = symbol
+                # Most rules just pass a single node up
+                if (
+                    len(values) == base + 1
+                    and build in transparent
+                    and values[base].__class__ is not Token
+                ):
+                    continue
+                node = build(self, values[base:], start_tok, tok)
+                del values[base:]
+                values.append(node)
+
+            elif symbol < NONTERMINAL_BASE:
+                if tok.type != symbol:
+                    return res.failure(self.syntax_error(tok, (symbol,)))
+                values.append(tok)
+                tok = next(tokens, tok)
+
+            else:
+                expansion = rows[symbol - NONTERMINAL_BASE][tok.type]
+                if expansion is None:
+                    return res.failure(self.syntax_error(tok, TABLE[symbol]))
+                build, symbols = expansion
+                if build is not None:
+                    stack.append((build, len(values), tok))
+                stack.extend(symbols)
+
+        self.current_tok = tok
+        return res.success(values[0])
+
+    def syntax_error(self, tok, expected):
+        return SintaxisInvalidoError(
+            tok.pos_start, tok.pos_end, expected_details(expected)
+        )
+
+    ####################################
+    # Node builders, called with the tokens and nodes of a rule, its first
+    # token and the token following it.
+
+    def build_program(self, children, start_tok, end_tok):
+        return children[0]
+
+    def build_block(self, children, start_tok, end_tok):
+        return BlockNode(
+            children[1], start_tok.pos_start, end_tok.pos_end, True, self.source
+        )
+
+    def build_statements(self, children, start_tok, end_tok):
+        statements = [child for child in children if child.__class__ is not Token]
+        return ListNode(statements, start_tok.pos_start, end_tok.pos_end)
+
+    def build_statement(self, children, start_tok, end_tok):
+        tok = children[0]
+        if tok.__class__ is not Token:
+            return tok
+        if tok.type == TT_ENTREGA:
+            expr = children[1] if len(children) > 1 else None
+            return ReturnNode(expr, start_tok.pos_start, end_tok.pos_end)
+        if tok.type == TT_SIGUE:
+            return ContinueNode(start_tok.pos_start, end_tok.pos_end)
+        return BreakNode(start_tok.pos_start, end_tok.pos_end)
+
+    def build_expr(self, children, start_tok, end_tok):
+        tok = children[0]
+        if tok.__class__ is Token:
+            if tok.type == TT_SEA:
+                return VarAssignNode(children[1], children[3])
+            return ConstAssignNode(children[1], children[3])
+        return fold_binary_operations(children)
+
+    def build_comp(self, children, start_tok, end_tok):
+        if children[0].__class__ is Token:
+            return UnaryOpNode(children[0], children[1])
+        return fold_binary_operations(children)
+
+    def build_math(self, children, start_tok, end_tok):
+        return fold_binary_operations(children)
+
+    def build_term(self, children, start_tok, end_tok):
+        return fold_binary_operations(children)
+
+    def build_factor(self, children, start_tok, end_tok):
+        if len(children) == 2:
+            return UnaryOpNode(children[0], children[1])
+        return children[0]
+
+    def build_power(self, children, start_tok, end_tok):
+        return fold_binary_operations(children)
+
+    def build_call(self, children, start_tok, end_tok):
+        if len(children) == 1:
+            return children[0]
+        arg_nodes = [child for child in children[2:] if child.__class__ is not Token]
+        return CallNode(children[0], arg_nodes)
+
+    def build_atom(self, children, start_tok, end_tok):
+        tok = children[0]
+        if tok.__class__ is not Token:
+            return tok
+        if tok.type in (TT_INT, TT_FLOAT):
+            return NumberNode(tok, self.constants.number(tok.value))
+        if tok.type == TT_STRING:
+            return StringNode(tok, self.constants.string(tok.value))
+        if tok.type == TT_IDENTIFIER:
+            return VarAccessNode(tok)
+        # A parenthesized expression
+        return children[1]
+
+    def build_list(self, children, start_tok, end_tok):
+        element_nodes = [child for child in children if child.__class__ is not Token]
+        return ListNode(element_nodes, start_tok.pos_start, end_tok.pos_end)
+
+    def build_if(self, children, start_tok, end_tok):
+        cases = []
+        else_case = None
+        i = 0
+        while i < len(children):
+            if children[i].type == TT_SINO:
+                else_case = children[i + 1]
+                break
+            cases.append((children[i + 1], children[i + 2]))
+            i += 3
+        return IfNode(cases, else_case)
+
+    def build_for(self, children, start_tok, end_tok):
+        step_value = children[7] if len(children) == 9 else None
+        return ForNode(children[1], children[3], children[5], step_value, children[-1])
+
+    def build_while(self, children, start_tok, end_tok):
+        return WhileNode(children[1], children[2])
+
+    def build_define(self, children, start_tok, end_tok):
+        var_name_tok = None
+        i = 1
+        if children[1].type == TT_IDENTIFIER:
+            var_name_tok = children[1]
+            i = 2
+        arg_name_toks = [
+            child for child in children[i:-1] if child.type == TT_IDENTIFIER
+        ]
+        return FuncDefNode(var_name_tok, arg_name_toks, children[-1], False)
+
+
+def compile_rows():
+    """Lays out the tables for TableParser.parse().
+
+    Every nonterminal gets a list indexed by token type of the method that
+    builds its node, None for helpers, and the symbols to push, reversed.
+    Defaults fill the token types missing from the table.
+    """
+    token_types = len(TOKEN_NAMES)
+    expansions = []
+    for lhs, symbols in PRODUCTIONS:
+        build = None
+        if lhs not in GROUPS:
+            build = getattr(
+                TableParser, "build_" + NONTERMINALS[lhs - NONTERMINAL_BASE]
+            )
+        expansions.append((build, symbols[::-1]))
+
+    rows = []
+    for i in range(len(NONTERMINALS)):
+        nonterminal = NONTERMINAL_BASE + i
+        default = DEFAULTS.get(nonterminal)
+        row = [None if default is None else expansions[default]] * token_types
+        for type_, number in TABLE[nonterminal].items():
+            row[type_] = expansions[number]
+        rows.append(row)
+    return rows
+
+
+ROWS = compile_rows()
+
+# The rules whose node is their only child when it is a node
+TRANSPARENT_BUILDS = frozenset(
+    getattr(TableParser, "build_" + name)
+    for name in (
+        "program",
+        "statement",
+        "expr",
+        "comp",
+        "math",
+        "term",
+        "factor",
+        "power",
+        "call",
+        "atom",
+    )
+)
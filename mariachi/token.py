@@ -8,85 +8,141 @@ DIGITS = "0123456789"
 LETTERS = string.ascii_letters
 LETTERS_DIGITS = LETTERS + DIGITS
 
-KEYWORDS = [
-    "sea",  # let
-    "fija",  # const
-    "y",  # and
-    "o",  # or
-    "jamas",  # not
-    "si",  # if
-    "quizas",  # elseif
-    "sino",  # else
-    "mientras",  # while
-    "para",  # for
-    "hasta",  # to
-    "paso",  # step
-    "define",  # define functions
-    "entrega",  # return
-    "sigue",  # continue
-    "rompe",  # break
-]
-
 #################################
 # TOKENS
 #################################
 
-TT_INT = "INT"
-TT_FLOAT = "FLOAT"
-TT_IDENTIFIER = "IDENTIFIER"
-TT_STRING = "STRING"
-TT_KEYWORD = "KEYWORD"
-TT_PLUS = "PLUS"
-TT_MINUS = "MINUS"
-TT_MUL = "MUL"
-TT_DIV = "DIV"
-TT_MOD = "MOD"
-TT_FLOORDIV = "FLOORDIV"
-TT_POW = "POW"
-TT_EQ = "EQ"
-TT_EE = "EE"
-TT_NE = "NE"
-TT_LT = "LT"
-TT_GT = "GT"
-TT_LTE = "LTE"
-TT_GTE = "GTE"
-TT_LPAREN = "LPAREN"
-TT_RPAREN = "RPAREN"
-TT_LBRACE = "LBRACE"
-TT_RBRACE = "RBRACE"
-TT_LSQUARE = "LSQUARE"
-TT_RSQUARE = "RSQUARE"
-TT_COMMA = "COMMA"
-TT_ARROW = "ARROW"
-TT_COMMENT = "COMMENT"
-TT_NEWLINE = "NEWLINE"
-TT_EOF = "EOF"
+# Token types are small integers, every keyword has a type of its own so
+# the parser can tell them apart with a single comparison.
+TT_INT = 0
+TT_FLOAT = 1
+TT_IDENTIFIER = 2
+TT_STRING = 3
+TT_KEYWORD = 4
+TT_PLUS = 5
+TT_MINUS = 6
+TT_MUL = 7
+TT_DIV = 8
+TT_MOD = 9
+TT_FLOORDIV = 10
+TT_POW = 11
+TT_EQ = 12
+TT_EE = 13
+TT_NE = 14
+TT_LT = 15
+TT_GT = 16
+TT_LTE = 17
+TT_GTE = 18
+TT_LPAREN = 19
+TT_RPAREN = 20
+TT_LBRACE = 21
+TT_RBRACE = 22
+TT_LSQUARE = 23
+TT_RSQUARE = 24
+TT_COMMA = 25
+TT_ARROW = 26
+TT_COMMENT = 27
+TT_NEWLINE = 28
+TT_EOF = 29
+
+TT_SEA = 30  # let
+TT_FIJA = 31  # const
+TT_Y = 32  # and
+TT_O = 33  # or
+TT_JAMAS = 34  # not
+TT_SI = 35  # if
+TT_QUIZAS = 36  # elseif
+TT_SINO = 37  # else
+TT_MIENTRAS = 38  # while
+TT_PARA = 39  # for
+TT_HASTA = 40  # to
+TT_PASO = 41  # step
+TT_DEFINE = 42  # define functions
+TT_ENTREGA = 43  # return
+TT_SIGUE = 44  # continue
+TT_ROMPE = 45  # break
+
+KEYWORDS = {
+    "sea": TT_SEA,
+    "fija": TT_FIJA,
+    "y": TT_Y,
+    "o": TT_O,
+    "jamas": TT_JAMAS,
+    "si": TT_SI,
+    "quizas": TT_QUIZAS,
+    "sino": TT_SINO,
+    "mientras": TT_MIENTRAS,
+    "para": TT_PARA,
+    "hasta": TT_HASTA,
+    "paso": TT_PASO,
+    "define": TT_DEFINE,
+    "entrega": TT_ENTREGA,
+    "sigue": TT_SIGUE,
+    "rompe": TT_ROMPE,
+}
+
+# Printable names of the token types, keywords all print as KEYWORD
+TOKEN_NAMES = [
+    "INT",
+    "FLOAT",
+    "IDENTIFIER",
+    "STRING",
+    "KEYWORD",
+    "PLUS",
+    "MINUS",
+    "MUL",
+    "DIV",
+    "MOD",
+    "FLOORDIV",
+    "POW",
+    "EQ",
+    "EE",
+    "NE",
+    "LT",
+    "GT",
+    "LTE",
+    "GTE",
+    "LPAREN",
+    "RPAREN",
+    "LBRACE",
+    "RBRACE",
+    "LSQUARE",
+    "RSQUARE",
+    "COMMA",
+    "ARROW",
+    "COMMENT",
+    "NEWLINE",
+    "EOF",
+] + ["KEYWORD"] * len(KEYWORDS)
 
 
 class Token:
     """The tokens represented in the Mariachi Lang."""
 
+    __slots__ = ("type", "value", "pos_start", "pos_end")
+
     def __init__(self, type_, value=None, pos_start=None, pos_end=None):
-        """Initial parameters for tokens, each one has a type and value."""
+        """Initial parameters for tokens, each one has a type and value.
+
+        Positions are plain integers, see source.SOURCES to resolve them.
+        """
         self.type = type_
         self.value = value
-
-        if pos_start:
-            self.pos_start = pos_start.copy()
-            self.pos_end = pos_start.copy()
-            self.pos_end.advance()
-
-        if pos_end:
-            self.pos_end = pos_end.copy()
+        self.pos_start = pos_start
+        if pos_end is None and pos_start is not None:
+            pos_end = pos_start + 1
+        self.pos_end = pos_end
 
     def matches(self, type_, value):
         """Function to check if a token matches the current type and value."""
+        if type_ == TT_KEYWORD:
+            return self.type == KEYWORDS.get(value)
         return self.type == type_ and self.value == value
 
     def __repr__(self):
         """Representation method for printing to terminal window."""
         # If the token has a value both the type and value are returned
         if self.value:
-            return f"{self.type}:{self.value}"
+            return f"{TOKEN_NAMES[self.type]}:{self.value}"
         # Otherwise just the type is returned
-        return f"{self.type}"
+        return f"{TOKEN_NAMES[self.type]}"
@@ -0,0 +1,597 @@
+"""An engine that transpiles the AST into Python source and runs it.
+
+The program and every function defined with define become Python
+functions, para and mientras become while loops and lexical rompe and sigue
+become break and continue, so CPython's own bytecode does the work the
+Interpreter does per node. Every subexpression is stored in a local
+temporary, which keeps mariachi's evaluation order however deeply the
+expressions nest.
+
+Names still live in the symbol tables of the contexts, scoping is dynamic,
+and values, positions and contexts are handled exactly like in the
+Interpreter, so both engines print the same results and errors. Positions
+are written relative to B, the base of the source, so that the generated
+code does not depend on where the source was loaded and can be cached.
+"""
+
+import re
+
+from .token import *
+from .results import *
+from .errors import *
+from .closure_compiler import call_value
+from .interpreter import (
+    BINARY_OPERATIONS,
+    OPERATOR_METHODS,
+    SHORT_CIRCUITS,
+    Function,
+    List,
+    Number,
+    String,
+    VisitMethods,
+    loop_steps,
+    make_number,
+    operation_error,
+    short_circuit,
+    unary_error,
+    value_span,
+)
+from .resolver import SHARED_NAMES
+from .source import SOURCES
+
+# The Python function the program becomes
+PROGRAM_NAME = "programa"
+
+# Expressions that are already in a local or a constant of the generated code
+TEMPORARY = re.compile(r"[tK]\d+")
+
+
+class TranspiledFunction(Function):
+    """A function defined by generated Python code.
+
+    body takes the context of the call and returns the value of the call,
+    it already knows whether the function returns its last value. Like the
+    body node of other functions, source keeps the text of the body alive
+    for the errors of later programs.
+    """
+
+    def __init__(self, name, arg_names, should_auto_return, body, source=None):
+        super().__init__(name, None, arg_names, should_auto_return)
+        self.body = body
+        self.source = source
+
+    def call(self, args, context=None, pos_start=None, pos_end=None):
+        """Runs the function and returns its value, raising on errors."""
+        exec_ctx, error = self.prepare_call(args, context, pos_start, pos_end)
+        if error:
+            raise RuntimeFailure(error)
+        return self.body(exec_ctx)
+
+    def execute(self, args, context=None, pos_start=None, pos_end=None):
+        res = RTResult()
+        try:
+            return res.success(self.call(args, context, pos_start, pos_end))
+        except RuntimeFailure as e:
+            return res.failure(e.error)
+
+    def copy(self):
+        copy = TranspiledFunction(
+            self.name, self.arg_names, self.should_auto_return, self.body, self.source
+        )
+        copy.set_context(self.context)
+        copy.set_position(self.pos_start, self.pos_end)
+        return copy
+
+
+def call(value_to_call, args, context, pos_start, pos_end):
+    """Calls any value, transpiled functions directly."""
+    if value_to_call.__class__ is TranspiledFunction:
+        return value_to_call.call(args, context, pos_start, pos_end)
+    return call_value(value_to_call, args, context, pos_start, pos_end)
+
+
+def undefined(name, pos_start, pos_end, context):
+    return RuntimeFailure(
+        EjecucionError(pos_start, pos_end, f"'{name}' no es definido", context)
+    )
+
+
+# The globals the generated code runs with, besides B and S, its source
+RUNTIME = {
+    "Number": Number,
+    "String": String,
+    "List": List,
+    "TranspiledFunction": TranspiledFunction,
+    "EjecucionError": EjecucionError,
+    "RuntimeFailure": RuntimeFailure,
+    "BreakLoop": BreakLoop,
+    "ContinueLoop": ContinueLoop,
+    "call": call,
+    "undefined": undefined,
+    "operation_error": operation_error,
+    "unary_error": unary_error,
+    "make_number": make_number,
+    "loop_steps": loop_steps,
+    "short_circuit": short_circuit,
+    # The operation of each operator, by the name of its method
+    **{method: BINARY_OPERATIONS[type_] for type_, method in OPERATOR_METHODS.items()},
+}
+
+
+class Transpiler:
+    """Writes the Python source of an AST, one method per node class.
+
+    Each method emits the statements a node needs and returns a Python
+    expression for its value. Lines are kept as (indent, text) pairs so
+    that statements can be moved into a deeper block.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.transpile_methods = VisitMethods(cls, "transpile_")
+
+    def __init__(self, base, resolution=None):
+        self.base = base
+        self.resolution = resolution
+        # The lines of every generated function, the program first
+        self.functions = []
+        self.lines = None
+        self.indent = 0
+        self.temp_count = 0
+        # How many loops of the current function the code is in
+        self.loops = 0
+        self.in_function = False
+        # The name of the module global of each literal, made once per program
+        self.constants = {}
+
+    def transpile(self, node):
+        return self.transpile_methods[node.__class__](self, node)
+
+    def no_visit_method(self, node):
+        raise Exception(f"No transpile_{type(node).__name__} method defined.")
+
+    def source(self, ast, name="<programma>"):
+        """The Python module running ast."""
+        self.function(PROGRAM_NAME, ast, False, True)
+        lines = [f"# {name!r} transpiled by mariachi.transpiler"]
+        if self.constants:
+            lines.append("")
+        for (cls, value), constant in self.constants.items():
+            make = "String" if cls is str else "make_number"
+            lines.append(f"{constant} = {make}({value!r})")
+        for function in self.functions:
+            lines.append("")
+            lines.append("")
+            lines.extend("    " * indent + text for indent, text in function)
+        return "\n".join(lines) + "\n"
+
+    # Helpers for the methods below
+
+    def emit(self, text):
+        self.lines.append((self.indent, text))
+
+    def temp(self):
+        self.temp_count += 1
+        return f"t{self.temp_count}"
+
+    def assign(self, expr):
+        """Stores an expression in a temporary, unless it already is one."""
+        if TEMPORARY.fullmatch(expr):
+            return expr
+        temp = self.temp()
+        self.emit(f"{temp} = {expr}")
+        return temp
+
+    def constant(self, value):
+        """The global holding the Value of a literal."""
+        # 1 and 1.0 are equal but not the same constant
+        key = (value.__class__, value)
+        if key not in self.constants:
+            self.constants[key] = f"K{len(self.constants)}"
+        return self.constants[key]
+
+    def positions(self, node):
+        return f"B + {node.pos_start - self.base}, B + {node.pos_end - self.base}"
+
+    def nested(self, node):
+        """Transpiles a node into separate lines, returns them and its value."""
+        lines = self.lines
+        self.lines = []
+        try:
+            expr = self.transpile(node)
+            return self.lines, expr
+        finally:
+            self.lines = lines
+
+    def splice(self, lines, shift=0):
+        self.lines.extend((indent + shift, text) for indent, text in lines)
+
+    def operands(self, nodes):
+        """The values of nodes evaluated left to right.
+
+        The expressions of the earlier nodes are stored before the
+        statements of a later node run.
+        """
+        exprs = []
+        for node in nodes:
+            lines, expr = self.nested(node)
+            if lines:
+                exprs = [self.assign(e) for e in exprs]
+                self.splice(lines)
+            exprs.append(expr)
+        return exprs
+
+    def statement(self, expr):
+        """Evaluates an expression whose value is not needed."""
+        if not TEMPORARY.fullmatch(expr) and expr != "None":
+            self.emit(expr)
+
+    def set_result(self, result, expr):
+        # None is the value of code that never gets there
+        if expr != "None":
+            self.emit(f"{result} = {expr}")
+
+    def span(self, node):
+        """The positions of the value of a node, see value_span()."""
+        pos_start, pos_end = value_span(node)
+        return f"(B + {pos_start - self.base}, B + {pos_end - self.base})"
+
+    def function(self, name, body_node, is_function, should_return):
+        """Writes the Python function running body_node."""
+        state = (self.lines, self.indent, self.temp_count, self.loops)
+        in_function = self.in_function
+        index = len(self.functions)
+        self.functions.append(None)
+
+        self.lines = [(0, f"def {name}(context):")]
+        self.indent = 1
+        self.temp_count = 0
+        self.loops = 0
+        self.in_function = is_function
+        self.emit("symbols = context.symbol_table")
+        expr = self.transpile(body_node)
+        if should_return:
+            self.emit(f"return {expr}")
+        else:
+            self.statement(expr)
+            self.emit("return Number.null")
+
+        self.functions[index] = self.lines
+        self.lines, self.indent, self.temp_count, self.loops = state
+        self.in_function = in_function
+
+    def function_name(self, name):
+        number = len(self.functions)
+        if name and name.isidentifier() and name.isascii():
+            return f"{name}_{number}"
+        return f"funcion_{number}"
+
+    def loop_elements(self, node, n):
+        """Emits the list collecting the values of the body of a loop and
+        returns its name, None when the value of the loop is never used."""
+        if self.resolution is not None and self.resolution.discards(node):
+            return None
+        elements = f"elements{n}"
+        self.emit(f"{elements} = []")
+        return elements
+
+    def loop_value(self, node, elements):
+        if elements is None:
+            return "Number.null"
+        return f"List({elements}).with_meta(context, {self.positions(node)})"
+
+    def loop_body(self, body_node, elements):
+        """Emits the body of a loop, collecting its values into elements."""
+        lines, expr = self.nested(body_node)
+        # rompe and sigue in called functions unwind to the loop, the try
+        # costs nothing while they do not
+        self.emit("try:")
+        self.splice(lines, 1)
+        if elements is not None:
+            self.emit(f"    {elements}.append({expr})")
+        else:
+            self.indent += 1
+            self.statement(expr)
+            self.indent -= 1
+            if self.lines[-1] == (self.indent, "try:"):
+                self.emit("    pass")
+        self.emit("except ContinueLoop:")
+        self.emit("    continue")
+        self.emit("except BreakLoop:")
+        self.emit("    break")
+
+    # One method per node class
+
+    def transpile_NumberNode(self, node):
+        return self.constant(node.tok.value)
+
+    def transpile_StringNode(self, node):
+        return self.constant(node.tok.value)
+
+    def transpile_BinaryOpNode(self, node):
+        if node.op_tok.type in SHORT_CIRCUITS:
+            return self.logical_op(node)
+        left, right = self.operands([node.left_node, node.right_node])
+        method = OPERATOR_METHODS.get(node.op_tok.type)
+
+        if method is None:
+            self.statement(left)
+            self.statement(right)
+            details = f"Operador desconocido '{node.op_tok}'"
+            self.emit(
+                f"raise RuntimeFailure(EjecucionError({self.positions(node)}, "
+                f"{details!r}, context))"
+            )
+            return "None"
+
+        left, right = self.assign(left), self.assign(right)
+        result = self.temp()
+        self.emit(f"{result}, error = {method}({left}, {right})")
+        self.emit("if error:")
+        self.emit(
+            f"    raise RuntimeFailure(operation_error({left}, {right}, {method!r}, "
+            f"context, {self.span(node.left_node)}, {self.span(node.right_node)}))"
+        )
+        return result
+
+    def logical_op(self, node):
+        """y and o, the right operand is only evaluated when the left one
+        does not decide the value."""
+        op_type = node.op_tok.type
+        method = OPERATOR_METHODS[op_type]
+        left = self.assign(self.transpile(node.left_node))
+        result = self.temp()
+        self.emit(f"{result} = short_circuit({op_type}, {left})")
+        self.emit(f"if {result} is None:")
+        self.indent += 1
+        right = self.assign(self.transpile(node.right_node))
+        self.emit(f"{result}, error = {method}({left}, {right})")
+        self.emit("if error:")
+        self.emit(
+            f"    raise RuntimeFailure(operation_error({left}, {right}, {method!r}, "
+            f"context, {self.span(node.left_node)}, {self.span(node.right_node)}))"
+        )
+        self.indent -= 1
+        return result
+
+    def transpile_UnaryOpNode(self, node):
+        operand = self.transpile(node.node)
+        op_type = node.op_tok.type
+        if op_type not in (TT_MINUS, TT_JAMAS):
+            return operand
+
+        operand = self.assign(operand)
+        result = self.temp()
+        if op_type == TT_MINUS:
+            self.emit(f"{result}, error = {operand}.multed_by(make_number(-1))")
+        else:
+            self.emit(f"{result}, error = {operand}.notted()")
+        self.emit("if error:")
+        self.emit(
+            f"    raise RuntimeFailure(unary_error({operand}, {op_type}, context, "
+            f"{self.span(node.node)}))"
+        )
+        return result
+
+    def transpile_VarAssignNode(self, node):
+        value = self.assign(self.transpile(node.value_node))
+        self.emit(f"symbols.set({node.var_name_tok.value!r}, {value})")
+        return value
+
+    def transpile_VarAccessNode(self, node):
+        name = node.var_name_tok.value
+        value = self.temp()
+        self.emit(f"{value} = symbols.get({name!r})")
+        self.emit(f"if not {value}:")
+        self.emit(f"    raise undefined({name!r}, {self.positions(node)}, context)")
+        return value
+
+    def transpile_ConstAssignNode(self, node):
+        value = self.assign(self.transpile(node.value_node))
+        self.emit("try:")
+        self.emit(f"    symbols.set_const({node.const_name_tok.value!r}, {value})")
+        self.emit("except Exception as e:")
+        self.emit(
+            "    raise RuntimeFailure("
+            f"EjecucionError({self.positions(node)}, str(e), context))"
+        )
+        return value
+
+    def transpile_ConstAccessNode(self, node):
+        return self.transpile_VarAccessNode(node)
+
+    def transpile_IfNode(self, node):
+        result = self.temp()
+        depth = 0
+        for i, (condition_node, expr_node) in enumerate(node.cases):
+            lines, condition = self.nested(condition_node)
+            if i and not lines:
+                keyword = "elif"
+            else:
+                if i:
+                    # The lines were made at the indent of this "else:"
+                    self.emit("else:")
+                    self.indent += 1
+                    depth += 1
+                self.splice(lines, 1 if i else 0)
+                keyword = "if"
+            self.emit(f"{keyword} {condition}.is_true():")
+            self.indent += 1
+            self.set_result(result, self.transpile(expr_node))
+            self.indent -= 1
+
+        self.emit("else:")
+        self.indent += 1
+        if node.else_case:
+            self.set_result(result, self.transpile(node.else_case))
+        else:
+            self.emit(f"{result} = Number.null")
+        self.indent -= 1 + depth
+        return result
+
+    def transpile_ForNode(self, node):
+        value_nodes = [node.start_value_node, node.end_value_node]
+        if node.step_value_node:
+            value_nodes.append(node.step_value_node)
+        values = self.operands(value_nodes)
+
+        n = self.temp_count = self.temp_count + 1
+        i, quiet, write = f"i{n}", f"quiet{n}", f"write{n}"
+        name = node.var_name_tok.value
+        elements = self.loop_elements(node, n)
+        step = f"{values[2]}.value" if node.step_value_node else "1"
+        # Known before the program runs, shared_names tells the functions
+        # of the programs run since
+        may_be_quiet = self.resolution is not None and self.resolution.quiet_counter(
+            node
+        )
+        if may_be_quiet:
+            self.emit(f"{quiet} = {name!r} not in shared_names")
+            self.emit(f"{write} = True")
+            self.emit(f"{i} = None")
+        self.emit(
+            f"for {i} in loop_steps({values[0]}.value, {values[1]}.value, {step}):"
+        )
+
+        self.indent += 1
+        self.loops += 1
+        if may_be_quiet:
+            # Past the first step, the variable is set on leaving
+            self.emit(f"if {write}:")
+            self.emit(f"    symbols.set({name!r}, make_number({i}))")
+            self.emit(f"    {write} = not {quiet}")
+        else:
+            self.emit(f"symbols.set({name!r}, make_number({i}))")
+        self.loop_body(node.body_node, elements)
+        self.loops -= 1
+        self.indent -= 1
+        if may_be_quiet:
+            self.emit(f"if {quiet} and {i} is not None:")
+            self.emit(f"    symbols.set({name!r}, make_number({i}))")
+        return self.loop_value(node, elements)
+
+    def transpile_WhileNode(self, node):
+        n = self.temp_count = self.temp_count + 1
+        elements = self.loop_elements(node, n)
+
+        lines, condition = self.nested(node.condition_node)
+        if lines:
+            self.emit("while True:")
+            self.splice(lines, 1)
+            self.emit(f"    if not {condition}.is_true():")
+            self.emit("        break")
+        else:
+            self.emit(f"while {condition}.is_true():")
+
+        self.indent += 1
+        self.loops += 1
+        self.loop_body(node.body_node, elements)
+        self.loops -= 1
+        self.indent -= 1
+        return self.loop_value(node, elements)
+
+    def transpile_FuncDefNode(self, node):
+        func_name = node.var_name_tok.value if node.var_name_tok else None
+        arg_names = [arg_name.value for arg_name in node.arg_name_toks]
+        name = self.function_name(func_name)
+        self.function(name, node.body_node, True, node.should_auto_return)
+
+        value = self.temp()
+        self.emit(
+            f"{value} = TranspiledFunction({func_name!r}, {arg_names!r}, "
+            f"{node.should_auto_return!r}, {name}, S)"
+            f".with_meta(context, {self.positions(node)})"
+        )
+        if func_name:
+            self.emit(f"symbols.set({func_name!r}, {value})")
+        return value
+
+    def transpile_CallNode(self, node):
+        value_to_call, *args = self.operands([node.node_to_call, *node.arg_nodes])
+        result = self.temp()
+        self.emit(
+            f"{result} = call({value_to_call}, [{', '.join(args)}], context, "
+            f"{self.positions(node)})"
+        )
+        return result
+
+    def transpile_ListNode(self, node):
+        elements = self.operands(node.element_nodes)
+        return (
+            f"List([{', '.join(elements)}]).with_meta(context, {self.positions(node)})"
+        )
+
+    def transpile_BlockNode(self, node):
+        statements = node.statement_nodes.element_nodes
+        if not statements:
+            return "Number.null"
+        for statement in statements[:-1]:
+            self.statement(self.transpile(statement))
+        return self.transpile(statements[-1])
+
+    def transpile_ReturnNode(self, node):
+        if node.node_to_return:
+            value = self.transpile(node.node_to_return)
+        else:
+            value = "Number.null"
+        if self.in_function:
+            self.emit(f"return {value}")
+        else:
+            # entrega in the program itself ends it without a value
+            self.statement(value)
+            self.emit("return None")
+        return "None"
+
+    def transpile_ContinueNode(self, node):
+        self.emit("continue" if self.loops else "raise ContinueLoop")
+        return "None"
+
+    def transpile_BreakNode(self, node):
+        self.emit("break" if self.loops else "raise BreakLoop")
+        return "None"
+
+
+Transpiler.transpile_methods = VisitMethods(Transpiler, "transpile_")
+
+
+def source_base(source):
+    return source.base if source else 0
+
+
+def transpile(ast, name="<programma>", resolution=None):
+    """The Python source of a program, with the Resolution of its names
+    the loops whose value is never used do not collect it."""
+    base = source_base(SOURCES.lookup(ast.pos_start))
+    return Transpiler(base, resolution).source(ast, name)
+
+
+def compile_ast(ast, name="<programma>", resolution=None):
+    """The Python code object of a program."""
+    return compile(transpile(ast, name, resolution), name, "exec")
+
+
+def run_code(code, source, context):
+    """Runs a code object of compile_ast() for the program of source,
+    returns its value and error."""
+    global_table = context.symbol_table
+    while global_table.parent:
+        global_table = global_table.parent
+    # The names read by functions, growing as programs are resolved
+    shared_names = SHARED_NAMES.setdefault(global_table, set())
+    namespace = dict(
+        RUNTIME, B=source_base(source), S=source, shared_names=shared_names
+    )
+    exec(code, namespace)
+    try:
+        return namespace[PROGRAM_NAME](context), None
+    except RuntimeFailure as e:
+        return None, e.error
+    except Unwind:
+        # rompe and sigue outside of loops and functions
+        return None, None
+
+
+def execute(ast, context, resolution):
+    """Transpiles and runs a resolved AST, returns its value and error."""
+    code = compile_ast(ast, resolution=resolution)
+    return run_code(code, SOURCES.lookup(ast.pos_start), context)
@@ -0,0 +1,267 @@
+"""A tree walking interpreter whose visits return plain values.
+
+It walks the AST like the Interpreter, but rompe, sigue, entrega and
+runtime errors raise the Unwind exceptions of mariachi.results instead of
+being carried in an RTResult that every visit registers and checks. When
+nothing unwinds, which is nearly always, no result is allocated and no
+flag is checked. Values, positions and contexts are handled exactly like
+in the Interpreter, so both print the same results and errors.
+"""
+
+import functools
+
+from .token import *
+from .results import *
+from .errors import *
+from .closure_compiler import CompiledFunction, call_value
+from .interpreter import (
+    OPERATOR_METHODS,
+    SHORT_CIRCUITS,
+    List,
+    Number,
+    VisitMethods,
+    loop_steps,
+    make_number,
+    operation_error,
+    short_circuit,
+    unary_error,
+    value_span,
+)
+
+
+class UnwindingInterpreter:
+    """The Interpreter without RTResult, one visit method per node class."""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.visit_methods = VisitMethods(cls)
+
+    def __init__(self, resolution=None):
+        self.resolution = resolution
+
+    def visit(self, node, context):
+        return self.visit_methods[node.__class__](self, node, context)
+
+    def no_visit_method(self, node, context):
+        raise Exception(f"No visit_{type(node).__name__} method defined.")
+
+    def visit_NumberNode(self, node, context):
+        return node.value
+
+    def visit_StringNode(self, node, context):
+        return node.value
+
+    def visit_BinaryOpNode(self, node, context):
+        left = self.visit(node.left_node, context)
+        if node.op_tok.type in SHORT_CIRCUITS:
+            result = short_circuit(node.op_tok.type, left)
+            if result is not None:
+                return result
+        right = self.visit(node.right_node, context)
+
+        operation = node.operation
+        if operation is None:
+            raise RuntimeFailure(
+                EjecucionError(
+                    node.pos_start,
+                    node.pos_end,
+                    f"Operador desconocido '{node.op_tok}'",
+                    context,
+                )
+            )
+
+        result, error = operation(left, right)
+        if error:
+            raise RuntimeFailure(
+                operation_error(
+                    left,
+                    right,
+                    OPERATOR_METHODS[node.op_tok.type],
+                    context,
+                    value_span(node.left_node),
+                    value_span(node.right_node),
+                )
+            )
+        return result
+
+    def visit_UnaryOpNode(self, node, context):
+        number = self.visit(node.node, context)
+        result, error = number, None
+
+        if node.op_tok.type == TT_MINUS:
+            result, error = number.multed_by(make_number(-1))
+        elif node.op_tok.type == TT_JAMAS:
+            result, error = number.notted()
+
+        if error:
+            raise RuntimeFailure(
+                unary_error(number, node.op_tok.type, context, value_span(node.node))
+            )
+        return result
+
+    def visit_VarAssignNode(self, node, context):
+        value = self.visit(node.value_node, context)
+        context.symbol_table.set(node.var_name_tok.value, value)
+        return value
+
+    def visit_VarAccessNode(self, node, context):
+        var_name = node.var_name_tok.value
+        value = context.symbol_table.get(var_name)
+
+        if not value:
+            raise RuntimeFailure(
+                EjecucionError(
+                    node.pos_start,
+                    node.pos_end,
+                    f"'{var_name}' no es definido",
+                    context,
+                )
+            )
+        return value
+
+    def visit_ConstAssignNode(self, node, context):
+        value = self.visit(node.value_node, context)
+
+        try:
+            context.symbol_table.set_const(node.const_name_tok.value, value)
+        except Exception as e:
+            raise RuntimeFailure(
+                EjecucionError(node.pos_start, node.pos_end, str(e), context)
+            )
+        return value
+
+    def visit_ConstAccessNode(self, node, context):
+        var_name = node.var_name_tok.value
+        value = context.symbol_table.get(var_name)
+
+        if not value:
+            raise RuntimeFailure(
+                EjecucionError(
+                    node.pos_start,
+                    node.pos_end,
+                    f"'{var_name}' no es definido",
+                    context,
+                )
+            )
+        return value
+
+    def visit_IfNode(self, node, context):
+        for condition, expr in node.cases:
+            if self.visit(condition, context).is_true():
+                return self.visit(expr, context)
+
+        if node.else_case:
+            return self.visit(node.else_case, context)
+        return Number.null
+
+    def visit_ForNode(self, node, context):
+        # None when the value of the loop is never used
+        elements = None if self.resolution and self.resolution.discards(node) else []
+
+        start_value = self.visit(node.start_value_node, context)
+        end_value = self.visit(node.end_value_node, context)
+        if node.step_value_node:
+            step_value = self.visit(node.step_value_node, context)
+        else:
+            step_value = Number(1)
+
+        name = node.var_name_tok.value
+        symbol_table = context.symbol_table
+        # Past the first step, the variable of a quiet loop is set on leaving
+        quiet = self.resolution is not None and self.resolution.quiet_counter(node)
+        write = True
+        i = None
+
+        for i in loop_steps(start_value.value, end_value.value, step_value.value):
+            if write:
+                symbol_table.set(name, make_number(i))
+                write = not quiet
+
+            try:
+                value = self.visit(node.body_node, context)
+            except ContinueLoop:
+                continue
+            except BreakLoop:
+                break
+            if elements is not None:
+                elements.append(value)
+        if quiet and i is not None:
+            symbol_table.set(name, make_number(i))
+        if elements is None:
+            return Number.null
+        return List(elements).with_meta(context, node.pos_start, node.pos_end)
+
+    def visit_WhileNode(self, node, context):
+        elements = None if self.resolution and self.resolution.discards(node) else []
+        while self.visit(node.condition_node, context).is_true():
+            try:
+                value = self.visit(node.body_node, context)
+            except ContinueLoop:
+                continue
+            except BreakLoop:
+                break
+            if elements is not None:
+                elements.append(value)
+        if elements is None:
+            return Number.null
+        return List(elements).with_meta(context, node.pos_start, node.pos_end)
+
+    def visit_FuncDefNode(self, node, context):
+        func_name = node.var_name_tok.value if node.var_name_tok else None
+        body_node = node.body_node
+        arg_names = [arg_name.value for arg_name in node.arg_name_toks]
+        scope = self.resolution.scope(node) if self.resolution else None
+        func_value = CompiledFunction(
+            func_name,
+            body_node,
+            arg_names,
+            node.should_auto_return,
+            functools.partial(self.visit, body_node),
+            scope,
+        ).with_meta(context, node.pos_start, node.pos_end)
+
+        if func_name:
+            context.symbol_table.set(func_name, func_value)
+        return func_value
+
+    def visit_CallNode(self, node, context):
+        value_to_call = self.visit(node.node_to_call, context)
+        args = [self.visit(arg_node, context) for arg_node in node.arg_nodes]
+        return call_value(value_to_call, args, context, node.pos_start, node.pos_end)
+
+    def visit_ListNode(self, node, context):
+        elements = [
+            self.visit(element_node, context) for element_node in node.element_nodes
+        ]
+        return List(elements).with_meta(context, node.pos_start, node.pos_end)
+
+    def visit_BlockNode(self, node, context):
+        result = None
+        for statement in node.statement_nodes.element_nodes:
+            result = self.visit(statement, context)
+        return result or Number.null
+
+    def visit_ReturnNode(self, node, context):
+        if node.node_to_return:
+            raise ReturnValue(self.visit(node.node_to_return, context))
+        raise ReturnValue(Number.null)
+
+    def visit_BreakNode(self, node, context):
+        raise BreakLoop
+
+    def visit_ContinueNode(self, node, context):
+        raise ContinueLoop
+
+
+UnwindingInterpreter.visit_methods = VisitMethods(UnwindingInterpreter)
+
+
+def execute(ast, context, resolution):
+    """Walks a resolved AST, returns its value and error."""
+    try:
+        return UnwindingInterpreter(resolution).visit(ast, context), None
+    except RuntimeFailure as e:
+        return None, e.error
+    except Unwind:
+        # rompe, sigue and entrega outside of loops and functions
+        return None, None
@@ -0,0 +1,468 @@
+"""A stack based virtual machine for the bytecode of mariachi.bytecode.
+
+Calls push a Frame instead of recursing in Python, and rompe, sigue and
+entrega jump or pop frames, so neither loops nor deep recursion grow the
+Python stack, the depth of calls is only limited by MAX_FRAMES. The other
+engines recurse in Python, mariachi.mariachi reports their RecursionError
+as an error of the program.
+
+A tail call, entrega of a call outside of loops, replaces the frame making
+it, so tail recursion runs in a constant number of frames. The symbol
+table of the caller is dropped too when no function reads the names it
+binds from other calls, otherwise dynamic scoping needs it and it is kept.
+The contexts of KEPT_TAIL_CALLS tail calls in a row are kept for the
+tracebacks of errors, the later ones replace the context of their caller.
+
+Values, positions and contexts are handled like in the Interpreter, so both
+engines print the same results and errors.
+"""
+
+from .bytecode import *
+from .errors import *
+from .interpreter import (
+    BINARY_OPERATIONS,
+    OPERATOR_METHODS,
+    BaseFunction,
+    Function,
+    List,
+    Number,
+    loop_steps,
+    make_number,
+    operation_error,
+    short_circuit,
+    unary_error,
+)
+from .resolver import FUNCTION_NAMES, SHARED_NAMES
+from .results import *
+
+# How deep calls may nest before the program is stopped
+MAX_FRAMES = 100_000
+# How many tail calls in a row keep their own context in tracebacks
+KEPT_TAIL_CALLS = 1000
+
+# The method and the operation of each operator, indexed by token type
+BINARY_METHODS = [None] * (max(OPERATOR_METHODS) + 1)
+BINARY_HANDLERS = [None] * (max(OPERATOR_METHODS) + 1)
+for type_, method in OPERATOR_METHODS.items():
+    BINARY_METHODS[type_] = method
+    BINARY_HANDLERS[type_] = BINARY_OPERATIONS[type_]
+
+
+class Frame:
+    """A running code object.
+
+    blocks holds (continue target, break target, stack depth) for each loop
+    being run, to find where rompe and sigue go. tail_calls counts the tail
+    calls in a row the frame was entered by.
+    """
+
+    __slots__ = ("code", "pc", "stack", "slots", "blocks", "context", "tail_calls")
+
+    def __init__(self, code, context):
+        self.code = code
+        self.pc = 0
+        self.stack = []
+        self.slots = [None] * code.slot_count
+        self.blocks = []
+        self.context = context
+        self.tail_calls = 0
+
+
+class BytecodeFunction(Function):
+    """A function defined by bytecode, run by the VM of its caller."""
+
+    def __init__(self, code):
+        super().__init__(code.name, None, code.arg_names, code.should_auto_return)
+        self.code = code
+
+    def enter(self, args, context=None, pos_start=None, pos_end=None):
+        """The frame running a call of the function."""
+        exec_ctx, error = self.prepare_call(args, context, pos_start, pos_end)
+        if error:
+            raise RuntimeFailure(error)
+        return Frame(self.code, exec_ctx)
+
+    def enter_tail(self, args, caller, pos_start, pos_end, shared_names):
+        """The frame of a tail call, which replaces the frame caller.
+
+        The symbol table of the caller is skipped when it binds none of
+        shared_names, no function reads them from the calls below it.
+        """
+        context = caller.context
+        frame = self.enter(args, context, pos_start, pos_end)
+        table = context.symbol_table
+        if (
+            shared_names is not None
+            and shared_names.isdisjoint(table.symbols)
+            and shared_names.isdisjoint(table.constants)
+        ):
+            frame.context.symbol_table.parent = table.parent
+            # Only kept for tracebacks now
+            context.symbol_table = table.parent
+
+        frame.tail_calls = caller.tail_calls + 1
+        if frame.tail_calls > KEPT_TAIL_CALLS:
+            # The traceback goes on from where the caller was called
+            frame.context.parent = context.parent
+            frame.context.parent_entry_pos = context.parent_entry_pos
+        return frame
+
+    def execute(self, args, context=None, pos_start=None, pos_end=None):
+        res = RTResult()
+        try:
+            value = run_frame(self.enter(args, context, pos_start, pos_end))
+        except RuntimeFailure as e:
+            return res.failure(e.error)
+        return res.success(value or Number.null)
+
+    def copy(self):
+        copy = BytecodeFunction(self.code)
+        copy.set_context(self.context)
+        copy.set_position(self.pos_start, self.pos_end)
+        return copy
+
+
+def run_frame(frame):
+    """Runs a frame and the frames of its calls.
+
+    Returns the value of the frame, None after entrega, rompe or sigue at
+    the top of the program. Runtime errors raise RuntimeFailure.
+    """
+    # The frames of the callers
+    frames = []
+    code = frame.code
+    ops = code.code
+    positions = code.positions
+    constants = code.constants
+    literals = code.literals
+    names = code.names
+    stack = frame.stack
+    push = stack.append
+    pop = stack.pop
+    context = frame.context
+    pc = 0
+    # The table of the program, at the bottom of every context
+    global_table = context.symbol_table
+    while global_table.parent:
+        global_table = global_table.parent
+    # What the functions resolved against it bind and read, see resolver
+    function_names = FUNCTION_NAMES.get(global_table, ())
+    shared_names = SHARED_NAMES.get(global_table)
+
+    while True:
+        op = ops[pc]
+        arg = ops[pc + 1]
+        at = pc
+        pc += 2
+
+        if op == LOAD_NAME:
+            name = names[arg]
+            value = context.symbol_table.get(name)
+            if not value:
+                raise RuntimeFailure(
+                    EjecucionError(
+                        positions[at],
+                        positions[at + 1],
+                        f"'{name}' no es definido",
+                        context,
+                    )
+                )
+            push(value)
+
+        elif op == LOAD_GLOBAL:
+            name = names[arg]
+            if name in function_names:
+                # Bound by a function of a program run since
+                value = context.symbol_table.get(name)
+            else:
+                value = global_table.get(name)
+            if not value:
+                raise RuntimeFailure(
+                    EjecucionError(
+                        positions[at],
+                        positions[at + 1],
+                        f"'{name}' no es definido",
+                        context,
+                    )
+                )
+            push(value)
+
+        elif op == LOAD_NUMBER:
+            push(literals[arg])
+
+        elif op == BINARY_OP:
+            right = pop()
+            result, error = BINARY_HANDLERS[arg](stack[-1], right)
+            if error:
+                left_span, right_span = code.operand_positions[at]
+                raise RuntimeFailure(
+                    operation_error(
+                        stack[-1],
+                        right,
+                        BINARY_METHODS[arg],
+                        context,
+                        left_span,
+                        right_span,
+                    )
+                )
+            stack[-1] = result
+
+        elif op == SHORT_CIRCUIT_Y or op == SHORT_CIRCUIT_O:
+            result = short_circuit(TT_Y if op == SHORT_CIRCUIT_Y else TT_O, stack[-1])
+            if result is not None:
+                stack[-1] = result
+                pc = arg
+
+        elif op == POP_JUMP_IF_FALSE:
+            if not pop().is_true():
+                pc = arg
+
+        elif op == JUMP:
+            pc = arg
+
+        elif op == STORE_NAME:
+            context.symbol_table.set(names[arg], stack[-1])
+
+        elif op == POP_TOP:
+            pop()
+
+        elif op == FOR_ITER:
+            _, end, slot, name = code.loops[arg]
+            slots = frame.slots
+            i = next(slots[slot], None)
+            if i is None:
+                pc = end
+            else:
+                slots[slot + 1] = i
+                if slots[slot + 2]:
+                    context.symbol_table.set(names[name], make_number(i))
+                    # Past the first step a quiet loop sets it on leaving
+                    slots[slot + 2] = not slots[slot + 3]
+
+        elif op == APPEND_ELEMENT:
+            value = pop()
+            stack[-1].append(value)
+
+        elif op == CALL or op == TAIL_CALL:
+            if arg:
+                args = stack[-arg:]
+                del stack[-arg:]
+            else:
+                args = []
+            value_to_call = pop()
+
+            if value_to_call.__class__ is BytecodeFunction:
+                if op == TAIL_CALL:
+                    # Returns where the frame making the call would have
+                    frame = value_to_call.enter_tail(
+                        args,
+                        frame,
+                        positions[at],
+                        positions[at + 1],
+                        shared_names,
+                    )
+                else:
+                    if len(frames) >= MAX_FRAMES:
+                        raise RuntimeFailure(
+                            EjecucionError(
+                                positions[at],
+                                positions[at + 1],
+                                "Demasiadas llamadas anidadas",
+                                context,
+                            )
+                        )
+                    frame.pc = pc
+                    frames.append(frame)
+                    frame = value_to_call.enter(
+                        args, context, positions[at], positions[at + 1]
+                    )
+                code = frame.code
+                ops = code.code
+                positions = code.positions
+                constants = code.constants
+                literals = code.literals
+                names = code.names
+                stack = frame.stack
+                push = stack.append
+                pop = stack.pop
+                context = frame.context
+                pc = 0
+            else:
+                if isinstance(value_to_call, BaseFunction):
+                    res = value_to_call.execute(
+                        args, context, positions[at], positions[at + 1]
+                    )
+                else:
+                    value_to_call = value_to_call.copy().with_meta(
+                        context, positions[at], positions[at + 1]
+                    )
+                    res = value_to_call.execute(args)
+                if res.error:
+                    raise RuntimeFailure(res.error)
+                push(res.value)
+
+        elif op == RETURN_VALUE or op == END_FUNCTION:
+            value = pop()
+            if op == END_FUNCTION and not code.should_auto_return:
+                value = Number.null
+            if not frames:
+                # entrega in the program itself ends it without a value
+                return value if code.is_function else None
+
+            frame = frames.pop()
+            code = frame.code
+            ops = code.code
+            positions = code.positions
+            constants = code.constants
+            literals = code.literals
+            names = code.names
+            stack = frame.stack
+            push = stack.append
+            pop = stack.pop
+            context = frame.context
+            pc = frame.pc
+            push(value)
+
+        elif op == LOAD_STRING:
+            push(literals[arg])
+
+        elif op == LOAD_NULL:
+            push(Number.null)
+
+        elif op == LOAD_CONST:
+            push(constants[arg])
+
+        elif op == UNARY_NEGATIVE:
+            number, error = stack[-1].multed_by(make_number(-1))
+            if error:
+                (span,) = code.operand_positions[at]
+                raise RuntimeFailure(unary_error(stack[-1], TT_MINUS, context, span))
+            stack[-1] = number
+
+        elif op == UNARY_NOT:
+            number, error = stack[-1].notted()
+            if error:
+                (span,) = code.operand_positions[at]
+                raise RuntimeFailure(unary_error(stack[-1], TT_JAMAS, context, span))
+            stack[-1] = number
+
+        elif op == BUILD_LIST:
+            if arg:
+                elements = stack[-arg:]
+                del stack[-arg:]
+            else:
+                elements = []
+            push(List(elements).with_meta(context, positions[at], positions[at + 1]))
+
+        elif op == SETUP_LOOP:
+            cont, end, _, _ = code.loops[arg]
+            push([])
+            frame.blocks.append((cont, end, len(stack)))
+
+        elif op == FOR_PREPARE:
+            cont, end, slot, name = code.loops[arg]
+            step_value = pop()
+            end_value = pop()
+            start_value = pop()
+            slots = frame.slots
+            slots[slot] = iter(
+                loop_steps(start_value.value, end_value.value, step_value.value)
+            )
+            slots[slot + 1] = None
+            slots[slot + 2] = True
+            slots[slot + 3] = (
+                ops[end] == STORE_COUNTER
+                and shared_names is not None
+                and names[name] not in shared_names
+            )
+            push([])
+            frame.blocks.append((cont, end, len(stack)))
+
+        elif op == STORE_COUNTER:
+            _, _, slot, name = code.loops[arg]
+            slots = frame.slots
+            if slots[slot + 3] and slots[slot + 1] is not None:
+                context.symbol_table.set(names[name], make_number(slots[slot + 1]))
+
+        elif op == FINISH_LOOP:
+            frame.blocks.pop()
+            if arg:
+                # The list stayed empty, the value of the loop is not used
+                stack[-1] = Number.null
+            else:
+                stack[-1] = List(stack[-1]).with_meta(
+                    context, positions[at], positions[at + 1]
+                )
+
+        elif op == BREAK or op == CONTINUE:
+            # Outside of a loop they leave the function, into the loop of
+            # the caller
+            while not frame.blocks:
+                if not frames:
+                    return None
+                frame = frames.pop()
+            code = frame.code
+            ops = code.code
+            positions = code.positions
+            constants = code.constants
+            literals = code.literals
+            names = code.names
+            stack = frame.stack
+            push = stack.append
+            pop = stack.pop
+            context = frame.context
+
+            cont, end, depth = frame.blocks[-1]
+            del stack[depth:]
+            pc = end if op == BREAK else cont
+
+        elif op == MAKE_FUNCTION:
+            push(
+                BytecodeFunction(constants[arg]).with_meta(
+                    context, positions[at], positions[at + 1]
+                )
+            )
+
+        elif op == LOAD_CONST_NAME:
+            name = names[arg]
+            value = context.symbol_table.get(name)
+            if not value:
+                raise RuntimeFailure(
+                    EjecucionError(
+                        positions[at],
+                        positions[at + 1],
+                        f"'{name}' no es definido",
+                        context,
+                    )
+                )
+            push(value)
+
+        elif op == STORE_CONST:
+            try:
+                context.symbol_table.set_const(names[arg], stack[-1])
+            except Exception as e:
+                raise RuntimeFailure(
+                    EjecucionError(positions[at], positions[at + 1], str(e), context)
+                )
+
+        elif op == UNKNOWN_OPERATOR:
+            raise RuntimeFailure(
+                EjecucionError(
+                    positions[at], positions[at + 1], constants[arg], context
+                )
+            )
+
+        elif op == HALT:
+            return pop()
+
+        else:
+            raise Exception(f"Unknown opcode {op}")
+
+
+def execute(ast, context, resolution):
+    """Compiles and runs a resolved AST, returns its value and error."""
+    code = compile_program(ast, resolution=resolution)
+    try:
+        return run_frame(Frame(code, context)), None
+    except RuntimeFailure as e:
+        return None, e.error
@@ -0,0 +1,181 @@
+# tests/test_cache.py
+
+import os
+import threading
+
+import pytest
+
+from mariachi import cache
+from mariachi.lexer import Lexer
+from mariachi.mariachi import parse_lexer, run_path
+from mariachi.token import Token
+
+SCRIPT = """\
+define doble(n) { entrega n * 2 }
+fija K = "hola"
+sea total = 0
+para i = 1 hasta 4 paso 1 { sea total = total + doble(i) }
+si total > 10 y jamas 0 { canta(total) } quizas total < 0 { rompe } sino { sigue }
+mientras total > 5 { sea total = total - -1 ** 2 }
+[total, K, 2.5, define (x) { x }()]
+"""
+
+
+def dump(node):
+    if isinstance(node, (list, tuple)):
+        return [dump(item) for item in node]
+    if isinstance(node, Token):
+        return (node.type, node.value, node.pos_start, node.pos_end)
+    if hasattr(node, "__slots__"):
+        return (
+            type(node).__name__,
+            {
+                key: dump(getattr(node, key))
+                for key in node.__slots__
+                if key != "source"
+            },
+        )
+    return node
+
+
+@pytest.fixture
+def script(tmp_path):
+    path = tmp_path / "script.mar"
+    path.write_text(SCRIPT)
+    return path
+
+
+def counting_parse():
+    calls = []
+
+    def parse(path):
+        calls.append(path)
+        lexer = Lexer.from_file(path)
+        node, error = parse_lexer(lexer)
+        return node, lexer.source, error
+
+    return parse, calls
+
+
+def test_encode_round_trip():
+    lexer = Lexer("<test>", SCRIPT)
+    node, error = parse_lexer(lexer)
+    assert error is None
+    base = lexer.source.base
+    code = cache.encode(node, base)
+    assert dump(cache.decode(code, base, lexer.source)) == dump(node)
+    # Decoding for another source moves every position along with it
+    moved = cache.decode(code, base + 100, lexer.source)
+    assert moved.pos_start == node.pos_start + 100
+    assert moved.element_nodes[0].var_name_tok.pos_end == (
+        node.element_nodes[0].var_name_tok.pos_end + 100
+    )
+
+
+def test_cached_ast_is_reused(script):
+    parse, calls = counting_parse()
+    node, _, error = cache.parse_file(script, parse)
+    assert error is None and len(calls) == 1
+    assert os.path.exists(cache.CacheEntry(script).cache_path)
+
+    cached, source, error = cache.parse_file(script, parse)
+    assert error is None and len(calls) == 1
+    assert source.path == os.fspath(script)
+    assert len(cached.element_nodes) == len(node.element_nodes)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="needs POSIX file modes")
+def test_entries_are_as_readable_as_their_script(script):
+    os.chmod(script, 0o644)
+    cache.parse_file(script, counting_parse()[0])
+    entry = cache.CacheEntry(script)
+    assert os.stat(entry.cache_path).st_mode & 0o777 == 0o644
+
+    os.chmod(script, 0o400)
+    os.utime(script, ns=(0, 10**9))
+    cache.parse_file(script, counting_parse()[0])
+    assert os.stat(entry.cache_path).st_mode & 0o777 == 0o600
+
+
+def test_touched_script_is_not_parsed_again(script):
+    parse, calls = counting_parse()
+    cache.parse_file(script, parse)
+    stat = os.stat(script)
+    os.utime(script, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    cache.parse_file(script, parse)
+    assert len(calls) == 1
+    # The entry was refreshed, so the script does not need to be hashed
+    entry = cache.CacheEntry(script)
+    cache.load(entry)
+    assert entry._digest is None and not entry.touched
+
+
+def test_changed_script_is_parsed_again(script):
+    parse, calls = counting_parse()
+    cache.parse_file(script, parse)
+    script.write_text(SCRIPT + "sea extra = 1\n")
+
+    node, _, _ = cache.parse_file(script, parse)
+    assert len(calls) == 2
+    assert node.element_nodes[-1].var_name_tok.value == "extra"
+
+
+@pytest.mark.parametrize(
+    "data", [b"", b"MARC", b"MARC\x05\x00\x00\x00junk", b"garbage"]
+)
+def test_broken_entries_are_ignored(script, data):
+    parse, calls = counting_parse()
+    entry = cache.CacheEntry(script)
+    os.makedirs(os.path.dirname(entry.cache_path))
+    with open(entry.cache_path, "wb") as file:
+        file.write(data)
+
+    node, _, error = cache.parse_file(script, parse)
+    assert error is None and len(calls) == 1
+    assert cache.load(cache.CacheEntry(script))[0] is not None
+
+
+def test_syntax_errors_are_not_cached(tmp_path):
+    path = tmp_path / "bad.mar"
+    path.write_text("sea = 1")
+    parse, calls = counting_parse()
+    for _ in range(2):
+        _, _, error = cache.parse_file(path, parse)
+        assert error is not None
+    assert len(calls) == 2
+
+
+def test_errors_of_cached_scripts(tmp_path):
+    path = tmp_path / "error.mar"
+    path.write_text("sea x = 1\ndefine f() { entrega 1 / 0 }\nf()")
+    first = run_path(path)[1].as_string()
+    assert os.path.exists(cache.CacheEntry(path).cache_path)
+    assert run_path(path)[1].as_string() == first
+    assert "linea 2" in first
+
+
+def test_concurrent_writers(script):
+    parse, _ = counting_parse()
+    node, source, _ = cache.parse_file(script, parse)
+    entry = cache.CacheEntry(script)
+    entry.digest
+    stop = threading.Event()
+
+    def write():
+        while not stop.is_set():
+            cache.store(entry, node, source)
+
+    writers = [threading.Thread(target=write) for _ in range(2)]
+    for writer in writers:
+        writer.start()
+    try:
+        for _ in range(50):
+            assert cache.load(cache.CacheEntry(script))[0] is not None
+    finally:
+        stop.set()
+        for writer in writers:
+            writer.join()
+    assert [name for name in os.listdir(os.path.dirname(entry.cache_path))] == [
+        os.path.basename(entry.cache_path)
+    ]
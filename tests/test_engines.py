@@ -0,0 +1,258 @@
+# tests/test_engines.py
+
+import contextlib
+import functools
+import gc
+import inspect
+import io
+
+import pytest
+
+from mariachi import vm
+from mariachi.context import Context
+from mariachi.interpreter import BuiltInFunction, RTResult, String
+from mariachi.errors import EjecucionError
+from mariachi.mariachi import ENGINES, SymbolTable, global_symbol_table, run
+
+import test_core
+
+# The engines checked against the tree walking Interpreter
+OTHER_ENGINES = [engine for engine in ENGINES if engine != "tree"]
+
+CORE_TESTS = [
+    name
+    for name, function in vars(test_core).items()
+    if name.startswith("test_") and inspect.isfunction(function)
+]
+
+PROGRAMS = [
+    "1 + 2 * 3 - 4 / 2 ** 2 % 3 // 1",
+    "2 == 2\n2 != 2\n1 < 2\n2 <= 1\n3 > 2\n3 >= 4\n1 y 0\n0 o 1\njamas 2",
+    "-3\n+3\n-(2 - 5)\njamas jamas 1",
+    '"a" + "b"\n"ab" * 3\n"x" + 1',
+    "[1, 2] + 3\n[1, 2] * [3]\n[1, 2, 3] - 0\n[4, 5] / 1\n[4, 5] / 7",
+    "sea a = 1\nsea b = a + 1\n[a, b]",
+    "fija C = 2\nC * 3\nsea C = 1",
+    "fija D = 1\nfija D = 2",
+    "noexiste + 1",
+    "1 / 0",
+    "5 % 0",
+    "5 // 0",
+    '2 - "a"',
+    'jamas "a"',
+    "si 0 { 1 } quizas 0 { 2 }\nsi 0 { 1 } quizas 1 { 2 } sino { 3 }\nsi 1 { }",
+    "define g(m) { entrega m }\ndefine f(m) { si m == 1 { entrega 1 } "
+    "quizas g(m) == 2 { entrega 2 } quizas g(m) == 3 { entrega 3 } "
+    "sino { entrega 4 } }\n[f(1), f(2), f(3), f(4)]",
+    "para i = 0 hasta 5 { i * 2 }\npara i = 5 hasta 0 paso -2 { i }",
+    "para i = 0 hasta 6 { si i == 2 { sigue } si i == 4 { rompe } i }",
+    "sea n = 0\nmientras n < 10 { sea n = n + 1\nsi n % 2 { sigue }\nsi n > 7 { rompe }\nn }",
+    "define f(x) { entrega x * 2 }\nf(4)\nf(f(1))",
+    "define g() { 5 }\ng()",
+    "define h(a, b, c) { entrega a + b + c }\nh(1, 2, 3)\nh(1, 2)",
+    "define k() { entrega }\nk()",
+    "define (x) { entrega x + 1 }(1)",
+    "define l(n) { para i = 0 hasta 10 { si i == n { entrega i * 10 } } }\nl(3)",
+    "define m() { rompe }\npara i = 0 hasta 3 { m()\ni }",
+    "define e(x) { entrega 1 / x }\ndefine d(x) { entrega e(x) }\nd(0)",
+    "define fib(n) { si n < 2 { entrega n } sino { entrega fib(n - 1) + fib(n - 2) } }\nfib(10)",
+    "define outer() { sea hidden = 5\nentrega inner() }\ndefine inner() { entrega hidden }\nouter()",
+    "sea l = [1, 2]\npon(l, 3)\nroba(l, 0)\nextiende(l, [9])\nl\nroba(l, 10)\npon(1, 2)",
+    'canta("hola")\neco(3)\nes_num(1)\nes_texto("a")\nes_lista([])\nes_funcion(canta)',
+    "eco(1, 2)",
+    "3(1)",
+    "entrega 5\n6",
+    "rompe\n1",
+    "sea total = 0\npara i = 0 hasta 3 { sea total = total + i }\ntotal",
+    "define f(x) { canta(x)\nentrega x }\nf(1) + f(2) * f(3)\n[f(4), si 1 { f(5) }, f(6)]",
+    "define p(a, b) { entrega a / b }\np(4, 2)\np(1, 0)",
+    'sea s = "a"\ndefine q() { entrega jamas s }\nq()',
+    "define r(a) { a }\nsea alias = r\nalias(1)\nalias(1, 2)",
+    "sea n = 3\nn(1)",
+    "si 0 { noexiste }",
+    "define f() { fija C = 1\nsea C = 2 }\nf()",
+    "define f() { fija C = 1\nfija C = 2 }\nf()",
+    "define g(a, a) { a }\ng(1, 2)",
+    "define h() { sea y = x\nsea x = 2\n[x, y] }\nsea x = 1\nh()\nx",
+    "define outer(n) { inner() }\ndefine inner() { n }\nouter(3)",
+    "define r(n) { si n == 0 { entrega 0 }\npara i = 0 hasta 2 { sea n = n - 1 }\nr(n) }\nr(4)",
+    "define cae(n) { si n == 0 { entrega 1 / n } sino { entrega cae(n - 1) } }\ncae(3)",
+    "define lee() { entrega x }\ndefine usa(x) { entrega lee() }\nusa(7)",
+    "define a() { sea y = 5\nentrega b() }\ndefine b() { sea z = y\nentrega z }\na()",
+    "define sale() { rompe }\ndefine va() { entrega sale() }\n"
+    "para i = 0 hasta 3 { va()\ni }",
+    "define v(n) { mientras 1 { entrega w(n) } }\ndefine w(n) { rompe }\nv(1)",
+    "define ar(a) { entrega a }\ndefine t() { entrega ar(1, 2) }\nt()",
+    "define f() { sea n = 0\nmientras n < 3 { sea n = n + 1\nsi n == 2 { sigue } }\n"
+    "para i = 0 hasta 5 { si i == 3 { rompe } }\nmientras 0 { 0 }\npara i = 0 hasta 2 { i }\n"
+    "entrega n }\nf()",
+    "define c() { sea s = 0\npara i = 0 hasta 1 paso 0.25 { sea s = s + 1 }\n"
+    "para i = 3 hasta 0 paso -1 { para j = 0 hasta i { sea s = s + 1 } }\n"
+    "para i = 0 hasta 0 { sea s = 100 }\nentrega s }\nc()",
+    "define b() { sea n = 0\npara i = 0 hasta 10 { si n == 4 { rompe }\n"
+    "sea n = n + 1 }\nentrega n }\nb()",
+    "define costoso(v) { canta(v)\nentrega v }\n"
+    "[0 y costoso(1), 1 y costoso(2), 0 o costoso(3), 2.5 o costoso(4), "
+    "0.0 y costoso(5), 1.5 y costoso(0.5), 0 o costoso(0) o costoso(6)]",
+    'define costoso(v) { canta(v)\nentrega v }\n"a" y costoso(1)',
+    "define costoso(v) { canta(v)\nentrega v }\n0 o costoso([1])",
+    "sea p = pon\np([1])",
+    "canta(1, 2)",
+    "define f() { roba([1], 5) }\nf()",
+    "sea l = [1]\npon(l, 2)\nextiende(l, [3])\n"
+    "[roba(l, 0), eco(l), es_lista(l), es_num(l), es_texto(eco(1)), es_funcion(pon)]",
+]
+
+
+# The global names before any test defined its own
+BUILTIN_SYMBOLS = dict(global_symbol_table.symbols)
+BUILTIN_CONSTANTS = dict(global_symbol_table.constants)
+
+
+@contextlib.contextmanager
+def isolated_globals():
+    """Runs with only the builtins defined, then restores the globals."""
+    symbols = global_symbol_table.symbols
+    constants = global_symbol_table.constants
+    global_symbol_table.symbols = dict(BUILTIN_SYMBOLS)
+    global_symbol_table.constants = dict(BUILTIN_CONSTANTS)
+    try:
+        yield
+    finally:
+        global_symbol_table.symbols = symbols
+        global_symbol_table.constants = constants
+
+
+def outcome(code, engine):
+    """What running code prints and returns, as text."""
+    output = io.StringIO()
+    with isolated_globals(), contextlib.redirect_stdout(output):
+        try:
+            value, error = run("<test>", code, engine=engine)
+        except Exception as e:
+            # Some mistakes still crash the interpreter itself
+            return type(e).__name__, str(e), output.getvalue()
+    return (
+        repr(value),
+        error.as_string() if error else None,
+        output.getvalue(),
+    )
+
+
+@pytest.mark.parametrize("engine", OTHER_ENGINES)
+@pytest.mark.parametrize("code", PROGRAMS)
+def test_same_outcome_as_the_interpreter(engine, code):
+    assert outcome(code, engine) == outcome(code, "tree")
+
+
+@pytest.mark.parametrize("engine", OTHER_ENGINES)
+@pytest.mark.parametrize("name", CORE_TESTS)
+def test_core_suite(engine, name, monkeypatch):
+    monkeypatch.setattr(test_core, "run", functools.partial(run, engine=engine))
+    test = getattr(test_core, name)
+    with isolated_globals():
+        if inspect.signature(test).parameters:
+            test(SymbolTable())
+        else:
+            test()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_too_deep_recursion_is_an_error_of_the_program(engine, monkeypatch):
+    monkeypatch.setattr(vm, "MAX_FRAMES", 1000)
+    code = "define s(n) { si n == 0 { entrega 0 }\nentrega 1 + s(n - 1) }\ns(5000)"
+    value, error = run("<test>", code, engine=engine)
+    assert value is None
+    assert error.details.startswith("Demasiadas llamadas anidadas")
+    # The error points at the innermost call rather than the program
+    start, _ = error.resolve()
+    assert (start.ln, start.col) == (1, 12)
+    assert error.context.display_name == "s"
+    if engine != "vm":
+        assert "--engine vm" in error.details
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_functions_keep_their_source_for_later_errors(engine):
+    with isolated_globals():
+        value, error = run("repl", "sea d = 0\n\ndefine f(n) { n / d }", engine=engine)
+        assert error is None
+        del value
+        gc.collect()
+        value, error = run("repl", "f(9)", engine=engine)
+        message = error.as_string()
+    assert " Archivo repl, linea 3, en f\n" in message
+    # The arrows still point into the body of f
+    assert message.endswith(
+        "define f(n) { n / d }\x1b[0m\n" + " " * 18 + "\x1b[93m^\x1b[0m"
+    )
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_y_and_o_only_evaluate_the_right_operand_when_needed(engine):
+    code = """\
+define costoso(v) { canta("costoso")
+entrega v }
+sea x = 0
+[0 y costoso(1), 3 o costoso(1), x != 0 y 10 / x > 1, 1 y costoso(7), 0 o costoso(8)]"""
+    output = io.StringIO()
+    with isolated_globals(), contextlib.redirect_stdout(output):
+        value, error = run("<test>", code, engine=engine)
+    assert error is None
+    assert [n.value for n in value.elements[-1].elements] == [0, 3, 0, 7, 8]
+    # Only the last two need their right operand
+    assert output.getvalue().count("costoso") == 2
+
+
+class Saludo(BuiltInFunction):
+    """A builtin of the old protocol, its arguments in a symbol table."""
+
+    def execute_saluda(self, exec_ctx):
+        name = exec_ctx.symbol_table.get("nombre")
+        if not isinstance(name, String):
+            return RTResult().failure(
+                EjecucionError(self.pos_start, self.pos_end, "Sin nombre", exec_ctx)
+            )
+        return RTResult().success(String(f"hola {name.value}"))
+
+    execute_saluda.arg_names = ["nombre"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_builtins_of_execute_methods(engine):
+    with isolated_globals():
+        global_symbol_table.set("saluda", Saludo("saluda"))
+        value, error = run("<test>", 'saluda("mundo")', engine=engine)
+        assert error is None
+        assert value.elements[0].value == "hola mundo"
+        value, error = run("<test>", "saluda(1)", engine=engine)
+        assert error.details == "Sin nombre"
+        assert error.context.display_name == "saluda"
+        value, error = run("<test>", "saluda()", engine=engine)
+        assert error.details.startswith("arity error")
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_builtins_are_called_without_a_context(engine, monkeypatch):
+    made = []
+    init = Context.__init__
+
+    def counting_init(self, *args, **kwargs):
+        made.append(self)
+        init(self, *args, **kwargs)
+
+    monkeypatch.setattr(Context, "__init__", counting_init)
+    counts = []
+    for steps in (1, 50):
+        code = f"sea l = []\npara i = 0 hasta {steps} {{ pon(l, eco(i)) }}\nroba(l, 0)"
+        with isolated_globals():
+            value, error = run("<test>", code, engine=engine)
+        assert error is None
+        counts.append(len(made))
+        made.clear()
+    assert counts[0] == counts[1]
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        run("<test>", "1", engine="nope")
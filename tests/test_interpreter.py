@@ -0,0 +1,231 @@
+# tests/test_interpreter.py
+
+import pytest
+
+from mariachi.interpreter import (
+    BINARY_OPERATIONS,
+    OPERATOR_METHODS,
+    BuiltInFunction,
+    Interpreter,
+    List,
+    Number,
+    String,
+    SymbolTable,
+    loop_steps,
+    make_number,
+)
+from mariachi.context import Context
+from mariachi.lexer import Lexer
+from mariachi.mariachi import ENGINES, interpret, parse_lexer
+from mariachi.nodes import NumberNode
+from mariachi.results import RTResult
+
+
+def parse(code):
+    ast, error = parse_lexer(Lexer("<test>", code))
+    assert error is None
+    return ast
+
+
+def test_visit_methods_are_looked_up_once():
+    interpret(parse("1 + 2"))
+    assert Interpreter.visit_methods[NumberNode] is Interpreter.visit_NumberNode
+
+
+def test_unknown_nodes():
+    with pytest.raises(Exception, match="No visit_object method defined"):
+        Interpreter().visit(object(), None)
+
+
+def test_subclasses_override_visit_methods():
+    class Doubling(Interpreter):
+        def visit_NumberNode(self, node, context):
+            result = super().visit_NumberNode(node, context)
+            result.value = Number(result.value.value * 2)
+            return result
+
+    ast = parse("1 + 2")
+    assert interpret(ast)[0].elements[0] == Number(3)
+    assert Doubling.visit_methods is not Interpreter.visit_methods
+    node = ast.element_nodes[0]
+    assert Doubling().visit(node, None).value == Number(6)
+
+
+def test_unwinding_interpreter_allocates_no_results(monkeypatch):
+    created = []
+    init = RTResult.__init__
+
+    def counting_init(self):
+        created.append(self)
+        init(self)
+
+    monkeypatch.setattr(RTResult, "__init__", counting_init)
+    ast = parse("sea n = 0\nmientras n < 50 { si n == 60 { rompe }\nsea n = n + 1 }")
+    value, error = interpret(ast, "unwind")
+    assert error is None
+    assert value.elements[-1].elements[-1] == Number(50)
+    assert created == []
+
+    interpret(ast)
+    assert len(created) > 50
+
+
+@pytest.mark.parametrize("engine", [e for e in ENGINES if e != "native"])
+def test_variable_reads_share_the_stored_value(engine):
+    value, error = interpret(
+        parse("sea x = [1]\nx\ndefine f(a) { entrega a }\nf(x)"), engine
+    )
+    assert error is None
+    stored, read, _, returned = value.elements
+    assert read is stored
+    assert returned is stored
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_calls_print_nothing(engine, capsys):
+    code = "define fib(n) { si n < 2 { entrega n } sino { entrega fib(n - 1) + fib(n - 2) } }\nfib(5)"
+    value, error = interpret(parse(code), engine)
+    assert value.elements[-1] == Number(5)
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.parametrize("engine", [e for e in ENGINES if e != "native"])
+def test_literals_and_comparisons_allocate_nothing(engine):
+    code = "para i = 0 hasta 3 { 1000 }\n[1 < 2, 2 < 1, jamas 0, 300 + 1 == 301, 2 + 3]"
+    value, error = interpret(parse(code), engine)
+    assert error is None
+    first, second, third = value.elements[0].elements
+    assert first is second is third
+    true, false, notted, equal, small = value.elements[1].elements
+    assert true is Number.true and equal is Number.true and notted is Number.true
+    assert false is Number.false
+    assert small is make_number(5)
+
+
+def test_calls_share_one_interpreter(monkeypatch):
+    created = []
+    original_init = Interpreter.__init__
+
+    def counting_init(self, *args, **kwargs):
+        created.append(self)
+        original_init(self, *args, **kwargs)
+
+    monkeypatch.setattr(Interpreter, "__init__", counting_init)
+    code = "define fib(n) { si n < 2 { entrega n } sino { entrega fib(n - 1) + fib(n - 2) } }\nfib(8)"
+    value, error = interpret(parse(code))
+    assert error is None
+    assert value.elements[-1] == Number(21)
+    assert len(created) == 1
+
+
+@pytest.mark.parametrize("engine", ["tree", "unwind", "native", "closure"])
+def test_call_frames_keep_their_callers(engine):
+    code = "define e(x) { entrega 1 / x }\ndefine d(x) { entrega e(x) }\nd(0)"
+    value, error = interpret(parse(code), engine)
+    names = []
+    context = error.context
+    while context:
+        names.append(context.display_name)
+        context = context.parent
+    assert names == ["e", "d", "<programma>"]
+    entry = error.source.position(error.context.parent_entry_pos)
+    assert entry.idx == code.index("e(x) }\nd(0)")
+
+
+@pytest.mark.parametrize("engine", ["tree", "unwind", "native", "closure"])
+def test_arity_errors_point_at_the_call(engine):
+    code = "define f(a) { entrega a }\nsea x = 1\nf(1, 2)"
+    value, error = interpret(parse(code), engine)
+    assert "arity error" in error.details
+    assert error.source.position(error.pos_start).idx == code.index("f(1, 2)")
+    assert error.context.display_name == "<programma>"
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_loops_used_as_statements_build_no_list(engine, monkeypatch):
+    sizes = []
+    init = List.__init__
+
+    def counting_init(self, elements):
+        sizes.append(len(elements))
+        init(self, elements)
+
+    monkeypatch.setattr(List, "__init__", counting_init)
+    code = """\
+define f() { sea t = 0
+para i = 0 hasta 100 { sea t = t + i }
+mientras t > 0 { sea t = t - 1000 }
+entrega t }
+f()
+define g() { para i = 0 hasta 3 { i } }
+g()
+define h() { entrega para i = 0 hasta 3 { si i { i * 2 } sino { mientras 0 { 1 } } } }
+h()
+"""
+    value, error = interpret(parse(code), engine)
+    assert error is None
+    assert value.elements[1] == Number(-50)
+    assert value.elements[3] == Number.null
+    doubled = value.elements[5].elements
+    assert doubled[0].elements == []
+    assert [element.value for element in doubled[1:]] == [2, 4]
+    # The para loop of h and the value of the program, the lists of f and g
+    # would hold 100, 5 and 3 values
+    assert sorted(size for size in sizes if size) == [3, 6]
+
+
+def test_integer_para_loops_count_with_a_range():
+    assert loop_steps(0, 5, 2) == range(0, 5, 2)
+    assert loop_steps(5, 0, -2) == range(5, 0, -2)
+    assert list(loop_steps(0, 1, 0.25)) == [0, 0.25, 0.5, 0.75]
+    assert list(loop_steps(1.5, 0, -1)) == [1.5, 0.5]
+    # paso 0 never ends, as it did before
+    steps = loop_steps(0, 1, 0)
+    assert not isinstance(steps, range)
+    assert [next(steps) for _ in range(3)] == [0, 0, 0]
+
+
+def test_binary_operations_give_what_the_methods_give():
+    numbers = [make_number(0), make_number(3), Number(2.5), Number(7)]
+    pairs = [(left, right) for left in numbers for right in numbers]
+    # Anything else goes to the methods
+    others = [(String("a"), String("b")), (Number(1), String("b"))]
+    for op_type, method in OPERATOR_METHODS.items():
+        operation = BINARY_OPERATIONS[op_type]
+        for left, right in pairs + (others if method == "added_to" else []):
+            result, error = operation(left, right)
+            expected, expected_error = getattr(left, method)(right)
+            if expected_error:
+                assert type(error) is type(expected_error)
+                assert error.details == expected_error.details
+            else:
+                assert error is None
+                assert type(result) is type(expected)
+                assert type(result.value) is type(expected.value)
+                assert result.value == expected.value
+
+
+def test_binary_nodes_keep_their_operation():
+    ast = parse("1 + 2\n3 < 4")
+    plus, less = ast.element_nodes
+    assert plus.operation is BINARY_OPERATIONS[plus.op_tok.type]
+    assert less.operation is BINARY_OPERATIONS[less.op_tok.type]
+
+
+def test_builtins_keep_their_execute_methods():
+    exec_ctx = Context("pon")
+    exec_ctx.symbol_table = SymbolTable()
+    items = List([])
+    exec_ctx.symbol_table.set("list", items)
+    exec_ctx.symbol_table.set("value", Number(7))
+    pon = BuiltInFunction.pon.copy().set_position(3, 5)
+    assert BuiltInFunction.execute_pon.arg_names == ["list", "value"]
+
+    result = pon.execute_pon(exec_ctx)
+    assert result.error is None and result.value is Number.null
+    assert [item.value for item in items.elements] == [7]
+
+    exec_ctx.symbol_table.set("list", Number(1))
+    error = pon.execute_pon(exec_ctx).error
+    assert error.details == "First argument must be list"
+    assert (error.pos_start, error.pos_end, error.context) == (3, 5, exec_ctx)
@@ -0,0 +1,126 @@
+# tests/test_lexer.py
+
+import gc
+
+from mariachi.lexer import Lexer
+from mariachi.token import TOKEN_NAMES, TT_KEYWORD, TT_PLUS, TT_SEA, TT_Y, Token
+from mariachi.errors import InesperadoError, CaracterEsperadoError
+from mariachi.source import SOURCES
+
+
+def lex(code):
+    tokens, error = Lexer("<test>", code).make_tokens()
+    assert error is None
+    return [(TOKEN_NAMES[tok.type], tok.value) for tok in tokens]
+
+
+def test_operators():
+    assert lex("a->b**c//d<=e") == [
+        ("IDENTIFIER", "a"),
+        ("ARROW", None),
+        ("IDENTIFIER", "b"),
+        ("POW", None),
+        ("IDENTIFIER", "c"),
+        ("FLOORDIV", None),
+        ("IDENTIFIER", "d"),
+        ("LTE", None),
+        ("IDENTIFIER", "e"),
+        ("EOF", None),
+    ]
+
+
+def test_numbers_and_keywords():
+    assert lex("sea x_1 = 3.5; 12") == [
+        ("KEYWORD", "sea"),
+        ("IDENTIFIER", "x_1"),
+        ("EQ", None),
+        ("FLOAT", 3.5),
+        ("NEWLINE", None),
+        ("INT", 12),
+        ("EOF", None),
+    ]
+
+
+def test_keyword_types():
+    tokens, _ = Lexer("<test>", "sea y").make_tokens()
+    assert [tok.type for tok in tokens[:2]] == [TT_SEA, TT_Y]
+    assert tokens[1].matches(TT_KEYWORD, "y")
+    assert not tokens[1].matches(TT_KEYWORD, "o")
+    assert repr(tokens[1]) == "KEYWORD:y"
+
+
+def test_string_escapes():
+    assert lex(r'"a\"b\n\q"') == [("STRING", 'a"b\nq'), ("EOF", None)]
+
+
+def test_comment_until_end_of_file():
+    assert lex("1 # nada\n2 # fin") == [("INT", 1), ("INT", 2), ("EOF", None)]
+
+
+def test_positions():
+    lexer = Lexer("<test>", "x\n  yy")
+    tokens, _ = lexer.make_tokens()
+    newline, yy = tokens[1], tokens[2]
+    start = lexer.source.position(yy.pos_start)
+    end = lexer.source.end_position(yy.pos_end)
+    assert (start.ln, start.col) == (1, 2)
+    assert (end.ln, end.col) == (1, 4)
+    # A newline token ends on its own line
+    end = lexer.source.end_position(newline.pos_end)
+    assert (end.ln, end.col) == (0, 2)
+    assert SOURCES.lookup(yy.pos_start) is lexer.source
+
+
+def test_token_without_position():
+    tok = Token(TT_PLUS)
+    assert tok.pos_start is None and tok.pos_end is None
+    assert Token(TT_PLUS, pos_start=4).pos_end == 5
+
+
+def test_error_of_a_collected_source_keeps_its_file_name():
+    lexer = Lexer("viejo.mar", "1 @")
+    _, error = lexer.make_tokens()
+    pos = error.pos_start
+    del lexer, error
+    gc.collect()
+    assert SOURCES.lookup(pos) is None
+    assert SOURCES.name(pos) == "viejo.mar"
+    error = InesperadoError(pos, pos + 1, "@")
+    assert error.as_string() == "Caracter Inesperado: @\nFile viejo.mar"
+
+
+def test_pruned_sources_keep_their_file_names():
+    positions = []
+    for i in range(200):
+        source = SOURCES.add(f"f{i % 2}", "x")
+        positions.append(source.base)
+    del source
+    gc.collect()
+    SOURCES.add("<test>", "x")
+    assert [SOURCES.name(pos) for pos in positions] == [f"f{i % 2}" for i in range(200)]
+
+
+def test_errors():
+    _, error = Lexer("<test>", "1 @").make_tokens()
+    assert isinstance(error, InesperadoError)
+    assert error.details == "@"
+    _, error = Lexer("<test>", "1 ! 2").make_tokens()
+    assert isinstance(error, CaracterEsperadoError)
+
+
+def test_streamed_file_matches_text(tmp_path):
+    code = 'sea x = 12.5 # nota\nsi x >= 10 { canta("uno\\ndos") }\n'
+    path = tmp_path / "script.mar"
+    path.write_text(code)
+    expected = lex(code)
+    for chunk_size in (1, 2, 5, 64):
+        tokens, error = Lexer.from_file(path, chunk_size).make_tokens()
+        assert error is None
+        assert [(TOKEN_NAMES[tok.type], tok.value) for tok in tokens] == expected
+
+
+def test_streamed_error_stops_tokens():
+    lexer = Lexer("<test>", "1 + @ 2")
+    tokens = [TOKEN_NAMES[tok.type] for tok in lexer.generate_tokens()]
+    assert tokens == ["INT", "PLUS", "EOF"]
+    assert isinstance(lexer.error, InesperadoError)
@@ -0,0 +1,61 @@
+# tests/test_native.py
+
+from mariachi import native
+from mariachi.interpreter import List, Number, String
+from mariachi.mariachi import run
+
+
+def test_values_are_bare_inside_the_runtime():
+    code = 'sea l = [1, 2.5, "a"]\npon(l, 3)\nl'
+    value, error = run("<test>", code, engine="native")
+    assert error is None
+    # Outside of the runtime every value is a Value again
+    assert value.elements[-1].elements == [
+        Number(1),
+        Number(2.5),
+        String("a"),
+        Number(3),
+    ]
+
+
+def test_numeric_loops_allocate_no_numbers(monkeypatch):
+    created = []
+    init = Number.__init__
+
+    def counting_init(self, value):
+        created.append(value)
+        init(self, value)
+
+    monkeypatch.setattr(Number, "__init__", counting_init)
+    code = """\
+define suma() { sea n = 0
+para i = 0 hasta 100 { sea n = n + i * 2 }
+entrega n }
+suma()
+"""
+    value, error = run("<test>", code, engine="native")
+    assert error is None
+    # Only the results handed back are wrapped
+    assert len(created) < 10
+    assert value.elements[-1] == Number(9900)
+
+
+def test_errors_point_at_the_operands():
+    code = "sea a = 0\nsea b = 1 + 2\nb / a"
+    value, error = run("<test>", code, engine="native")
+    assert error.details == "Division por zero"
+    tree_value, tree_error = run("<test>", code)
+    assert (error.pos_start, error.pos_end) != (None, None)
+    assert error.as_string().splitlines()[-2:] == (
+        tree_error.as_string().splitlines()[-2:]
+    )
+
+
+def test_to_value_keeps_shared_lists():
+    inner = List([1])
+    outer = List([inner, inner])
+    outer.elements.append(outer)
+    value = native.to_value(outer)
+    assert value.elements[0] is value.elements[1]
+    assert value.elements[2] is value
+    assert value.elements[0].elements == [Number(1)]
@@ -0,0 +1,156 @@
+# tests/test_node_store.py
+
+import pytest
+
+from mariachi.lexer import Lexer
+from mariachi.mariachi import run, Number
+from mariachi.node_store import NO_NODE, NodeStore
+from mariachi.nodes import BlockNode
+from mariachi.parser import Parser
+from mariachi.token import Token
+
+SCRIPT = """\
+define doble(n) { entrega n * 2 }
+define (a, b) { a - b }
+fija K = "hola"
+sea total = 0
+para i = 1 hasta 4 paso 1 { sea total = total + doble(i) }
+para j = 0 hasta 2 { sigue }
+si total > 10 y jamas 0 { canta(total) } quizas total < 0 { rompe } sino { 1 }
+si total { entrega }
+mientras total > 5 { sea total = total - -1 ** 2 }
+[total, K, 2.5, define (x) { x }()]
+"""
+
+
+def dump(node):
+    if isinstance(node, (list, tuple)):
+        return [dump(item) for item in node]
+    if isinstance(node, Token):
+        return (node.type, node.value, node.pos_start, node.pos_end)
+    if hasattr(node, "__slots__"):
+        return (
+            type(node).__name__,
+            {
+                key: dump(getattr(node, key))
+                for key in node.__slots__
+                if key != "source"
+            },
+        )
+    return node
+
+
+def parse(code):
+    lexer = Lexer("<test>", code)
+    tokens, error = lexer.make_tokens()
+    assert error is None
+    result = Parser(tokens).parse()
+    assert result.error is None
+    return result.node, lexer
+
+
+def test_nodes_have_no_dict():
+    ast, lexer = parse("1")
+    assert not hasattr(ast, "__dict__")
+    assert not hasattr(ast.element_nodes[0], "__dict__")
+
+
+def test_round_trip():
+    ast, lexer = parse(SCRIPT)
+    store = NodeStore.pack(ast)
+    unpacked = store.unpack()
+    assert dump(unpacked) == dump(ast)
+    block = unpacked.element_nodes[0].body_node
+    assert isinstance(block, BlockNode)
+    assert block.source is ast.element_nodes[0].body_node.source
+
+
+def test_views_match_the_nodes():
+    ast, lexer = parse(SCRIPT)
+    store = NodeStore.pack(ast)
+    view = store.node(store.root)
+    assert type(view).__name__ == "ListNode"
+    assert view.pos_start == ast.pos_start
+    assert view.pos_end == ast.pos_end
+
+    statements = view.element_nodes
+    assert len(statements) == len(ast.element_nodes)
+    function = statements[0]
+    assert type(function.body_node).__name__ == "BlockNode"
+    assert function.body_node.source is ast.element_nodes[0].body_node.source
+    assert function.var_name_tok.value == "doble"
+    assert [tok.value for tok in function.arg_name_toks] == ["n"]
+    assert statements[1].var_name_tok is None
+    assert [tok.value for tok in statements[1].arg_name_toks] == ["a", "b"]
+    assert statements[5].step_value_node is None
+    assert statements[6].else_case is not None
+    assert statements[7].else_case is None
+    condition = statements[6].cases[0][0]
+    assert condition.operation is not None
+    assert condition.operation is ast.element_nodes[6].cases[0][0].operation
+
+
+def test_values_are_stored_once():
+    ast, lexer = parse("sea x = 1\nsea x = x + 1\nx + 1.0")
+    store = NodeStore.pack(ast)
+    # x, 1 and 1.0, which is equal to 1 but not the same value
+    assert sorted(map(repr, store.values)) == ["'x'", "1", "1.0", "None"]
+
+
+def test_literals_are_shared():
+    ast, lexer = parse("sea x = 1000\nx + 1000 + 1000.0 + 'a' + 'a'".replace("'", '"'))
+    first = ast.element_nodes[0].value_node.value
+    assert first == Number(1000)
+    store = NodeStore.pack(ast)
+    view = store.node(store.root).element_nodes[0].value_node
+    assert view.value is first
+    assert store.unpack().element_nodes[0].value_node.value is first
+
+    sums = ast.element_nodes[1]
+    numbers = sums.left_node.left_node
+    assert numbers.left_node.right_node.value is first
+    assert numbers.right_node.value is not first
+    assert numbers.right_node.value.value == 1000.0
+    assert sums.right_node.value is sums.left_node.right_node.value
+
+
+def test_missing_children():
+    ast, lexer = parse("entrega")
+    store = NodeStore.pack(ast)
+    assert NO_NODE in store.links
+    assert store.node(NO_NODE) is None
+
+
+def test_deep_trees_are_packed_without_recursion():
+    ast, lexer = parse("1" + " + 1" * 5000)
+    store = NodeStore.pack(ast)
+    assert len(store) == 10002
+
+
+def test_unknown_nodes():
+    with pytest.raises(TypeError):
+        NodeStore.pack(object())
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("define doble(n) { entrega n * 2 }\ndoble(21)", Number(42)),
+        ("sea t = 0\npara i = 0 hasta 10 paso 2 { sea t = t + i }\nt", Number(20)),
+        ("sea n = 0\nmientras n < 5 { sea n = n + 1 }\nn", Number(5)),
+        ("si 0 { 1 } quizas 1 { 2 } sino { 3 }", Number(2)),
+        ("jamas 0 y -2 ** 2 == -4", Number(1)),
+    ],
+)
+def test_run_compact(code, expected):
+    value, error = run("<test>", code, compact=True)
+    assert error is None
+    assert value.elements[-1] == expected
+
+
+def test_run_compact_errors():
+    code = "define f() { entrega 1 / 0 }\nf()"
+    tree_value, tree_error = run("<test>", code)
+    value, error = run("<test>", code, compact=True)
+    assert value is None
+    assert error.as_string() == tree_error.as_string()
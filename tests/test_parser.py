@@ -0,0 +1,171 @@
+# tests/test_parser.py
+
+import pytest
+
+from mariachi.grammar import GRAMMAR_PATH, TABLES_PATH, GrammarError, generate
+from mariachi.lexer import Lexer
+from mariachi.mariachi import run, Number
+from mariachi.parser import Parser
+from mariachi.table_parser import TableParser
+from mariachi.token import Token
+
+
+def parse_error(code):
+    lexer = Lexer("<test>", code)
+    tokens, error = lexer.make_tokens()
+    assert error is None
+    res = Parser(tokens).parse()
+    assert res.error is not None
+    start, _ = res.error.resolve()
+    return res.error.details, start.ln, start.col
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        (
+            "1 +",
+            (
+                "int, float, identificador, '+', '-', '(', '[', 'si', 'para', 'mientras', o 'define' esperado",
+                0,
+                3,
+            ),
+        ),
+        (
+            ")",
+            (
+                "'regresa', 'rompe', 'sigue', 'sea', int, float, identificador, '+', '-', '(', '[', o 'jamas' esperado",
+                0,
+                0,
+            ),
+        ),
+        ("sea = 1", ("Identificador esperado", 0, 4)),
+        (
+            "1\n2 +",
+            (
+                "'+', '-', '*', '/', '^', '==', '!=', '<', '>', <=', '>=', 'y' or 'o' esperado",
+                1,
+                0,
+            ),
+        ),
+        ("si 1 { 1\n2 + }", ("'}' esperado", 1, 0)),
+        ("define f() {\nentrega )\n}", ("'}' esperado", 1, 8)),
+        ("define f() {\n1\nentrega 1 +\n}", ("'}' esperado", 2, 8)),
+    ],
+)
+def test_syntax_errors(code, expected):
+    assert parse_error(code) == expected
+
+
+def test_return_without_value():
+    tokens, _ = Lexer("<test>", "define f() {\nentrega\n}").make_tokens()
+    res = Parser(tokens).parse()
+    assert res.error is None
+    body = res.node.element_nodes[0].body_node.statement_nodes
+    assert body.element_nodes[0].node_to_return is None
+
+
+def parse_tree(code):
+    tokens, error = Lexer("<test>", code).make_tokens()
+    assert error is None
+    res = Parser(tokens).parse()
+    assert res.error is None
+    return repr(res.node.element_nodes[0])
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("1 + 2 * 3", "(INT:1, PLUS, (INT:2, MUL, INT:3))"),
+        ("1 - 2 - 3", "((INT:1, MINUS, INT:2), MINUS, INT:3)"),
+        ("2 ** 3 ** 2", "(INT:2, POW, (INT:3, POW, INT:2))"),
+        ("-2 ** 2", "(MINUS, (INT:2, POW, INT:2))"),
+        ("2 ** -1 * 3", "((INT:2, POW, (MINUS, INT:1)), MUL, INT:3)"),
+        ("jamas 1 == 2 y 3", "((KEYWORD:jamas, (INT:1, EE, INT:2)), KEYWORD:y, INT:3)"),
+        (
+            "1 < 2 o jamas jamas 5",
+            "((INT:1, LT, INT:2), KEYWORD:o, (KEYWORD:jamas, (KEYWORD:jamas, INT:5)))",
+        ),
+    ],
+)
+def test_precedence(code, expected):
+    assert parse_tree(code) == expected
+
+
+def test_deep_nesting():
+    assert parse_tree("(" * 250 + "1" + ")" * 250) == "INT:1"
+
+
+def dump(node):
+    """The structure of a tree, with the attributes of every node."""
+    if isinstance(node, (list, tuple)):
+        return [dump(item) for item in node]
+    if isinstance(node, Token):
+        return (node.type, node.value, node.pos_start, node.pos_end)
+    if hasattr(node, "__slots__"):
+        return (
+            type(node).__name__,
+            {
+                key: dump(getattr(node, key))
+                for key in node.__slots__
+                if key != "source"
+            },
+        )
+    return node
+
+
+def table_parse(code):
+    lexer = Lexer("<test>", code)
+    tokens, error = lexer.make_tokens()
+    assert error is None
+    return TableParser(tokens).parse(), lexer
+
+
+def test_tables_are_up_to_date():
+    with open(GRAMMAR_PATH, encoding="utf-8") as file:
+        source = generate(file.read())
+    with open(TABLES_PATH, encoding="utf-8") as file:
+        assert file.read() == source
+
+
+def test_grammar_conflicts_are_reported():
+    with pytest.raises(GrammarError):
+        generate("a : b | b\nb : INT")
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "1 + 2 * 3 - -4 ** 2 ** 3 // 5 % 6",
+        "jamas 1 == 2 y 3 < 4 o jamas jamas 5",
+        "sea x = fija Y = f(1, [2, 3], (4))",
+        "\n\nsi a { b\n\n c\n } quizas d { e } sino { f }\n",
+        "para i = 1 hasta 10 paso 2 { entrega\n}\nmientras 1 { sigue; rompe }",
+        "define f(a, b) { entrega a }\ndefine (x) { x }\ndefine g() { 1 }",
+    ],
+)
+def test_table_parser_builds_the_same_tree(code):
+    lexer = Lexer("<test>", code)
+    tokens, _ = lexer.make_tokens()
+    expected = Parser(tokens).parse()
+    res = TableParser(tokens).parse()
+    assert res.error is None
+    assert dump(res.node) == dump(expected.node)
+
+
+def test_table_parser_nesting():
+    res, _ = table_parse("(" * 5000 + "1" + ")" * 5000)
+    assert repr(res.node.element_nodes[0]) == "INT:1"
+
+
+def test_table_parser_errors():
+    res, _ = table_parse("si 1 {\n canta 2\n}")
+    start, _ = res.error.resolve()
+    assert res.error.details == "'}' esperado"
+    assert (start.ln, start.col) == (1, 7)
+
+
+def test_run_with_table_parser():
+    value, error = run("<test>", "define f(n) { entrega n * 2 }\nf(21)", parser="table")
+    assert error is None
+    assert value.elements[-1] == Number(42)
@@ -0,0 +1,170 @@
+# tests/test_resolver.py
+
+import pytest
+
+from mariachi import resolver
+from mariachi.context import Context
+from mariachi.interpreter import SlotTable, SymbolTable
+from mariachi.lexer import Lexer
+from mariachi.mariachi import ENGINES, Number, global_symbol_table, parse_lexer, run
+from mariachi.resolver import ENCLOSING, GLOBAL, LOCAL, Scope, resolve
+
+
+def resolve_code(code):
+    ast, error = parse_lexer(Lexer("<test>", code))
+    assert error is None
+    # A table of its own, the functions of other tests bind names in the globals
+    context = Context("<test>")
+    context.symbol_table = SymbolTable(global_symbol_table)
+    return ast, resolve(ast, context)
+
+
+def test_names_are_classified():
+    code = """\
+sea total = 0
+define f(a, b) { sea c = a + b + total + g()
+para i = 0 hasta 2 { c }
+define interna() { c } }
+define g() { c }
+"""
+    ast, (resolution, error) = resolve_code(code)
+    assert error is None
+    f = resolution.scope(ast.element_nodes[1])
+    assert f.slots == {"a": 0, "b": 1, "c": 2, "i": 3, "interna": 4}
+    assert f.padding == [None, None, None]
+    assert resolution.classify("b", f) == (LOCAL, 1)
+    assert resolution.classify("total", f) == (GLOBAL, None)
+    assert resolution.classify("canta", f) == (GLOBAL, None)
+    g = resolution.scope(ast.element_nodes[2])
+    assert resolution.classify("c", g) == (ENCLOSING, None)
+    assert resolution.classify("total") == (GLOBAL, None)
+    # The locals of a function are never seen by the program
+    assert resolution.classify("c") == (None, None)
+
+
+def test_loops_whose_value_is_never_used():
+    code = """\
+para i = 0 hasta 2 { mientras 0 { 0 } }
+define f() { para i = 0 hasta 2 { si i { mientras 0 { 0 } } }
+sea l = para j = 0 hasta 2 { j }
+entrega [mientras 0 { 0 }] }
+"""
+    ast, (resolution, error) = resolve_code(code)
+    assert error is None
+    f = ast.element_nodes[1].body_node.statement_nodes.element_nodes
+    para = f[0]
+    si = para.body_node.statement_nodes.element_nodes[0]
+    mientras = si.cases[0][1].statement_nodes.element_nodes[0]
+    assert resolution.discarded_loops == {
+        (para.pos_start, para.pos_end),
+        (mientras.pos_start, mientras.pos_end),
+    }
+    assert resolution.discards(para)
+    assert not resolution.discards(f[1].value_node)
+
+
+def test_para_loops_that_may_be_quiet():
+    code = """\
+para i = 0 hasta 2 { 0 }
+define f() { para i = 0 hasta 2 { 0 }
+para j = 0 hasta 2 { j }
+para k = 0 hasta 2 { sea k = 0 }
+para m = 0 hasta 2 { para n = 0 hasta m { 0 } } }
+"""
+    ast, (resolution, error) = resolve_code(code)
+    assert error is None
+    f = ast.element_nodes[1].body_node.statement_nodes.element_nodes
+    inner = f[3].body_node.statement_nodes.element_nodes[0]
+    # Loops of the program itself are always counted in the globals
+    assert not resolution.may_be_quiet(ast.element_nodes[0])
+    assert [resolution.may_be_quiet(loop) for loop in f] == [True, False, False, False]
+    assert resolution.may_be_quiet(inner)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_quiet_para_loops_count_for_functions_defined_later(engine):
+    # Names of its own, no function has read them yet
+    oye, suma, k = f"oye_{engine}", f"suma_{engine}", f"k_{engine}"
+    run("<test>", f"define {oye}() {{ 0 }}", engine=engine)
+    code = f"""\
+define {suma}() {{ sea s = 0
+para {k} = 0 hasta 4 {{ sea s = s + {oye}() }}
+entrega s }}
+{suma}()"""
+    value, error = run("<test>", code, engine=engine)
+    assert error is None
+    assert value.elements[-1] == Number(0)
+    run("<test>", f"define {oye}() {{ entrega {k} }}", engine=engine)
+    value, error = run("<test>", f"{suma}()", engine=engine)
+    assert error is None
+    assert value.elements[-1] == Number(6)
+
+
+def test_unresolved_names_are_reported_before_running(capsys):
+    value, error = run("<test>", 'canta("antes")\ndefine f() { falta }')
+    assert value is None
+    assert error.details == "'falta' no es definido"
+    assert capsys.readouterr().out == ""
+
+
+def test_names_of_the_globals_are_resolved():
+    run("<test>", "sea de_antes = 2")
+    value, error = run("<test>", "define f() { entrega de_antes }\nf()")
+    assert error is None
+    assert value.elements[-1] == Number(2)
+
+
+def test_names_bound_by_functions_of_earlier_programs(fresh_table):
+    context = Context("<test>")
+    context.symbol_table = fresh_table
+    for code in ["sea total = 0", "define f() { sea total = 1 }"]:
+        ast, error = parse_lexer(Lexer("<test>", code))
+        resolution, error = resolve(ast, context)
+    ast, error = parse_lexer(Lexer("<test>", "define g() { total }"))
+    resolution, error = resolve(ast, context)
+    g = resolution.scope(ast.element_nodes[0])
+    assert resolution.classify("total", g) == (ENCLOSING, None)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_functions_see_names_bound_by_later_functions(engine):
+    # A name of its own, no function has bound yet
+    name = f"escondido_{engine}"
+    run("<test>", f"sea {name} = 1", engine=engine)
+    run("<test>", f"define interna() {{ entrega {name} }}", engine=engine)
+    code = f"define externa() {{ sea {name} = 5\nentrega interna() }}\nexterna()"
+    value, error = run("<test>", code, engine=engine)
+    assert error is None
+    assert value.elements[-1] == Number(5)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_programs_are_resolved_once(engine, monkeypatch):
+    passes = []
+    resolve = resolver.Resolver.resolve
+
+    def counted(self, ast):
+        passes.append(ast)
+        resolve(self, ast)
+
+    monkeypatch.setattr(resolver.Resolver, "resolve", counted)
+    value, error = run("<test>", "define f(a) { a }\nf(1)", engine=engine)
+    assert error is None
+    assert len(passes) == 1
+
+
+def test_slot_tables_fall_back_to_the_callers():
+    globals_ = SymbolTable()
+    globals_.set("x", Number(1))
+    scope = Scope(["a"])
+    scope.bind("x")
+    table = SlotTable(scope, [Number(2)] + scope.padding, globals_)
+    assert table.get("a") == Number(2)
+    assert table.get("x") == Number(1)
+    table.set("x", Number(3))
+    assert table.get("x") == Number(3)
+    assert table.get("falta") is None
+
+    # A builtin called from the function looks its callers up through it
+    builtin = SymbolTable(table)
+    assert builtin.get("a") == Number(2)
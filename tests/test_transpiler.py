@@ -0,0 +1,102 @@
+# tests/test_transpiler.py
+
+import os
+
+from mariachi import cache
+from mariachi.lexer import Lexer
+from mariachi.mariachi import (
+    Number,
+    emit_python_path,
+    parse_lexer,
+    run,
+    run_path,
+    transpile_path,
+)
+from mariachi.transpiler import transpile
+
+
+def python_source(code):
+    lexer = Lexer("<test>", code)
+    ast, error = parse_lexer(lexer)
+    assert error is None
+    return transpile(ast)
+
+
+def test_functions_and_loops_become_python():
+    source = python_source(
+        "define f(n) { n }\npara i = 0 hasta 3 { si i == 1 { rompe }\nf(i) }"
+    )
+    assert "def programa(context):" in source
+    assert "def f_1(context):" in source
+    assert "in loop_steps(" in source
+    assert "            break" in source
+    compile(source, "<test>", "exec")
+
+
+def test_rompe_outside_of_a_loop_raises():
+    source = python_source("define m() { rompe }\nsigue")
+    assert "raise BreakLoop" in source
+    assert "raise ContinueLoop" in source
+
+
+def test_positions_are_relative_to_the_source():
+    first = python_source("sea x = 1 + 2")
+    second = python_source("sea x = 1 + 2")
+    assert first == second
+    assert "B + 8, B + 9" in first
+
+
+def test_operands_keep_their_order():
+    code = """\
+define f(x) { canta(x)
+entrega x }
+f(1) + f(2) * f(3)
+[f(4), si 1 { f(5) }, f(6)]
+"""
+    value, error = run("<test>", code, engine="python")
+    assert error is None
+    assert value.elements[-2] == Number(7)
+
+
+def test_compact_ast():
+    code = "define f() { rompe }\npara i = 0 hasta 3 { f()\ni }"
+    value, error = run("<test>", code, engine="python", compact=True)
+    assert error is None
+    assert value.elements[-1].elements == []
+
+
+def test_emit_python_path(tmp_path):
+    path = tmp_path / "script.mar"
+    path.write_text("canta(1)\n")
+    text, error = emit_python_path(path, use_cache=False)
+    assert error is None
+    assert text.startswith(f"# {os.fspath(path)!r} transpiled")
+    assert "call(" in text
+
+    path.write_text("canta(\n")
+    text, error = emit_python_path(path, use_cache=False)
+    assert text is None
+    assert error is not None
+
+
+def test_code_objects_are_cached(tmp_path):
+    path = tmp_path / "script.mar"
+    path.write_text("sea x = 1\ndefine f() { entrega 1 / 0 }\nf()")
+    first = run_path(path, engine="python")[1].as_string()
+    entry = cache.CacheEntry(path, cache.PYTHON_SUFFIX)
+    assert os.path.exists(entry.cache_path)
+    assert cache.read(entry) is not None
+
+    code, source, error = transpile_path(path)
+    assert error is None and source.path == os.fspath(path)
+    assert run_path(path, engine="python")[1].as_string() == first
+    assert "linea 2" in first
+    assert first == run_path(path, use_cache=False)[1].as_string()
+
+
+def test_changed_scripts_are_transpiled_again(tmp_path):
+    path = tmp_path / "script.mar"
+    path.write_text("1 + 1")
+    assert run_path(path, engine="python")[0].elements == [Number(2)]
+    path.write_text("2 + 2 + 2")
+    assert run_path(path, engine="python")[0].elements == [Number(6)]
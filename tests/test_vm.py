@@ -0,0 +1,214 @@
+# tests/test_vm.py
+
+import pytest
+
+from mariachi import vm
+from mariachi.bytecode import (
+    BREAK,
+    CALL,
+    FOR_ITER,
+    LOAD_GLOBAL,
+    LOAD_NAME,
+    TAIL_CALL,
+    compile_program,
+    disassemble,
+)
+from mariachi.context import Context
+from mariachi.interpreter import SymbolTable
+from mariachi.lexer import Lexer
+from mariachi.mariachi import (
+    Number,
+    disassemble_path,
+    global_context,
+    global_symbol_table,
+    parse_lexer,
+    run,
+)
+from mariachi.resolver import resolve
+
+
+def compile_code(code, resolved=False):
+    lexer = Lexer("<test>", code)
+    ast, error = parse_lexer(lexer)
+    assert error is None
+    resolution = None
+    if resolved:
+        # A table of its own, the functions of other tests bind names in the globals
+        context = Context("<test>")
+        context.symbol_table = SymbolTable(global_symbol_table)
+        resolution, error = resolve(ast, context)
+        assert error is None
+    return compile_program(ast, resolution=resolution), lexer
+
+
+def function_code(code, name):
+    return next(c for c in code.constants if getattr(c, "name", None) == name)
+
+
+def opcodes(code):
+    return list(code.code[::2])
+
+
+def test_loops_and_calls_are_compiled_to_jumps():
+    code, lexer = compile_code(
+        "define f(n) { n }\npara i = 0 hasta 3 { si i == 1 { rompe }\nf(i) }"
+    )
+    ops = opcodes(code)
+    assert FOR_ITER in ops
+    assert BREAK in ops
+    assert CALL in ops
+    assert code.slot_count == 4
+    assert [c.name for c in code.constants if hasattr(c, "code")] == ["f"]
+
+
+def test_constants_are_pooled():
+    code, lexer = compile_code("1 + 1 + 1.0 + 'a' + 'a'".replace("'", '"'))
+    assert code.constants == [1, 1.0, "a"]
+    assert [type(c) for c in code.constants] == [int, float, str]
+
+
+def test_disassemble():
+    code, lexer = compile_code("sea x = 1\ndefine doble(n) { entrega n * 2 }")
+    text = disassemble(code)
+    assert text.splitlines()[:3] == [
+        "Desensamblado de <programma>:",
+        "   1      0 LOAD_NUMBER        0 (1)",
+        "          2 STORE_NAME         0 (x)",
+    ]
+    assert "Desensamblado de doble:" in text
+    assert "BINARY_OP          '*'" in text
+
+
+def test_disassemble_path(tmp_path):
+    path = tmp_path / "script.mar"
+    path.write_text("canta(1)\n")
+    text, error = disassemble_path(path, use_cache=False)
+    assert error is None
+    assert "CALL               1" in text
+
+    path.write_text("canta(\n")
+    text, error = disassemble_path(path, use_cache=False)
+    assert text is None
+    assert error is not None
+
+
+def test_deep_recursion_does_not_use_the_python_stack():
+    code = """\
+define cuenta(n) { si n == 0 { entrega 0 } sino { entrega 1 + cuenta(n - 1) } }
+cuenta(2000)
+"""
+    value, error = run("<test>", code, engine="vm")
+    assert error is None
+    assert value.elements[-1] == Number(2000)
+
+
+def test_too_many_frames(monkeypatch):
+    monkeypatch.setattr(vm, "MAX_FRAMES", 50)
+    code = "define sin_fin() { sin_fin() }\nsin_fin()"
+    value, error = run("<test>", code, engine="vm")
+    assert value is None
+    assert error.details == "Demasiadas llamadas anidadas"
+
+
+def test_error_positions_point_at_the_source():
+    code = "define divide(a) {\n  entrega 10 / a\n}\ndivide(0)"
+    value, error = run("<test>", code, engine="vm")
+    text = error.as_string()
+    assert "linea 4, en <programma>" in text
+    assert "linea 2, en divide" in text
+    assert "Division por zero" in text
+
+
+def test_entrega_of_a_call_is_a_tail_call():
+    code, lexer = compile_code(
+        "define f(n) { si n { entrega f(n - 1) } sino { entrega f } }\n"
+        "define g(n) { mientras 1 { entrega g(n) } }\n"
+        "entrega f(1)"
+    )
+    assert TAIL_CALL in opcodes(function_code(code, "f"))
+    # Not in loops, nor in the program itself
+    assert TAIL_CALL not in opcodes(function_code(code, "g"))
+    assert TAIL_CALL not in opcodes(code)
+
+
+def test_functions_read_program_names_directly():
+    code, lexer = compile_code(
+        "define f(n) { sea m = 1\nentrega n + m + x + f }\nsea x = 1", True
+    )
+    f = function_code(code, "f")
+    instructions = zip(f.code[::2], f.code[1::2])
+    assert [f.names[arg] for op, arg in instructions if op == LOAD_GLOBAL] == ["x", "f"]
+    assert LOAD_NAME in opcodes(f)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_tail_recursion_runs_in_constant_frames(monkeypatch, compact):
+    monkeypatch.setattr(vm, "MAX_FRAMES", 50)
+    code = """\
+define suma(n, total) { si n == 0 { entrega total } sino { entrega suma(n - 1, total + n) } }
+suma(10000, 0)
+"""
+    value, error = run("<test>", code, compact=compact, engine="vm")
+    assert error is None
+    assert value.elements[-1] == Number(50005000)
+
+
+def test_tail_calls_keep_names_read_by_their_callees():
+    code = """\
+define lee() { entrega x }
+define usa(x) { entrega lee() }
+usa(7)
+"""
+    value, error = run("<test>", code, engine="vm")
+    assert error is None
+    assert value.elements[-1] == Number(7)
+
+
+@pytest.mark.parametrize(
+    "programs",
+    [
+        [
+            "define lee_t() { entrega t }\ndefine otro(t) { t }",
+            "define tp(t) { entrega lee_t() }",
+            "tp(7)",
+        ],
+        [
+            "define lee_q() { 0 }\ndefine tq(q) { entrega lee_q() }",
+            "define lee_q() { entrega q }",
+            "tq(7)",
+        ],
+    ],
+)
+def test_tail_calls_keep_names_read_by_functions_of_other_programs(programs):
+    for code in programs:
+        value, error = run("<test>", code, engine="vm")
+        assert error is None
+    assert value.elements[-1] == Number(7)
+
+
+def test_long_tail_recursion_keeps_a_bounded_traceback(monkeypatch):
+    monkeypatch.setattr(vm, "KEPT_TAIL_CALLS", 10)
+    code = """\
+define cae(n) { si n == 0 { entrega 1 / n } sino { entrega cae(n - 1) } }
+cae(1000)
+"""
+    value, error = run("<test>", code, engine="vm")
+    assert error.details == "Division por zero"
+    # The program, the first tail calls and the call failing
+    assert len(error.frame_sources) == 12
+    assert "linea 2, en <programma>" in error.as_string()
+
+
+def test_deep_expressions_are_compiled_without_recursion():
+    value, error = run("<test>", "1" + " + 1" * 5000, parser="table", engine="vm")
+    assert error is None
+    assert value.elements[-1] == Number(5001)
+
+
+def test_tail_calls_keep_their_tracebacks():
+    code = "define e(x) { entrega 1 / x }\ndefine d(x) { entrega e(x) }\nd(0)"
+    value, error = run("<test>", code, engine="vm")
+    text = error.as_string()
+    assert "linea 3, en <programma>" in text
+    assert "linea 2, en d" in text
+    assert "linea 1, en e" in text